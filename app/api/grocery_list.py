@@ -6,7 +6,7 @@ from uuid import UUID
 from app.core.database import get_db
 from app.schemas.grocery_list import GroceryList
 from app.services.grocery_list import build_grocery_list
-from app.repositories.grocery_list import get_grocery_list
+from app.repositories.grocery_list import get_grocery_list, update_grocery_list_recipes
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -14,6 +14,10 @@ router = APIRouter()
 class CreateGroceryListRequest(BaseModel):
     recipe_ids: List[UUID]
 
+class UpdateGroceryListRecipesRequest(BaseModel):
+    add: List[UUID] = []     # repeat an id to add the recipe more than once
+    remove: List[UUID] = []  # repeat an id to remove more than one of it
+
 @router.post("/grocery-lists/", response_model=GroceryList)
 def create_grocery_list_from_recipes(
     request: CreateGroceryListRequest, 
@@ -38,4 +42,19 @@ def get_grocery_list_by_id(
     grocery_list = get_grocery_list(db, grocery_list_id)
     if grocery_list is None:
         raise HTTPException(status_code=404, detail="Grocery list not found")
-    return grocery_list
\ No newline at end of file
+    return grocery_list
+
+@router.patch("/grocery-lists/{grocery_list_id}/recipes", response_model=GroceryList)
+def update_grocery_list_recipes_by_id(
+    grocery_list_id: UUID,
+    request: UpdateGroceryListRecipesRequest,
+    db: Session = Depends(get_db)
+):
+    """Add and remove recipes on an existing grocery list, applying only their ingredient changes"""
+    try:
+        grocery_list = update_grocery_list_recipes(db, grocery_list_id, request.add, request.remove)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if grocery_list is None:
+        raise HTTPException(status_code=404, detail="Grocery list not found")
+    return grocery_list
@@ -0,0 +1,39 @@
+from fastapi import APIRouter
+
+from app.core.cache import get_meal_plan_cache, get_recipe_cache
+from app.core.database import pool_stats
+from app.core.dependencies import get_llm_service
+from app.core.ingredient_index import get_recipe_ingredient_index
+from app.services.scrape_cache import get_scrape_cache
+
+router = APIRouter()
+
+@router.get("/instrumentation/cache")
+def get_cache_stats():
+    """Hit/miss counters and size of the recipe response cache"""
+    return get_recipe_cache().stats()
+
+@router.get("/instrumentation/embedding-cache")
+def get_embedding_cache_stats():
+    """Hit/miss counters and size of the query embedding cache"""
+    return get_llm_service().embedding_cache.stats()
+
+@router.get("/instrumentation/meal-plan-cache")
+def get_meal_plan_cache_stats():
+    """Hit/miss counters and size of the generated meal plan cache"""
+    return get_meal_plan_cache().stats()
+
+@router.get("/instrumentation/ingredient-index")
+def get_ingredient_index_stats():
+    """Hit/miss counters and size of the in-memory recipe ingredient index"""
+    return get_recipe_ingredient_index().stats()
+
+@router.get("/instrumentation/scrape-cache")
+def get_scrape_cache_stats():
+    """Hit/stale/miss counters, revalidations and size of the scrape cache"""
+    return get_scrape_cache().stats()
+
+@router.get("/instrumentation/db-pool")
+def get_db_pool_stats():
+    """Connections checked out/in, overflow in use, and how long checkouts waited"""
+    return pool_stats()
@@ -1,32 +1,58 @@
-from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+import json
+import logging
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from app.schemas.meal_plan import MealPlanRequest, MealPlanResponse
-from app.services.meal_plan import create_meal_plan_with_grocery_list
+from app.services.meal_plan import create_meal_plan_with_grocery_list, stream_meal_plan_with_grocery_list
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 @router.post("/meal-plan/generate", response_model=MealPlanResponse)
-def generate_meal_plan(
-    request: MealPlanRequest,
-    db: Session = Depends(get_db)
-):
+async def generate_meal_plan(request: MealPlanRequest):
     """
     Generate a meal plan based on user constraints using an LLM.
     Creates recipes and optionally generates a grocery list.
+
+    Async: the LLM call is awaited on the event loop and database work runs on
+    short-lived sessions in the threadpool, so no request-scoped session is held.
     """
     try:
-        meal_plan_response = create_meal_plan_with_grocery_list(
-            db=db,
-            request=request
-        )
+        meal_plan_response = await create_meal_plan_with_grocery_list(request=request)
         return meal_plan_response
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating meal plan: {str(e)}")
 
+@router.post("/meal-plan/generate/stream")
+async def stream_meal_plan(request: MealPlanRequest):
+    """
+    Server-Sent Events variant of /meal-plan/generate. Existing recipes and ones
+    reused from the meal plan cache are sent immediately, each LLM-generated recipe
+    as soon as it is parsed and saved, and the grocery list id last:
 
+        event: recipe        data: {"source": "database" | "cache" | "generated", "recipe": {...}}
+        event: grocery_list  data: {"grocery_list_id": "..."}
+        event: error         data: {"detail": "..."}
+        event: done          data: {}
+    """
+    async def events():
+        try:
+            async for event, data in stream_meal_plan_with_grocery_list(request=request):
+                yield _sse(event, data)
+        except Exception as e:
+            logger.exception("Error streaming meal plan")
+            yield _sse("error", {"detail": f"Error generating meal plan: {str(e)}"})
+        yield _sse("done", {})
 
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
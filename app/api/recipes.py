@@ -1,34 +1,71 @@
+import json
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
 
 from app.core.database import get_db
 from app.models.recipe import Recipe as RecipeModel
-from app.schemas.recipe import Recipe, RecipeCreate, ScrapeRecipeRequest
-from app.repositories.recipes import get_recipes as get_recipes_repo, get_recipe as get_recipe_repo, create_recipe as create_recipe_repo
+from app.schemas.recipe import Recipe, RecipeCreate, RecipeImportResult, RecipePage, ScrapeRecipeRequest, ScrapeRecipesRequest
+from app.repositories.recipes import create_recipe as create_recipe_repo
+from app.services.recipe_cache import get_recipe_json, get_recipes_page_json
 from app.services.recipe import scrape_recipe as scrape_recipe_service
+from app.services.recipe_import import import_recipes
+from app.services.recipe_scrape import scrape_recipes
 
 router = APIRouter()
 
-@router.get("/recipes/", response_model=List[Recipe])
-def get_recipes(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    recipes = get_recipes_repo(db, page_number=skip, page_size=limit)
-    return recipes
+@router.get("/recipes/", response_model=RecipePage)
+def get_recipes(
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    try:
+        body = get_recipes_page_json(db, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Serve the cached JSON bytes as-is rather than re-validating through response_model
+    return Response(content=body, media_type="application/json")
 
 @router.post("/recipes/", response_model=Recipe)
 def create_recipe(recipe: RecipeCreate, db: Session = Depends(get_db)):
     db_recipe = create_recipe_repo(db, recipe)
     return db_recipe
 
+@router.post("/recipes/batch", response_model=RecipeImportResult)
+async def create_recipes_batch(request: Request, db: Session = Depends(get_db)):
+    """
+    Bulk-create recipes from a JSON lines body (application/x-ndjson), one
+    RecipeCreate object per line. Records that fail are listed in `errors` by
+    line number without aborting the rest of the batch.
+    """
+    body = await request.body()
+    return await run_in_threadpool(import_recipes, db, body.splitlines())
+
 @router.get("/recipes/{recipe_id}", response_model=Recipe)
 def get_recipe(recipe_id: UUID, db: Session = Depends(get_db)):
-    recipe = get_recipe_repo(db, recipe_id)
-    if recipe is None:
+    body = get_recipe_json(db, recipe_id)
+    if body is None:
         raise HTTPException(status_code=404, detail="Recipe not found")
-    return recipe 
+    return Response(content=body, media_type="application/json")
 
 @router.post("/recipes/scrape")
 def scrape_recipe(request: ScrapeRecipeRequest):
     recipe = scrape_recipe_service(request.url)
-    return recipe
\ No newline at end of file
+    return recipe
+
+@router.post("/recipes/scrape/batch")
+async def scrape_recipes_batch(request: ScrapeRecipesRequest):
+    """
+    Scrape many URLs concurrently. Results are streamed as JSON lines in the order
+    they finish, one {"url", "recipe", "recipe_id", "error"} object per URL;
+    recipe_id is only set when persist is true.
+    """
+    async def results():
+        async for result in scrape_recipes(request.urls, persist=request.persist):
+            yield json.dumps(jsonable_encoder(result)) + "\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
@@ -0,0 +1,271 @@
+"""
+In-process caching primitives.
+
+CacheBackend is the interface the rest of the app codes against; LocalCache is a
+bounded LRU + TTL implementation that lives in process memory. A shared cache
+(eg. Redis) can be dropped in by implementing the same four methods.
+"""
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, asdict
+from functools import lru_cache
+from uuid import UUID, uuid4
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    sets: int = 0
+    evictions: int = 0
+    size: int = 0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class CacheBackend(ABC):
+    """Minimal byte-oriented key/value cache interface."""
+
+    @abstractmethod
+    def get(self, key: str) -> bytes | None:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl_seconds: float | None = None) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def stats(self) -> CacheStats:
+        ...
+
+
+class LocalCache(CacheBackend):
+    """
+    Thread-safe LRU cache with a per-entry TTL, bounded by entry count.
+    Expired entries are dropped lazily when read or when they reach the LRU end.
+    """
+
+    def __init__(self, max_entries: int = 10_000, default_ttl_seconds: float | None = 300):
+        self.max_entries = max_entries
+        self.default_ttl_seconds = default_ttl_seconds
+        self._entries: OrderedDict[str, tuple[float | None, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return value
+
+    def set(self, key: str, value: bytes, ttl_seconds: float | None = None) -> None:
+        ttl = self.default_ttl_seconds if ttl_seconds is None else ttl_seconds
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            self._stats.sets += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(**{**self._stats.to_dict(), "size": len(self._entries)})
+
+
+class RecipeCache:
+    """
+    Recipe-specific key scheme on top of a CacheBackend.
+
+    Detail entries are keyed by recipe id. List pages are keyed by (limit, cursor)
+    under a generation token that is replaced whenever a recipe is written, so every
+    cached page is invalidated at once without the backend having to scan keys.
+    If the token itself is evicted or expires a fresh one is minted, which only
+    costs a round of page misses.
+    """
+
+    GENERATION_KEY = "recipes:page-generation"
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self._counters = Counter()
+        self._lock = threading.Lock()
+
+    def get_recipe(self, recipe_id: UUID) -> bytes | None:
+        return self._count("recipe", self.backend.get(self._recipe_key(recipe_id)))
+
+    def set_recipe(self, recipe_id: UUID, value: bytes) -> None:
+        self.backend.set(self._recipe_key(recipe_id), value)
+
+    def page_key(self, limit: int, cursor: str | None) -> str:
+        """
+        Key for a list page under the current generation. Resolve it once per request
+        and reuse it for the set, so a page read from the db before an invalidation
+        can't be stored under the new generation.
+        """
+        generation = self.backend.get(self.GENERATION_KEY) or self._new_generation()
+        return f"recipes:page:{generation.decode()}:{limit}:{cursor or ''}"
+
+    def get_page(self, page_key: str) -> bytes | None:
+        return self._count("page", self.backend.get(page_key))
+
+    def set_page(self, page_key: str, value: bytes) -> None:
+        self.backend.set(page_key, value)
+
+    def invalidate_recipe(self, recipe_id: UUID) -> None:
+        """Drop the recipe's detail entry and every cached list page."""
+        self.backend.delete(self._recipe_key(recipe_id))
+        self.invalidate_pages()
+
+    def invalidate_pages(self) -> None:
+        """Drop every cached list page, eg. after a bulk insert of new recipes."""
+        self._new_generation()
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            "recipe_hits": counters.get("recipe_hits", 0),
+            "recipe_misses": counters.get("recipe_misses", 0),
+            "page_hits": counters.get("page_hits", 0),
+            "page_misses": counters.get("page_misses", 0),
+            "backend": self.backend.stats().to_dict(),
+        }
+
+    def _count(self, kind: str, value: bytes | None) -> bytes | None:
+        with self._lock:
+            self._counters[f"{kind}_hits" if value is not None else f"{kind}_misses"] += 1
+        return value
+
+    def _recipe_key(self, recipe_id: UUID) -> str:
+        return f"recipe:{recipe_id}"
+
+    def _new_generation(self) -> bytes:
+        generation = uuid4().hex.encode()
+        self.backend.set(self.GENERATION_KEY, generation)
+        return generation
+
+
+class MealPlanCache:
+    """
+    Recipe ids generated for a (canonicalized) meal plan request, so near-identical
+    requests can reuse them instead of calling the LLM again.
+
+    Each entry expires ttl_seconds after it was first stored and is served at most
+    max_reuses times; after that it is dropped so the next request generates fresh
+    recipes and plans keep some variety.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl_seconds: float = 86_400, max_reuses: int = 5):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.max_reuses = max_reuses
+        self._counters = Counter()
+        self._lock = threading.Lock()
+
+    def get_recipe_ids(self, key: str) -> list[UUID] | None:
+        """
+        Cached recipe ids for key. Doesn't count as a reuse: call record_use once the
+        ids are actually served, so entries the caller rejects aren't worn down.
+        """
+        value = self.backend.get(self._key(key))
+        if value is None:
+            with self._lock:
+                self._counters["misses"] += 1
+            return None
+        return [UUID(recipe_id) for recipe_id in json.loads(value)["recipe_ids"]]
+
+    def record_use(self, key: str) -> None:
+        """Count one reuse of the entry for key, retiring it once it's used up"""
+        cache_key = self._key(key)
+        with self._lock:
+            value = self.backend.get(cache_key)
+            if value is None:
+                # retired or evicted since it was read
+                return
+            entry = json.loads(value)
+            entry["uses"] += 1
+            remaining_ttl = entry["expires_at"] - time.time()
+            if entry["uses"] >= self.max_reuses or remaining_ttl <= 0:
+                self.backend.delete(cache_key)
+                self._counters["retired"] += 1
+            else:
+                self.backend.set(cache_key, json.dumps(entry).encode(), ttl_seconds=remaining_ttl)
+            self._counters["hits"] += 1
+
+    def set_recipe_ids(self, key: str, recipe_ids: list[UUID]) -> None:
+        entry = {
+            "recipe_ids": [str(recipe_id) for recipe_id in recipe_ids],
+            "uses": 0,
+            "expires_at": time.time() + self.ttl_seconds,
+        }
+        with self._lock:
+            self.backend.set(self._key(key), json.dumps(entry).encode(), ttl_seconds=self.ttl_seconds)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            "hits": counters.get("hits", 0),
+            "misses": counters.get("misses", 0),
+            "retired": counters.get("retired", 0),
+            "backend": self.backend.stats().to_dict(),
+        }
+
+    def _key(self, key: str) -> str:
+        return f"meal-plan:{key}"
+
+
+@lru_cache()
+def get_recipe_cache() -> RecipeCache:
+    """
+    Process-wide recipe cache, configured from the environment:
+    RECIPE_CACHE_MAX_ENTRIES (default 10000) and RECIPE_CACHE_TTL_SECONDS (default 300).
+    """
+    backend = LocalCache(
+        max_entries=int(os.getenv("RECIPE_CACHE_MAX_ENTRIES", "10000")),
+        default_ttl_seconds=float(os.getenv("RECIPE_CACHE_TTL_SECONDS", "300")),
+    )
+    return RecipeCache(backend)
+
+
+@lru_cache()
+def get_meal_plan_cache() -> MealPlanCache:
+    """
+    Process-wide meal plan cache, configured from the environment:
+    MEAL_PLAN_CACHE_MAX_ENTRIES (default 1000), MEAL_PLAN_CACHE_TTL_SECONDS
+    (default 86400) and MEAL_PLAN_CACHE_MAX_REUSES (default 5).
+    """
+    ttl_seconds = float(os.getenv("MEAL_PLAN_CACHE_TTL_SECONDS", "86400"))
+    backend = LocalCache(
+        max_entries=int(os.getenv("MEAL_PLAN_CACHE_MAX_ENTRIES", "1000")),
+        default_ttl_seconds=ttl_seconds,
+    )
+    return MealPlanCache(
+        backend,
+        ttl_seconds=ttl_seconds,
+        max_reuses=int(os.getenv("MEAL_PLAN_CACHE_MAX_REUSES", "5")),
+    )
@@ -1,13 +1,66 @@
+import threading
+import time
 from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.pool import QueuePool
 import os
 from dotenv import load_dotenv
 
+from app.core.metrics import REGISTRY
+
 load_dotenv()
 
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# time spent waiting for a pooled connection, and checkouts that gave up (pool exhausted)
+POOL_CHECKOUT_WAIT = REGISTRY.histogram("db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection")
+_pool_timeouts = 0
+_pool_timeouts_lock = threading.Lock()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout took, through the public connect()"""
+
+    def connect(self):
+        global _pool_timeouts
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            with _pool_timeouts_lock:
+                _pool_timeouts += 1
+            raise
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start)
+
+
+def _engine_options(database_url: str | None) -> dict:
+    """
+    Pool settings from the environment. SQLite keeps SQLAlchemy's defaults since
+    its pools don't take these options.
+
+    DB_POOL_SIZE (5), DB_MAX_OVERFLOW (10), DB_POOL_TIMEOUT seconds (30),
+    DB_POOL_PRE_PING (true), DB_POOL_RECYCLE seconds (1800, -1 to disable) and
+    DB_STATEMENT_TIMEOUT_MS (0 = no timeout, Postgres only).
+    """
+    if not database_url or database_url.startswith("sqlite"):
+        return {}
+    options = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes"),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    }
+    statement_timeout_ms = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+    if statement_timeout_ms and database_url.startswith("postgresql"):
+        options["connect_args"] = {"options": f"-c statement_timeout={statement_timeout_ms}"}
+    return options
+
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **_engine_options(SQLALCHEMY_DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 class Base(DeclarativeBase):
@@ -19,4 +72,20 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+def pool_stats() -> dict:
+    """Current pool occupancy and the checkout wait histogram"""
+    pool = engine.pool
+    stats = {"pool_class": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=pool.overflow(),
+        )
+    with _pool_timeouts_lock:
+        stats["timeouts"] = _pool_timeouts
+    stats["checkout_wait_seconds"] = POOL_CHECKOUT_WAIT.labels().snapshot()
+    return stats
@@ -2,8 +2,11 @@
 Shared dependencies for the application.
 These are singleton services that can be used across multiple service layers.
 """
+import os
 from functools import lru_cache
+import chromadb
 from app.services.llm import LLMService
+from app.shared.constants import RECIPE_COLLECTION
 
 
 @lru_cache()
@@ -18,3 +21,12 @@ def get_llm_service() -> LLMService:
     """
     return LLMService()
 
+
+@lru_cache()
+def get_recipe_collection():
+    """
+    Get or create the recipe embeddings collection in the local vector db.
+    The db lives at CHROMA_PATH (defaults to ./chromadb).
+    """
+    vector_db = chromadb.PersistentClient(path=os.getenv("CHROMA_PATH", "./chromadb"))
+    return vector_db.get_or_create_collection(RECIPE_COLLECTION)
@@ -0,0 +1,154 @@
+"""
+In-process index of recipe ingredients as compact NumPy vectors.
+
+Each recipe is stored as two parallel arrays: int32 codes for its (ingredient_id,
+unit) pairs and float64 quantities. Aggregating a meal plan's grocery list is then a
+concatenate plus a bincount over the codes, with no database round trip once the
+recipes are loaded. Recipes are loaded lazily on first use, bounded by an LRU, and
+dropped on write via invalidate_recipe. The (ingredient_id, unit) codes and names
+outlive the recipes that introduced them, so once there are more than max_keys of
+them the whole index is reset and refilled lazily. The index is per process, so
+writes made by other processes are only picked up once their entries are evicted.
+"""
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from functools import lru_cache
+from uuid import UUID
+
+import numpy as np
+
+# (recipe_id, ingredient_id, ingredient_name, unit, quantity) rows for the requested recipes
+IngredientRowLoader = Callable[[list[UUID]], Iterable[tuple[UUID, UUID, str, str, float]]]
+
+
+class RecipeIngredientIndex:
+    def __init__(self, max_recipes: int = 50_000, max_keys: int = 500_000):
+        self.max_recipes = max_recipes
+        self.max_keys = max_keys
+        self._vectors: OrderedDict[UUID, tuple[np.ndarray, np.ndarray]] = OrderedDict()
+        self._keys: list[tuple[UUID, str]] = []          # code -> (ingredient_id, unit)
+        self._codes: dict[tuple[UUID, str], int] = {}    # (ingredient_id, unit) -> code
+        self._names: dict[UUID, str] = {}
+        self._generation = 0
+        # bumped when the code tables are replaced; codes from an older epoch mean nothing
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0, "evictions": 0, "resets": 0}
+
+    def aggregate(self, recipe_counts: dict[UUID, int], load_rows: IngredientRowLoader) -> list[dict]:
+        """
+        Total quantity per (ingredient, unit) across recipe_counts, each recipe counted
+        as many times as its value. Recipes not in the index are fetched with load_rows
+        (one call for all of them) and added. Returns dicts shaped like the SQL
+        aggregation: ingredient_id, ingredient_name, total_quantity, unit.
+        """
+        vectors, key_table, name_table = self._get_vectors(list(recipe_counts), load_rows)
+        if not vectors:
+            return []
+        codes = np.concatenate([vectors[recipe_id][0] for recipe_id in vectors])
+        quantities = np.concatenate([vectors[recipe_id][1] * recipe_counts[recipe_id] for recipe_id in vectors])
+        totals = np.bincount(codes, weights=quantities)
+        present = np.zeros(len(totals), dtype=bool)
+        present[codes] = True
+
+        # the tables of the epoch the codes came from; a reset replaces them rather
+        # than clearing them, so they stay valid here
+        with self._lock:
+            keys = [key_table[code] for code in np.flatnonzero(present)]
+            names = [name_table[ingredient_id] for ingredient_id, _ in keys]
+        return [
+            {"ingredient_id": ingredient_id, "ingredient_name": name, "total_quantity": float(total), "unit": unit}
+            for (ingredient_id, unit), name, total in zip(keys, names, totals[present])
+        ]
+
+    def invalidate_recipe(self, recipe_id: UUID) -> None:
+        with self._lock:
+            self._vectors.pop(recipe_id, None)
+            self._generation += 1
+            self._stats["invalidations"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "recipes": len(self._vectors), "keys": len(self._keys)}
+
+    def _get_vectors(
+        self,
+        recipe_ids: list[UUID],
+        load_rows: IngredientRowLoader
+    ) -> tuple[dict[UUID, tuple[np.ndarray, np.ndarray]], list[tuple[UUID, str]], dict[UUID, str]]:
+        """Vectors for recipe_ids, with the key and name tables their codes refer to"""
+        with self._lock:
+            if len(self._keys) > self.max_keys:
+                self._reset()
+            epoch = self._epoch
+            vectors = {}
+            for recipe_id in recipe_ids:
+                if recipe_id in self._vectors:
+                    self._vectors.move_to_end(recipe_id)
+                    vectors[recipe_id] = self._vectors[recipe_id]
+            missing = [recipe_id for recipe_id in recipe_ids if recipe_id not in vectors]
+            self._stats["hits"] += len(vectors)
+            self._stats["misses"] += len(missing)
+            generation = self._generation
+            if not missing:
+                return vectors, self._keys, self._names
+
+        # load outside the lock; if a recipe was written meanwhile, use the rows for
+        # this call but don't keep them, since they may predate the write
+        rows_by_recipe = {recipe_id: [] for recipe_id in missing}
+        for recipe_id, ingredient_id, ingredient_name, unit, quantity in load_rows(missing):
+            rows_by_recipe[recipe_id].append((ingredient_id, ingredient_name, unit, quantity))
+
+        with self._lock:
+            if self._epoch == epoch:
+                for recipe_id, rows in rows_by_recipe.items():
+                    if not rows:
+                        continue  # unknown recipe or no ingredients
+                    for ingredient_id, ingredient_name, _, _ in rows:
+                        self._names[ingredient_id] = ingredient_name
+                    vectors[recipe_id] = (
+                        np.fromiter((self._code(ingredient_id, unit) for ingredient_id, _, unit, _ in rows), dtype=np.int32, count=len(rows)),
+                        np.fromiter((quantity for _, _, _, quantity in rows), dtype=np.float64, count=len(rows)),
+                    )
+                    if generation == self._generation:
+                        self._vectors[recipe_id] = vectors[recipe_id]
+                while len(self._vectors) > self.max_recipes:
+                    self._vectors.popitem(last=False)
+                    self._stats["evictions"] += 1
+                return vectors, self._keys, self._names
+        # another call reset the index meanwhile, so the cached vectors above use
+        # codes from the old tables; rare enough to just start over
+        return self._get_vectors(recipe_ids, load_rows)
+
+    def _reset(self) -> None:
+        """Drop every recipe and start new code tables. Call with the lock held."""
+        self._vectors.clear()
+        self._keys = []
+        self._codes = {}
+        self._names = {}
+        self._generation += 1
+        self._epoch += 1
+        self._stats["resets"] += 1
+
+    def _code(self, ingredient_id: UUID, unit: str) -> int:
+        key = (ingredient_id, unit)
+        code = self._codes.get(key)
+        if code is None:
+            code = self._codes[key] = len(self._keys)
+            self._keys.append(key)
+        return code
+
+
+@lru_cache()
+def get_recipe_ingredient_index() -> RecipeIngredientIndex:
+    """
+    Process-wide recipe ingredient index, configured from the environment:
+    RECIPE_INGREDIENT_INDEX_MAX_RECIPES (default 50000) and
+    RECIPE_INGREDIENT_INDEX_MAX_KEYS (default 500000).
+    """
+    return RecipeIngredientIndex(
+        max_recipes=int(os.getenv("RECIPE_INGREDIENT_INDEX_MAX_RECIPES", "50000")),
+        max_keys=int(os.getenv("RECIPE_INGREDIENT_INDEX_MAX_KEYS", "500000")),
+    )
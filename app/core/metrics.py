@@ -0,0 +1,102 @@
+"""
+Lightweight in-process metrics.
+
+Histogram keeps cumulative bucket counts in the Prometheus style (each bucket counts
+observations <= its upper bound), so a snapshot can be rendered or compared without
+keeping individual observations. HistogramFamily groups histograms by label values,
+and REGISTRY renders every family in the Prometheus text exposition format.
+"""
+import threading
+from bisect import bisect_left
+
+# seconds, from sub-millisecond pool checkouts up to slow LLM calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._counts[bisect_left(self.buckets, value)] += 1
+            self._sum += value
+
+    def snapshot(self) -> dict:
+        """{"buckets": {upper bound: cumulative count, ..., "+Inf": count}, "count": n, "sum": total}"""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        cumulative = {}
+        running = 0
+        for bound, count in zip([*map(str, self.buckets), "+Inf"], counts):
+            running += count
+            cumulative[bound] = running
+        return {"buckets": cumulative, "count": running, "sum": total}
+
+
+class HistogramFamily:
+    """Histograms sharing a name and buckets, one per combination of label values"""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._children: dict[tuple[str, ...], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *labelvalues: str) -> Histogram:
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labelvalues}")
+        with self._lock:
+            child = self._children.get(labelvalues)
+            if child is None:
+                child = self._children[labelvalues] = Histogram(self.buckets)
+            return child
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        self.labels(*labelvalues).observe(value)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            children = list(self._children.items())
+        for labelvalues, histogram in children:
+            labels = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labelvalues)]
+            snapshot = histogram.snapshot()
+            for bound, count in snapshot["buckets"].items():
+                bucket_labels = ",".join([*labels, f'le="{bound}"'])
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {count}")
+            suffix = f"{{{','.join(labels)}}}" if labels else ""
+            lines.append(f"{self.name}_sum{suffix} {snapshot['sum']}")
+            lines.append(f"{self.name}_count{suffix} {snapshot['count']}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._families: dict[str, HistogramFamily] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> HistogramFamily:
+        """Register (or return the already registered) histogram family called name"""
+        with self._lock:
+            if name not in self._families:
+                self._families[name] = HistogramFamily(name, documentation, labelnames, buckets)
+            return self._families[name]
+
+    def render_prometheus(self) -> str:
+        with self._lock:
+            families = list(self._families.values())
+        return "\n".join(line for family in families for line in family.render()) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+REGISTRY = Registry()
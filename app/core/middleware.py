@@ -0,0 +1,47 @@
+import time
+from fastapi import Request
+
+from app.core.metrics import REGISTRY
+from app.core.timing import end_request, start_request
+
+REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds", "Wall time per request", ("method", "route", "status")
+)
+REQUEST_DB_STATEMENTS = REGISTRY.histogram(
+    "http_request_db_statements", "SQL statements executed per request", ("method", "route"),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+)
+REQUEST_COMPONENT_DURATION = REGISTRY.histogram(
+    "http_request_component_duration_seconds", "Time per request spent in the db, the LLM and scraping",
+    ("method", "route", "component")
+)
+
+async def timing_middleware(request: Request, call_next):
+    """
+    Time each request and break it down into db, LLM and scrape time. Adds a
+    Server-Timing header and records histograms served at /metrics. For streamed
+    responses the numbers cover the work done before the first byte.
+    """
+    timings, token = start_request()
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        end_request(token)
+    elapsed = time.perf_counter() - start
+
+    route = request.scope.get("route")
+    route_path = route.path if route is not None else "unmatched"
+    REQUEST_DURATION.observe(elapsed, request.method, route_path, str(response.status_code))
+    REQUEST_DB_STATEMENTS.observe(timings.db_statements, request.method, route_path)
+    for component, seconds in timings.seconds.items():
+        REQUEST_COMPONENT_DURATION.observe(seconds, request.method, route_path, component)
+
+    server_timing = [f"app;dur={elapsed * 1000:.1f}"]
+    server_timing.append(f'db;dur={timings.seconds.get("db", 0) * 1000:.1f};desc="{timings.db_statements} queries"')
+    server_timing += [
+        f"{component};dur={seconds * 1000:.1f}"
+        for component, seconds in timings.seconds.items() if component != "db"
+    ]
+    response.headers["Server-Timing"] = ", ".join(server_timing)
+    return response
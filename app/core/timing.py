@@ -0,0 +1,83 @@
+"""
+Per-request timing breakdown.
+
+The timing middleware opens a RequestTimings for each request in a context variable;
+code anywhere below it adds to it with timed()/record(), and SQLAlchemy engine events
+count every statement and its duration. Context variables are copied into threadpool
+calls and asyncio tasks, so sync endpoints and concurrent LLM shards report into the
+request that started them. Outside a request these are no-ops.
+"""
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@dataclass
+class RequestTimings:
+    db_statements: int = 0
+    seconds: dict[str, float] = field(default_factory=lambda: defaultdict(float))  # eg. "db", "llm", "scrape"
+
+
+_current: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+
+
+def start_request() -> tuple[RequestTimings, object]:
+    """Begin collecting for the current request; pass the token to end_request"""
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def end_request(token) -> None:
+    _current.reset(token)
+
+
+def record(name: str, seconds: float) -> None:
+    timings = _current.get()
+    if timings is not None:
+        timings.seconds[name] += seconds
+
+
+@contextmanager
+def timed(name: str):
+    """Add the wall time of the block to the current request under name"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+# the start time lives on the statement's execution context, so a statement that
+# raises (and never reaches after_cursor_execute) leaves nothing behind on the connection
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _record_statement(context)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # failed statements (eg. statement timeouts) still cost the request their time
+    _record_statement(exception_context.execution_context)
+
+
+def _record_statement(context) -> None:
+    start = getattr(context, "_query_start", None)
+    if start is None:
+        return
+    del context._query_start
+    timings = _current.get()
+    if timings is not None:
+        timings.db_statements += 1
+        timings.seconds["db"] += time.perf_counter() - start
@@ -1,6 +1,9 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import recipes, grocery_list, meal_plan
+from fastapi.responses import PlainTextResponse
+from app.api import recipes, grocery_list, meal_plan, instrumentation
+from app.core.metrics import REGISTRY
+from app.core.middleware import timing_middleware
 
 app = FastAPI(
     title="Meal Planner API",
@@ -15,17 +18,27 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# Per-request wall/db/LLM/scrape timing, reported in Server-Timing and at /metrics
+app.middleware("http")(timing_middleware)
+
 # Include routers
 app.include_router(recipes.router, tags=["recipes"])
 app.include_router(grocery_list.router, tags=["grocery-lists"])
 app.include_router(meal_plan.router, tags=["meal-plan"])
+app.include_router(instrumentation.router, tags=["instrumentation"])
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to the Meal Planner API"}
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Request timing histograms in the Prometheus text format"""
+    return PlainTextResponse(REGISTRY.render_prometheus(), media_type="text/plain; version=0.0.4")
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"} 
\ No newline at end of file
@@ -1,5 +1,6 @@
 from app.models.grocery_list import GroceryList
 from app.models.grocery_list_item import GroceryListItem
+from app.models.grocery_list_recipe import GroceryListRecipe
 from app.models.recipe import Recipe
 from app.models.base_model import BaseModel
 from app.models.ingredient import Ingredient
@@ -12,6 +13,7 @@ __all__ = [
     'BaseModel',
     'GroceryList',
     'GroceryListItem',
+    'GroceryListRecipe',
     'Ingredient',
     'Recipe',
     'RecipeIngredient',
@@ -4,4 +4,5 @@ from app.models.base_model import BaseModel
 class GroceryList(BaseModel):
     __tablename__ = "grocery_lists"
 
-    items = relationship("GroceryListItem", back_populates="grocery_list")
\ No newline at end of file
+    items = relationship("GroceryListItem", back_populates="grocery_list")
+    recipes = relationship("GroceryListRecipe", back_populates="grocery_list")
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import String, Float, ForeignKey
+from sqlalchemy import String, Float, ForeignKey, Index, UniqueConstraint
 from app.models.base_model import BaseModel
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 from sqlalchemy.dialects.postgresql import UUID
@@ -6,6 +6,12 @@ import uuid
 
 class GroceryListItem(BaseModel):
     __tablename__ = "grocery_list_items"
+    __table_args__ = (
+        # one row per ingredient and unit, so recipe deltas can be upserted onto it;
+        # also the index for loading a list's items
+        UniqueConstraint("grocery_list_id", "ingredient_id", "unit", name="uq_grocery_list_items_list_ingredient_unit"),
+        Index("ix_grocery_list_items_ingredient_id", "ingredient_id"),
+    )
 
     grocery_list_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("grocery_lists.id"), nullable=False)
     ingredient_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("ingredients.id"), nullable=False)
@@ -0,0 +1,19 @@
+from sqlalchemy import Integer, ForeignKey, Index, UniqueConstraint
+from app.models.base_model import BaseModel
+from sqlalchemy.orm import mapped_column, Mapped, relationship
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+
+class GroceryListRecipe(BaseModel):
+    """How many times a recipe is included in a grocery list, so recipes can be removed exactly"""
+    __tablename__ = "grocery_list_recipes"
+    __table_args__ = (
+        UniqueConstraint("grocery_list_id", "recipe_id", name="uq_grocery_list_recipes_list_recipe"),
+        Index("ix_grocery_list_recipes_recipe_id", "recipe_id"),
+    )
+
+    grocery_list_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("grocery_lists.id"), nullable=False)
+    recipe_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("recipes.id"), nullable=False)
+    quantity: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    grocery_list = relationship("GroceryList", back_populates="recipes")
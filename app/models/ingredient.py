@@ -1,12 +1,30 @@
-from sqlalchemy import String
+from sqlalchemy import Index, String
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 from app.models.base_model import BaseModel
 
+def normalize_ingredient_name(name: str) -> str:
+    """Canonical form used to match ingredient names, eg. " Olive Oil" -> "olive oil"."""
+    return name.strip().lower()
+
+def _normalized_name_default(context) -> str:
+    # Fills normalized_name for ORM adds and Core/bulk inserts that only pass a name
+    return normalize_ingredient_name(context.get_current_parameters()["name"])
+
 class Ingredient(BaseModel):
     __tablename__ = "ingredients"
+    __table_args__ = (
+        # Trigram index so substring searches (LIKE '%garlic%') don't scan the table
+        Index(
+            "ix_ingredients_normalized_name_trgm",
+            "normalized_name",
+            postgresql_using="gin",
+            postgresql_ops={"normalized_name": "gin_trgm_ops"},
+        ),
+    )
 
     name: Mapped[str] = mapped_column(String, index=True, nullable=False)
- 
+    # lower-cased, trimmed name, unique so the same ingredient can't be created twice
+    normalized_name: Mapped[str] = mapped_column(String, index=True, unique=True, nullable=False, default=_normalized_name_default)
 
     # Relationships
     grocery_list_items = relationship("GroceryListItem", back_populates="ingredient")
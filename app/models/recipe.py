@@ -1,9 +1,13 @@
-from sqlalchemy import String, Integer, Text
+from sqlalchemy import Index, String, Integer, Text
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 from app.models.base_model import BaseModel
 
 class Recipe(BaseModel):
     __tablename__ = "recipes"
+    __table_args__ = (
+        # Matches the (name, id) keyset order used to paginate recipes
+        Index("ix_recipes_name_id", "name", "id"),
+    )
 
     name: Mapped[str] = mapped_column(String, index=True, nullable=False)
     prep_instructions: Mapped[str | None] = mapped_column(Text)
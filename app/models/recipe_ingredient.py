@@ -1,4 +1,4 @@
-from sqlalchemy import Enum, Float, ForeignKey
+from sqlalchemy import Enum, Float, ForeignKey, Index
 from app.models.base_model import BaseModel
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 from sqlalchemy.dialects.postgresql import UUID
@@ -7,6 +7,12 @@ from app.schemas.enums import Unit
 
 class RecipeIngredient(BaseModel):
     __tablename__ = "recipe_ingredients"
+    __table_args__ = (
+        # covers loading a recipe's ingredients and grocery aggregation without touching the heap
+        Index("ix_recipe_ingredients_recipe_id", "recipe_id", postgresql_include=["ingredient_id", "quantity", "unit"]),
+        # ingredient -> recipe lookups in ingredient search
+        Index("ix_recipe_ingredients_ingredient_id", "ingredient_id", postgresql_include=["recipe_id"]),
+    )
 
     recipe_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("recipes.id"), nullable=False)
     ingredient_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("ingredients.id"), nullable=False)
@@ -1,26 +1,173 @@
+from collections import Counter
+from sqlalchemy import DateTime, delete, func, insert, literal, select, true, update
 from sqlalchemy.orm import Session, joinedload
-from app.schemas.grocery_list import GroceryListCreate, GroceryList as GroceryListSchema
+from app.schemas.grocery_list import GroceryListCreate, GroceryList as GroceryListSchema, GroceryListItem as GroceryListItemSchema
+from app.schemas.ingredient import Ingredient as IngredientSchema
+from app.models.base_model import utc_now
+from app.models.ingredient import Ingredient
 from app.models.grocery_list import GroceryList
 from app.models.grocery_list_item import GroceryListItem
+from app.models.grocery_list_recipe import GroceryListRecipe
+from app.models.recipe import Recipe
+from app.repositories.ingredients import dialect_insert
+from app.repositories.recipes import aggregated_ingredients_query
 from uuid import UUID
 
-def create_grocery_list(db: Session, grocery_list_create: GroceryListCreate)-> GroceryListSchema:
+def create_grocery_list(db: Session, grocery_list_create: GroceryListCreate, recipe_ids: list[UUID] | None = None)-> GroceryListSchema:
+    """
+    Create a grocery list and its items with one multi-row INSERT ... RETURNING.
+    The response is built from the inserted rows; ingredient names come from the
+    items when the caller has them (eg. from aggregation), otherwise from one lookup.
+    recipe_ids, if the items were aggregated from recipes, are recorded as the list's
+    composition so recipes can later be removed from it; ids of recipes that don't
+    exist are left out (they contribute no items either).
+    """
     # first create a grocery list 
     grocery_list = GroceryList()
     db.add(grocery_list)
     db.flush()  # Get the grocery list ID
+    grocery_list_id = grocery_list.id  # read before commit expires it
 
     # then create the items, associated with grocery list
-    for item in grocery_list_create.items:
-        gl_item = GroceryListItem(grocery_list_id=grocery_list.id, ingredient_id=item.ingredient_id, quantity=item.total_quantity, unit=item.unit)
-        db.add(gl_item)
+    item_rows = []
+    if grocery_list_create.items:
+        item_rows = db.execute(
+            insert(GroceryListItem).returning(*_ITEM_COLUMNS),
+            [
+                {"grocery_list_id": grocery_list_id, "ingredient_id": item.ingredient_id, "quantity": item.total_quantity, "unit": item.unit.value}
+                for item in grocery_list_create.items
+            ]
+        ).all()
+
+    if recipe_ids:
+        _add_existing_recipe_counts(db, grocery_list_id, Counter(recipe_ids))
+
+    ingredient_names = {item.ingredient_id: item.ingredient_name for item in grocery_list_create.items}
+    if None in ingredient_names.values():
+        ingredient_names = _get_ingredient_names(db, ingredient_names)
 
     # then close transaction and return
     db.commit()
+    return _grocery_list_response(grocery_list_id, item_rows, ingredient_names)
 
-    # Eager load items to the grocery list
-    grocery_list = db.query(GroceryList).options(joinedload(GroceryList.items)).get(grocery_list.id)
-    return grocery_list
+def create_grocery_list_for_recipes(db: Session, recipe_ids: list[UUID]) -> GroceryListSchema:
+    """
+    Create a grocery list for recipe_ids (duplicates multiply quantities) with a single
+    INSERT INTO grocery_list_items ... SELECT ... GROUP BY, so the aggregated rows are
+    built in the database and never travel to Python. The inserted items come back
+    via RETURNING, so only their ingredient names need another read. Unknown recipe
+    ids add no items and aren't recorded in the list's composition.
+    """
+    grocery_list = GroceryList()
+    db.add(grocery_list)
+    db.flush()  # Get the grocery list ID
+    grocery_list_id = grocery_list.id  # read before commit expires it
+    if not recipe_ids:
+        db.commit()
+        return _grocery_list_response(grocery_list_id, [], {})
+
+    recipe_counts = Counter(recipe_ids)
+    aggregated = aggregated_ingredients_query(recipe_counts).subquery("aggregated")
+    now = literal(utc_now(), DateTime(timezone=True))
+    item_rows = db.execute(
+        insert(GroceryListItem).from_select(
+            ["id", "grocery_list_id", "ingredient_id", "quantity", "unit", "created_at", "updated_at"],
+            select(
+                _new_uuid(db),
+                literal(grocery_list_id, GroceryListItem.grocery_list_id.type),
+                aggregated.c.ingredient_id,
+                aggregated.c.total_quantity,
+                aggregated.c.unit,
+                now,
+                now
+            )
+        ).returning(*_ITEM_COLUMNS)
+    ).all()
+    _add_existing_recipe_counts(db, grocery_list_id, recipe_counts)
+    ingredient_names = _get_ingredient_names(db, [row.ingredient_id for row in item_rows])
+    db.commit()
+    return _grocery_list_response(grocery_list_id, item_rows, ingredient_names)
+
+def update_grocery_list_recipes(
+    db: Session,
+    grocery_list_id: UUID,
+    add_recipe_ids: list[UUID],
+    remove_recipe_ids: list[UUID]
+) -> GroceryList | None:
+    """
+    Add and remove recipes (repeated ids count multiple times) on an existing grocery
+    list, in one transaction. Only the changed recipes' ingredients are aggregated,
+    and the net quantities are upserted onto the existing items; items that reach
+    zero are deleted. Returns None if the list doesn't exist.
+    Raises ValueError if a recipe doesn't exist or is removed more times than the
+    list includes it.
+
+    The grocery list row is locked (SELECT ... FOR UPDATE) for the transaction, so
+    concurrent updates of the same list are serialized and the over-removal check
+    can't pass on counts another update is about to change.
+    """
+    recipe_counts = Counter(add_recipe_ids)
+    recipe_counts.subtract(Counter(remove_recipe_ids))
+    recipe_counts = {recipe_id: count for recipe_id, count in recipe_counts.items() if count}
+    if not recipe_counts:
+        return get_grocery_list(db, grocery_list_id)
+
+    if db.get(GroceryList, grocery_list_id, with_for_update=True) is None:
+        return None
+
+    try:
+        current_counts = dict(db.execute(
+            select(GroceryListRecipe.recipe_id, GroceryListRecipe.quantity)
+            .where(GroceryListRecipe.grocery_list_id == grocery_list_id, GroceryListRecipe.recipe_id.in_(list(recipe_counts)))
+        ).all())
+        over_removed = [recipe_id for recipe_id, count in recipe_counts.items() if current_counts.get(recipe_id, 0) + count < 0]
+        if over_removed:
+            raise ValueError(f"Recipes not in grocery list often enough to remove: {', '.join(map(str, over_removed))}")
+        added_ids = [recipe_id for recipe_id, count in recipe_counts.items() if count > 0]
+        missing = set(added_ids) - _existing_recipe_ids(db, added_ids)
+        if missing:
+            raise ValueError(f"Recipes not found: {', '.join(map(str, missing))}")
+
+        # upsert the net ingredient delta onto the list's items in one INSERT ... SELECT
+        aggregated = aggregated_ingredients_query(recipe_counts).subquery("aggregated")
+        now = literal(utc_now(), DateTime(timezone=True))
+        upsert = dialect_insert(db, GroceryListItem).from_select(
+            ["id", "grocery_list_id", "ingredient_id", "quantity", "unit", "created_at", "updated_at"],
+            select(
+                _new_uuid(db),
+                literal(grocery_list_id, GroceryListItem.grocery_list_id.type),
+                aggregated.c.ingredient_id,
+                aggregated.c.total_quantity,
+                aggregated.c.unit,
+                now,
+                now
+            # SQLite needs a WHERE to tell the upsert's ON CONFLICT apart from a join constraint
+            ).where(true())
+        )
+        db.execute(upsert.on_conflict_do_update(
+            index_elements=[GroceryListItem.grocery_list_id, GroceryListItem.ingredient_id, GroceryListItem.unit],
+            set_={
+                "quantity": GroceryListItem.quantity + upsert.excluded.quantity,
+                "updated_at": upsert.excluded.updated_at,
+            }
+        ))
+        db.execute(
+            delete(GroceryListItem)
+            .where(GroceryListItem.grocery_list_id == grocery_list_id, GroceryListItem.quantity <= ZERO_QUANTITY)
+        )
+
+        _add_recipe_counts(db, grocery_list_id, recipe_counts)
+        db.execute(
+            delete(GroceryListRecipe)
+            .where(GroceryListRecipe.grocery_list_id == grocery_list_id, GroceryListRecipe.quantity <= 0)
+        )
+        db.execute(update(GroceryList).where(GroceryList.id == grocery_list_id).values(updated_at=utc_now()))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return get_grocery_list(db, grocery_list_id)
 
 def get_grocery_list(db: Session, grocery_list_id: UUID) -> GroceryListSchema | None:
     """Get a grocery list by ID with eager loaded items"""
@@ -31,3 +178,71 @@ def get_grocery_list(db: Session, grocery_list_id: UUID) -> GroceryListSchema |
         .first()
     )
     return grocery_list
+
+
+# quantities left over from float rounding when the last recipe using an ingredient is removed
+ZERO_QUANTITY = 1e-9
+
+_ITEM_COLUMNS = (
+    GroceryListItem.id,
+    GroceryListItem.grocery_list_id,
+    GroceryListItem.ingredient_id,
+    GroceryListItem.quantity,
+    GroceryListItem.unit,
+)
+
+def _add_recipe_counts(db: Session, grocery_list_id: UUID, recipe_counts: dict[UUID, int]) -> None:
+    """Record (or adjust) how many times each recipe is included in the list"""
+    upsert = dialect_insert(db, GroceryListRecipe)
+    db.execute(
+        upsert.on_conflict_do_update(
+            index_elements=[GroceryListRecipe.grocery_list_id, GroceryListRecipe.recipe_id],
+            set_={
+                "quantity": GroceryListRecipe.quantity + upsert.excluded.quantity,
+                "updated_at": upsert.excluded.updated_at,
+            }
+        ),
+        [
+            {"grocery_list_id": grocery_list_id, "recipe_id": recipe_id, "quantity": count}
+            for recipe_id, count in recipe_counts.items()
+        ]
+    )
+
+def _add_existing_recipe_counts(db: Session, grocery_list_id: UUID, recipe_counts: dict[UUID, int]) -> None:
+    """_add_recipe_counts for the recipes that exist; the rest would violate the recipe foreign key"""
+    existing = _existing_recipe_ids(db, list(recipe_counts))
+    recipe_counts = {recipe_id: count for recipe_id, count in recipe_counts.items() if recipe_id in existing}
+    if recipe_counts:
+        _add_recipe_counts(db, grocery_list_id, recipe_counts)
+
+def _existing_recipe_ids(db: Session, recipe_ids: list[UUID]) -> set[UUID]:
+    if not recipe_ids:
+        return set()
+    return set(db.scalars(select(Recipe.id).where(Recipe.id.in_(recipe_ids))))
+
+def _get_ingredient_names(db: Session, ingredient_ids) -> dict[UUID, str]:
+    rows = db.execute(select(Ingredient.id, Ingredient.name).where(Ingredient.id.in_(list(ingredient_ids))))
+    return {row.id: row.name for row in rows}
+
+def _grocery_list_response(grocery_list_id: UUID, item_rows, ingredient_names: dict[UUID, str]) -> GroceryListSchema:
+    """GroceryList schema from inserted item rows, items ordered by ingredient name"""
+    items = [
+        GroceryListItemSchema(
+            id=row.id,
+            grocery_list_id=row.grocery_list_id,
+            ingredient_id=row.ingredient_id,
+            quantity=row.quantity,
+            unit=row.unit,
+            ingredient=IngredientSchema(id=row.ingredient_id, name=ingredient_names[row.ingredient_id])
+        )
+        for row in item_rows
+    ]
+    items.sort(key=lambda item: item.ingredient.name.lower())
+    return GroceryListSchema(id=grocery_list_id, items=items)
+
+def _new_uuid(db: Session):
+    """SQL expression for a fresh row id, for inserts that don't go through the model default"""
+    if db.get_bind().dialect.name == "postgresql":
+        return func.gen_random_uuid()
+    # non-native UUID columns store the 32 hex digits
+    return func.lower(func.hex(func.randomblob(16)))
@@ -1,5 +1,9 @@
+from typing import Iterable
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
-from app.models.ingredient import Ingredient
+from app.models.ingredient import Ingredient, normalize_ingredient_name
 from app.schemas.ingredient import IngredientCreate
 import uuid
 
@@ -7,11 +11,62 @@ def get_by_id(db: Session, id: uuid.UUID) -> Ingredient | None:
     return db.query(Ingredient).filter(Ingredient.id == id).first()
 
 def get_by_name(db: Session, name: str) -> list[Ingredient] | None:
-    return db.query(Ingredient).filter(Ingredient.name.ilike(f"%{name}%")).all()
+    return (
+        db.query(Ingredient)
+        .filter(Ingredient.normalized_name.contains(normalize_ingredient_name(name), autoescape=True))
+        .all()
+    )
 
 def create(db: Session, ingredient_create: IngredientCreate) -> Ingredient:
     ingredient = Ingredient(**ingredient_create.model_dump())
     db.add(ingredient)
     db.commit()
     db.refresh(ingredient)
-    return ingredient
\ No newline at end of file
+    return ingredient
+
+def get_or_create_by_names(db: Session, names: Iterable[str]) -> dict[str, uuid.UUID]:
+    """
+    Resolve ingredient names to ids in bulk, creating any that don't exist yet.
+    Returns a mapping keyed by normalized name (see normalize_ingredient_name).
+
+    Costs one SELECT for the lookup and, when something is missing, one multi-row
+    INSERT. Rows skipped by ON CONFLICT on the unique normalized_name (a concurrent
+    writer got there first) are picked up with a final re-select. Does not commit.
+    """
+    display_names: dict[str, str] = {}
+    for name in names:
+        display_names.setdefault(normalize_ingredient_name(name), name.strip())
+    if not display_names:
+        return {}
+
+    resolved = _get_ids_by_normalized_names(db, display_names.keys())
+    missing = [key for key in display_names if key not in resolved]
+    if not missing:
+        return resolved
+
+    inserted = db.execute(
+        dialect_insert(db, Ingredient)
+        .on_conflict_do_nothing(index_elements=[Ingredient.normalized_name])
+        .returning(Ingredient.id, Ingredient.normalized_name),
+        [{"name": display_names[key]} for key in missing],
+    )
+    for ingredient_id, normalized_name in inserted:
+        resolved[normalized_name] = ingredient_id
+
+    still_missing = [key for key in missing if key not in resolved]
+    if still_missing:
+        resolved.update(_get_ids_by_normalized_names(db, still_missing))
+    return resolved
+
+def _get_ids_by_normalized_names(db: Session, normalized_names: Iterable[str]) -> dict[str, uuid.UUID]:
+    rows = db.execute(
+        select(Ingredient.normalized_name, Ingredient.id)
+        .where(Ingredient.normalized_name.in_(list(normalized_names)))
+    )
+    return {normalized_name: ingredient_id for normalized_name, ingredient_id in rows}
+
+def dialect_insert(db: Session, model):
+    """INSERT construct for the bound dialect, so callers can use ON CONFLICT."""
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite_insert(model)
+    return pg_insert(model)
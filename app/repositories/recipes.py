@@ -1,13 +1,22 @@
 from uuid import UUID
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, or_
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import Integer, Select, String, case, cast, column, func, insert, or_, select, tuple_, values
 from collections import Counter
+from functools import reduce
+from operator import add
+from uuid import uuid4
+import base64
+import json
 
-from app.models.ingredient import Ingredient
+from app.models.ingredient import Ingredient, normalize_ingredient_name
 from app.models.recipe import Recipe
 from app.models.recipe_ingredient import RecipeIngredient
 from app.schemas.recipe import Recipe as RecipeSchema, RecipeCreate
 from app.schemas.grocery_list import IngredientListItem
+from app.schemas.enums import Unit
+from app.repositories.ingredients import get_or_create_by_names
+from app.core.cache import get_recipe_cache
+from app.core.ingredient_index import get_recipe_ingredient_index
 
 def sort_recipe_ingredients_alpha(recipe: Recipe) -> None:
     """
@@ -23,47 +32,90 @@ def create_recipe(db: Session, recipe_create: RecipeCreate) -> RecipeSchema:
     recipe = Recipe(**recipe_data)
     db.add(recipe)
     db.flush()  # Get the recipe ID
-    
-    # Create ingredients and recipe_ingredient relationships
-    for ingredient_data in recipe_create.ingredients:
-        # Check if ingredient already exists by ID first, then by name
-        if hasattr(ingredient_data, 'id') and ingredient_data.id:
-            existing_ingredient = db.query(Ingredient).filter(Ingredient.id == ingredient_data.id).first()
-        else:
-            existing_ingredient = db.query(Ingredient).filter(func.lower(Ingredient.name) == func.lower(ingredient_data.name)).first()
-        
-        if existing_ingredient:
-            ingredient = existing_ingredient
-        else:
-            # Create new ingredient
-            ingredient = Ingredient(name=ingredient_data.name)
-            db.add(ingredient)
-            db.flush()  # Get the ingredient ID
-        
-        # Create recipe_ingredient relationship with quantity and unit
-        recipe_ingredient = RecipeIngredient(
-            recipe_id=recipe.id,
-            ingredient_id=ingredient.id,
-            quantity=ingredient_data.quantity,
-            unit=ingredient_data.unit
+
+    # Resolve every ingredient name in one pass, creating the missing ones
+    ingredient_ids = get_or_create_by_names(db, (i.name for i in recipe_create.ingredients))
+
+    # Create all recipe_ingredient relationships in a single multi-row insert
+    if recipe_create.ingredients:
+        db.execute(
+            insert(RecipeIngredient),
+            [
+                {
+                    "recipe_id": recipe.id,
+                    "ingredient_id": ingredient_ids[normalize_ingredient_name(ingredient_data.name)],
+                    "quantity": ingredient_data.quantity,
+                    "unit": ingredient_data.unit,
+                }
+                for ingredient_data in recipe_create.ingredients
+            ],
         )
-        db.add(recipe_ingredient)
-    
+
     db.commit()
+    get_recipe_cache().invalidate_recipe(recipe.id)
+    get_recipe_ingredient_index().invalidate_recipe(recipe.id)
     db.refresh(recipe)
-    
+
     return recipe
 
-def get_recipes(db: Session, page_number: int = 0, page_size: int = 10) -> list[Recipe]:
-    offset = page_number * page_size
-    recipes = (
+def create_recipes(db: Session, recipe_creates: list[RecipeCreate]) -> list[UUID]:
+    """
+    Bulk counterpart of create_recipe for imports. Ingredient names across the whole
+    batch are resolved in one pass, then recipes and recipe_ingredients are each
+    written with one multi-row insert. Commits, so the batch succeeds or fails as a
+    whole. Returns the new recipe ids in input order.
+    """
+    if not recipe_creates:
+        return []
+
+    ingredient_ids = get_or_create_by_names(
+        db, (ingredient.name for recipe_create in recipe_creates for ingredient in recipe_create.ingredients)
+    )
+
+    # ids are assigned here so recipe_ingredients can reference them without a RETURNING round trip
+    recipe_rows = [
+        {"id": uuid4(), **recipe_create.model_dump(exclude={'ingredients'})}
+        for recipe_create in recipe_creates
+    ]
+    db.execute(insert(Recipe), recipe_rows)
+
+    recipe_ingredient_rows = [
+        {
+            "recipe_id": recipe_row["id"],
+            "ingredient_id": ingredient_ids[normalize_ingredient_name(ingredient_data.name)],
+            "quantity": ingredient_data.quantity,
+            "unit": ingredient_data.unit,
+        }
+        for recipe_row, recipe_create in zip(recipe_rows, recipe_creates)
+        for ingredient_data in recipe_create.ingredients
+    ]
+    if recipe_ingredient_rows:
+        db.execute(insert(RecipeIngredient), recipe_ingredient_rows)
+
+    db.commit()
+    # new recipes have no detail or index entries yet, only the list pages are stale
+    get_recipe_cache().invalidate_pages()
+
+    return [recipe_row["id"] for recipe_row in recipe_rows]
+
+def get_recipes(db: Session, page_size: int = 10, after: tuple[str, UUID] | None = None) -> list[Recipe]:
+    """
+    Fetch a page of recipes ordered by (name, id), starting after the given key.
+    Keyset pagination, so every page costs the same however deep it is. Ingredients
+    are loaded with one selectin query so the limit applies to recipes, not joined rows.
+    """
+    query = (
         db.query(Recipe)
         .options(
-            joinedload(Recipe.recipe_ingredients)
+            selectinload(Recipe.recipe_ingredients)
             .joinedload(RecipeIngredient.ingredient)
         )
-        .order_by(Recipe.name)
-        .offset(offset)
+    )
+    if after is not None:
+        query = query.filter(tuple_(Recipe.name, Recipe.id) > tuple_(*after))
+    recipes = (
+        query
+        .order_by(Recipe.name, Recipe.id)
         .limit(page_size)
         .all()
     )
@@ -75,6 +127,19 @@ def get_recipes(db: Session, page_number: int = 0, page_size: int = 10) -> list[
     
     return recipes
 
+def encode_recipe_cursor(recipe: Recipe) -> str:
+    """Opaque cursor pointing just past the given recipe in get_recipes order."""
+    key = json.dumps([recipe.name, str(recipe.id)])
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+def decode_recipe_cursor(cursor: str) -> tuple[str, UUID]:
+    """Inverse of encode_recipe_cursor. Raises ValueError for malformed cursors."""
+    try:
+        name, recipe_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(name), UUID(recipe_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
 """
 Fetch a single recipe with its ingredients eagerly loaded and sort
 the ingredients by name in Python. SQLAlchemy does not support ordering
@@ -93,6 +158,36 @@ def get_recipe(db: Session, recipe_id: UUID) -> Recipe:
         sort_recipe_ingredients_alpha(recipe)
     return recipe
 
+def get_recipes_by_ids(
+    db: Session,
+    recipe_ids: list[UUID],
+    max_time_minutes: int | None = None
+) -> list[Recipe]:
+    """
+    Fetch recipes by id, preserving the order of recipe_ids (eg. a similarity ranking).
+    Ids that don't exist, or whose total time exceeds max_time_minutes, are dropped.
+    """
+    if not recipe_ids:
+        return []
+    query = (
+        db.query(Recipe)
+        .options(
+            selectinload(Recipe.recipe_ingredients)
+            .joinedload(RecipeIngredient.ingredient)
+        )
+        .filter(Recipe.id.in_(recipe_ids))
+    )
+    if max_time_minutes is not None:
+        # Handle NULL prep_time by treating it as 0
+        total_time = func.coalesce(Recipe.prep_time, 0) + Recipe.cook_time
+        query = query.filter(total_time <= max_time_minutes)
+
+    recipes_by_id = {recipe.id: recipe for recipe in query.all()}
+    recipes = [recipes_by_id[recipe_id] for recipe_id in dict.fromkeys(recipe_ids) if recipe_id in recipes_by_id]
+    for recipe in recipes:
+        sort_recipe_ingredients_alpha(recipe)
+    return recipes
+
 def search_recipes_by_ingredients(
     db: Session,
     ingredient_names: list[str],
@@ -100,97 +195,113 @@ def search_recipes_by_ingredients(
     limit: int = 20
 ) -> list[Recipe]:
     """
-    Search for recipes that contain any of the specified ingredients.
+    Search for recipes that contain any of the specified ingredients, ranked by how
+    many of the requested ingredients each recipe matches (ties broken by name).
     Optionally filter by total time (prep_time + cook_time).
+
+    Ranking, filtering and the limit all run on recipe rows in one query; the
+    ingredients of the returned recipes are then loaded with a single selectin query.
     """
-    # Start with a subquery to find recipe IDs that match ingredients
-    subquery = (
-        db.query(Recipe.id)
-        .distinct()
-        .join(RecipeIngredient, Recipe.id == RecipeIngredient.recipe_id)
-        .join(Ingredient, RecipeIngredient.ingredient_id == Ingredient.id)
-    )
-    
-    # Filter by ingredient names (case-insensitive)
-    if ingredient_names:
-        ingredient_filters = [
-            func.lower(Ingredient.name).ilike(f"%{name.lower()}%")
-            for name in ingredient_names
-        ]
-        subquery = subquery.filter(or_(*ingredient_filters))
-    
-    # Get the matching recipe IDs
-    matching_recipe_ids = [row[0] for row in subquery.all()]
-    
-    if not matching_recipe_ids:
-        return []
-    
-    # Now query the full recipes with their ingredients
     query = (
         db.query(Recipe)
-        .filter(Recipe.id.in_(matching_recipe_ids))
         .options(
-            joinedload(Recipe.recipe_ingredients)
+            selectinload(Recipe.recipe_ingredients)
             .joinedload(RecipeIngredient.ingredient)
         )
     )
-    
+
+    # Rank by matched ingredients (case-insensitive, served by the trigram index)
+    search_terms = list(dict.fromkeys(
+        normalize_ingredient_name(name) for name in ingredient_names if name.strip()
+    ))
+    if search_terms:
+        term_filters = [
+            Ingredient.normalized_name.contains(term, autoescape=True)
+            for term in search_terms
+        ]
+        # One point per requested ingredient, however many of the recipe's rows match it
+        score = reduce(add, [func.max(case((term_filter, 1), else_=0)) for term_filter in term_filters])
+        matches = (
+            select(RecipeIngredient.recipe_id, score.label("score"))
+            .join(Ingredient, RecipeIngredient.ingredient_id == Ingredient.id)
+            .where(or_(*term_filters))
+            .group_by(RecipeIngredient.recipe_id)
+            .subquery()
+        )
+        query = (
+            query.join(matches, matches.c.recipe_id == Recipe.id)
+            .order_by(matches.c.score.desc(), Recipe.name, Recipe.id)
+        )
+    else:
+        query = query.order_by(Recipe.name, Recipe.id)
+
     # Filter by total time if provided
     if max_time_minutes is not None:
         # Handle NULL prep_time by treating it as 0
         total_time = func.coalesce(Recipe.prep_time, 0) + Recipe.cook_time
         query = query.filter(total_time <= max_time_minutes)
-    
+
     recipes = query.limit(limit).all()
-    
+
     # Sort recipe_ingredients by ingredient name for each recipe
     for recipe in recipes:
         sort_recipe_ingredients_alpha(recipe)
-    
+
     return recipes
 
-def get_ingredients_list_for_recipes(db: Session, recipe_ids: list[UUID]) -> list[IngredientListItem]:
+def get_ingredients_list_for_recipes(db: Session, recipe_ids: list[UUID], prefer_index: bool = False) -> list[IngredientListItem]:
     """
     Get aggregated ingredients for a list of recipes.
     Handles duplicate recipe IDs by counting occurrences and multiplying quantities.
-    Returns a list of dictionaries with ingredient name, total quantity, and unit.
+    Returns a list of dictionaries with ingredient id and name, total quantity, and unit.
+
+    With prefer_index, quantities are summed in memory from the recipe ingredient
+    index, which only queries the db for recipes it hasn't loaded yet.
     """
-    from app.models.recipe import Recipe
-    from app.models.ingredient import Ingredient
-    from app.models.recipe_ingredient import RecipeIngredient
-    
-    # Count how many times each recipe_id appears (for multipliers)
-    recipe_counts = Counter(recipe_ids)
-    unique_recipe_ids = list(recipe_counts.keys())
-    
-    # Query RecipeIngredient rows for the unique recipe IDs
-    recipe_ingredients = db.query(
-        RecipeIngredient.recipe_id,
-        RecipeIngredient.ingredient_id,
-        RecipeIngredient.quantity,
-        RecipeIngredient.unit
-    ).join(
-        Recipe, RecipeIngredient.recipe_id == Recipe.id
-    ).filter(
-        Recipe.id.in_(unique_recipe_ids)
-    ).all()
-    
-    # Aggregate quantities, multiplying by the count of each recipe_id
-    aggregated = {}
-    for ri in recipe_ingredients:
-        multiplier = recipe_counts[ri.recipe_id]
-        key = (ri.ingredient_id, ri.unit)
-        
-        if key not in aggregated:
-            aggregated[key] = 0
-        aggregated[key] += ri.quantity * multiplier
-    
-    # Convert to list of dictionaries
-    return [
-        {
-            'ingredient_id': ingredient_id,
-            'total_quantity': total_quantity,
-            'unit': unit
-        }
-        for (ingredient_id, unit), total_quantity in aggregated.items()
-    ]
\ No newline at end of file
+    if not recipe_ids:
+        return []
+    if prefer_index:
+        return get_recipe_ingredient_index().aggregate(
+            Counter(recipe_ids),
+            lambda missing_ids: _get_recipe_ingredient_rows(db, missing_ids)
+        )
+    aggregated = aggregated_ingredients_query(Counter(recipe_ids)).subquery("aggregated")
+    rows = db.execute(
+        select(aggregated, Ingredient.name.label("ingredient_name"))
+        .join(Ingredient, Ingredient.id == aggregated.c.ingredient_id)
+    )
+    return [row._asdict() for row in rows]
+
+def _get_recipe_ingredient_rows(db: Session, recipe_ids: list[UUID]) -> list[tuple]:
+    """(recipe_id, ingredient_id, ingredient_name, unit, quantity) rows for loading the ingredient index"""
+    rows = db.execute(
+        select(RecipeIngredient.recipe_id, RecipeIngredient.ingredient_id, Ingredient.name, RecipeIngredient.unit, RecipeIngredient.quantity)
+        .join(Ingredient, Ingredient.id == RecipeIngredient.ingredient_id)
+        .where(RecipeIngredient.recipe_id.in_(recipe_ids))
+    )
+    return [(recipe_id, ingredient_id, name, unit.value, quantity) for recipe_id, ingredient_id, name, unit, quantity in rows]
+
+def aggregated_ingredients_query(recipe_counts: dict[UUID, int]) -> Select:
+    """
+    (ingredient_id, total_quantity, unit) per ingredient and unit across the recipes
+    in recipe_counts, each counted as many times as its value, as a single GROUP BY.
+    The counts are a VALUES list joined against recipe_ingredients, so every recipe's
+    rows are read once however often it appears; negative counts give the quantities
+    to take away. unit is the Unit value (recipe_ingredients stores the enum name),
+as stored on grocery list items.
+    """
+    recipe_counts = values(
+        column("recipe_id", RecipeIngredient.recipe_id.type),
+        column("multiplier", Integer),
+        name="recipe_counts"
+    ).data(list(recipe_counts.items())).cte("recipe_counts")
+
+    return (
+        select(
+            RecipeIngredient.ingredient_id,
+            func.sum(RecipeIngredient.quantity * recipe_counts.c.multiplier).label("total_quantity"),
+            case({u.name: u.value for u in Unit}, value=cast(RecipeIngredient.unit, String)).label("unit")
+        )
+        .join(recipe_counts, recipe_counts.c.recipe_id == RecipeIngredient.recipe_id)
+        .group_by(RecipeIngredient.ingredient_id, RecipeIngredient.unit)
+    )
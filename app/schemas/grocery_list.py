@@ -23,6 +23,7 @@ class IngredientListItem(BaseModel):
     ingredient_id: UUID = Field(..., description="ID of the ingredient")
     total_quantity: float = Field(..., description="Amount of the ingredient")
     unit: Unit = Field(..., description="Unit of the ingredient")
+    ingredient_name: str | None = Field(None, description="Name of the ingredient, if already known")
 
 class GroceryListCreate(BaseModel):
     items: List[IngredientListItem]
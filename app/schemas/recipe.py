@@ -30,5 +30,24 @@ class Recipe(RecipeBase):
     class Config:
         from_attributes = True  # Allows conversion from SQLAlchemy model
 
+class RecipePage(BaseModel):
+    """A page of recipes plus the cursor for the next one (None on the last page)"""
+    items: List[Recipe]
+    next_cursor: str | None = Field(None, description="Opaque cursor to pass as ?cursor= for the next page")
+
+class RecipeImportError(BaseModel):
+    """A JSON line that couldn't be imported"""
+    line: int = Field(..., description="1-based line number in the import")
+    error: str
+
+class RecipeImportResult(BaseModel):
+    created: int = 0
+    recipe_ids: List[UUID] = []
+    errors: List[RecipeImportError] = []
+
 class ScrapeRecipeRequest(BaseModel):
-    url: str = Field(..., description="URL of the recipe to scrape") 
\ No newline at end of file
+    url: str = Field(..., description="URL of the recipe to scrape")
+
+class ScrapeRecipesRequest(BaseModel):
+    urls: List[str] = Field(..., min_length=1, max_length=500, description="URLs of the recipes to scrape")
+    persist: bool = Field(False, description="Save each scraped recipe and return its id") 
\ No newline at end of file
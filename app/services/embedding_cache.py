@@ -0,0 +1,117 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace and case so trivially different texts share an embedding"""
+    return " ".join(text.split()).casefold()
+
+
+class EmbeddingCache:
+    """
+    Two-tier cache of embeddings keyed by (model, normalized text hash).
+
+    Lookups go to an in-memory LRU first, then to a SQLite file that survives
+    restarts. Vectors are kept as packed float32 in both tiers (about 6 KB per
+    1536-dimension embedding, rather than ~50 KB as a list of floats) and handed
+    out as lists. Both tiers are bounded by entry count; the disk tier evicts the
+    least recently used rows.
+    """
+
+    def __init__(self, path: str, max_memory_entries: int = 2048, max_disk_entries: int = 20_000):
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory: OrderedDict[str, array] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+
+    @staticmethod
+    def key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\n{normalize_text(text)}".encode()).hexdigest()
+
+    def get_many(self, model: str, texts: list[str]) -> list[list[float] | None]:
+        """Cached embeddings in input order, None where there is no entry"""
+        keys = [self.key(model, text) for text in texts]
+        found: dict[str, array] = {}
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+                    self._stats["memory_hits"] += 1
+
+            disk_keys = [key for key in dict.fromkeys(keys) if key not in found]
+            if disk_keys:
+                placeholders = ",".join("?" * len(disk_keys))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", disk_keys
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob)
+                    self._remember(key, found[key])
+                self._stats["disk_hits"] += len(rows)
+                self._stats["misses"] += len(disk_keys) - len(rows)
+                if rows:
+                    self._conn.executemany(
+                        "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                        [(time.time(), key) for key, _ in rows],
+                    )
+                    self._conn.commit()
+        return [found[key].tolist() if key in found else None for key in keys]
+
+    def get(self, model: str, text: str) -> list[float] | None:
+        return self.get_many(model, [text])[0]
+
+    def set_many(self, model: str, texts: list[str], embeddings: list[list[float]]) -> None:
+        now = time.time()
+        rows = []
+        with self._lock:
+            for text, embedding in zip(texts, embeddings):
+                key = self.key(model, text)
+                vector = array("f", embedding)
+                self._remember(key, vector)
+                rows.append((key, vector.tobytes(), now))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)", rows
+            )
+            self._evict_disk()
+            self._conn.commit()
+
+    def set(self, model: str, text: str, embedding: list[float]) -> None:
+        self.set_many(model, [text], [embedding])
+
+    def stats(self) -> dict:
+        with self._lock:
+            disk_size = self._conn.execute("SELECT count(*) FROM embeddings").fetchone()[0]
+            return {**self._stats, "memory_size": len(self._memory), "disk_size": disk_size}
+
+    def _remember(self, key: str, embedding: array) -> None:
+        self._memory[key] = embedding
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self) -> None:
+        excess = self._conn.execute("SELECT count(*) FROM embeddings").fetchone()[0] - self.max_disk_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+            self._stats["evictions"] += excess
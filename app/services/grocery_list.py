@@ -1,18 +1,20 @@
 from uuid import UUID
 from sqlalchemy.orm import Session
+from app.repositories.grocery_list import create_grocery_list, create_grocery_list_for_recipes
 from app.repositories.recipes import get_ingredients_list_for_recipes
-from app.repositories.grocery_list import create_grocery_list
 from app.schemas.grocery_list import GroceryListCreate
 
-def build_grocery_list(db: Session, recipe_ids: list[UUID]):
-    # load all recipe_ingredients from the list of recipe_ids (recipe repo)
+def build_grocery_list(db: Session, recipe_ids: list[UUID], prefer_index: bool = False):
     # (AU TODO) maybe move this in memory to handle discrepancies in units 
     # (e.g. combining teaspoons and tablespoons)
-    ingredients_list = get_ingredients_list_for_recipes(db, recipe_ids)
-
-    # create grocery list with correct ingredient quantities (repo)
-    grocery_list = create_grocery_list(db, GroceryListCreate(items=ingredients_list))
+    if prefer_index:
+        # aggregate in memory from the recipe ingredient index, then bulk insert the items (repo)
+        ingredients_list = get_ingredients_list_for_recipes(db, recipe_ids, prefer_index=True)
+        grocery_list = create_grocery_list(db, GroceryListCreate(items=ingredients_list), recipe_ids=recipe_ids)
+    else:
+        # aggregate the recipes' ingredients and create the grocery list items in one statement (repo)
+        grocery_list = create_grocery_list_for_recipes(db, recipe_ids)
     
-    # return grocery list with eager loaded ingredients ordered alphabetically
+    # return grocery list with ingredients ordered alphabetically
     # (AU TODO) - eventually would be nice to order these primarily by type, e.g. produce, dairy, etc
     return grocery_list
\ No newline at end of file
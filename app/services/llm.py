@@ -1,13 +1,72 @@
+import asyncio
+import logging
 import os
 import json
-from openai import OpenAI
+import time
+from typing import AsyncIterator
+from openai import AsyncOpenAI, OpenAI
 from dotenv import load_dotenv
 from app.schemas.meal_plan import MealPlanRequest
 from app.schemas.recipe import RecipeCreate, RecipeIngredientCreate
-from app.schemas.enums import Unit
+from app.shared.units import parse_unit
+from app.core.timing import record, timed
+from app.services.embedding_cache import EmbeddingCache
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+MEAL_PLAN_SHARD_SIZE = 3       # max recipes per completion
+MEAL_PLAN_SHARD_RETRIES = 2    # retries for a failed shard, independent of the others
+MEAL_PLAN_TOP_UP_ROUNDS = 1    # extra rounds to replace recipes dropped as duplicates
+
+_SHARD_DONE = object()         # queue sentinel: a shard has finished, successfully or not
+
+
+class RecipeStreamParser:
+    """
+    Incrementally pulls the objects of the top-level "recipes" array out of a JSON
+    document that arrives in chunks, eg. {"recipes": [{...}, {...}]}.
+
+    Tracks string/escape state and brace depth, so braces inside strings are ignored;
+    an object is decoded as soon as its closing brace is seen.
+    """
+
+    def __init__(self):
+        self._buffer = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._collecting = False
+
+    def feed(self, chunk: str) -> list[dict]:
+        """Consume the next chunk and return any recipe objects it completed"""
+        completed = []
+        for char in chunk:
+            if self._collecting:
+                self._buffer.append(char)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+                if self._depth == 2:
+                    self._collecting = True
+                    self._buffer = [char]
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 1 and self._collecting:
+                    self._collecting = False
+                    completed.append(json.loads("".join(self._buffer)))
+        return completed
+
+
 class LLMService:
     """Service for interacting with LLM providers to generate meal plans"""
     
@@ -17,33 +76,165 @@ class LLMService:
             raise ValueError("OPENAI_API_KEY environment variable is not set")
         
         self.client = OpenAI(api_key=api_key)
+        self.async_client = AsyncOpenAI(api_key=api_key)
         self.model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
         self.embeddings_model = "text-embedding-3-small"
+        self.embedding_cache = EmbeddingCache(
+            path=os.getenv("EMBEDDING_CACHE_PATH", "./embedding_cache.sqlite3"),
+            max_memory_entries=int(os.getenv("EMBEDDING_CACHE_MEMORY_ENTRIES", "2048")),
+            max_disk_entries=int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "20000")),
+        )
 
     def generate_embedding(self, text: str):
-        res = self.client.embeddings.create(model=self.embeddings_model, input=text)
-        return res.data[0].embedding
+        return self.generate_embeddings([text])[0]
+
+    def generate_embeddings(self, texts: list[str], use_cache: bool = True) -> list[list[float]]:
+        """
+        Embed several texts, returned in input order. Texts already in the embedding
+        cache skip the API; the rest are sent in a single embeddings call.
+        Pass use_cache=False for bulk, one-off texts (eg. re-indexing recipe documents)
+        so they neither read nor evict the cached query embeddings.
+        """
+        if use_cache:
+            embeddings = self.embedding_cache.get_many(self.embeddings_model, texts)
+        else:
+            embeddings = [None] * len(texts)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            with timed("llm"):
+                res = self.client.embeddings.create(model=self.embeddings_model, input=[texts[i] for i in missing])
+            fetched = [item.embedding for item in sorted(res.data, key=lambda item: item.index)]
+            if use_cache:
+                self.embedding_cache.set_many(self.embeddings_model, [texts[i] for i in missing], fetched)
+            for i, embedding in zip(missing, fetched):
+                embeddings[i] = embedding
+        return embeddings
     
-    def generate_meal_plan(self, request: MealPlanRequest):
+    async def generate_meal_plan(self, request: MealPlanRequest):
         """
         Generate a meal plan based on user constraints using an LLM.
         Returns a list of recipes and can optionally create a grocery list.
         """
-        prompt = self._build_meal_plan_prompt(request)
-        
+        with timed("llm"):
+            recipes = [recipe async for recipe in self._fan_out(request, self._generate_shard)]
+
+        # Return a simple object with recipes (RecipeCreate objects)
+        # The service layer will convert these to Recipe objects with IDs
+        from types import SimpleNamespace
+        return SimpleNamespace(recipes=recipes)
+
+    async def stream_meal_plan(self, request: MealPlanRequest) -> AsyncIterator[RecipeCreate]:
+        """
+        Like generate_meal_plan, but each shard is a streamed completion and every
+        recipe is yielded as soon as its JSON object is complete.
+        """
+        # only count time spent generating, not time the caller spends between recipes
+        start = time.perf_counter()
+        async for recipe in self._fan_out(request, self._stream_shard):
+            record("llm", time.perf_counter() - start)
+            yield recipe
+            start = time.perf_counter()
+        record("llm", time.perf_counter() - start)
+
+    async def _fan_out(self, request: MealPlanRequest, shard_source) -> AsyncIterator[RecipeCreate]:
+        """
+        Yield request.num_meals recipes, in arrival order, from concurrent shards.
+
+        The plan is split into shards of at most MEAL_PLAN_SHARD_SIZE recipes, so
+        wall-clock time tracks shard size rather than plan size and no single completion
+        is long enough to get truncated. A failed shard is retried on its own for the
+        recipes it hadn't produced yet. Results are deduplicated by name; if duplicates
+        leave the plan short, the gap is requested again with the taken names excluded.
+
+        shard_source(request, num_recipes, avoid_names, shard) is an async iterator of
+        RecipeCreate for one completion.
+        """
+        taken: set[str] = set()
+        taken_names: list[str] = []
+        for _ in range(1 + MEAL_PLAN_TOP_UP_ROUNDS):
+            num_missing = request.num_meals - len(taken)
+            if num_missing <= 0:
+                return
+
+            queue: asyncio.Queue = asyncio.Queue()
+            shard_sizes = self._shard_sizes(num_missing)
+            tasks = [
+                asyncio.create_task(self._run_shard(
+                    shard_source,
+                    queue,
+                    request,
+                    num_recipes=size,
+                    taken_names=taken_names,
+                    shard=(index + 1, len(shard_sizes))
+                ))
+                for index, size in enumerate(shard_sizes)
+            ]
+            try:
+                running = len(tasks)
+                while running:
+                    item = await queue.get()
+                    if item is _SHARD_DONE:
+                        running -= 1
+                    elif isinstance(item, Exception):
+                        raise item
+                    elif item.name.strip().lower() not in taken:
+                        taken.add(item.name.strip().lower())
+                        taken_names.append(item.name)
+                        yield item
+                        if len(taken) == request.num_meals:
+                            return
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run_shard(
+        self,
+        shard_source,
+        queue: asyncio.Queue,
+        request: MealPlanRequest,
+        num_recipes: int,
+        taken_names: list[str],
+        shard: tuple[int, int]
+    ) -> None:
+        """Feed one shard's recipes into queue, retrying what's left of it on failure"""
+        produced = 0
         try:
-            response = self.client.chat.completions.create(
+            for attempt in range(MEAL_PLAN_SHARD_RETRIES + 1):
+                try:
+                    async for recipe in shard_source(request, num_recipes - produced, list(taken_names), shard):
+                        await queue.put(recipe)
+                        produced += 1
+                        if produced == num_recipes:
+                            return
+                    return
+                except ValueError:
+                    if attempt == MEAL_PLAN_SHARD_RETRIES:
+                        raise
+                    logger.warning("Meal plan shard %s/%s failed, retrying", *shard, exc_info=True)
+        except Exception as e:
+            await queue.put(e)
+        finally:
+            await queue.put(_SHARD_DONE)
+
+    def _shard_sizes(self, num_recipes: int) -> list[int]:
+        """Split num_recipes into near-equal shards of at most MEAL_PLAN_SHARD_SIZE, eg. 7 -> [3, 2, 2]"""
+        num_shards = -(-num_recipes // MEAL_PLAN_SHARD_SIZE)
+        base, extra = divmod(num_recipes, num_shards)
+        return [base + 1 if i < extra else base for i in range(num_shards)]
+
+    async def _generate_shard(
+        self,
+        request: MealPlanRequest,
+        num_recipes: int,
+        avoid_names: list[str],
+        shard: tuple[int, int]
+    ) -> AsyncIterator[RecipeCreate]:
+        """One completion for num_recipes recipes of the plan"""
+        try:
+            response = await self.async_client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a helpful meal planning assistant. You generate detailed, realistic recipes in JSON format. Always return valid JSON that matches the exact schema requested."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+                messages=self._build_meal_plan_messages(request, num_recipes, avoid_names, shard),
                 response_format={"type": "json_object"},
                 temperature=0.7,
                 max_tokens=4000
@@ -57,50 +248,112 @@ class LLMService:
             meal_plan_data = json.loads(content)
             
             # Convert to RecipeCreate objects
-            recipes = []
-            if "recipes" in meal_plan_data:
-                for recipe_data in meal_plan_data["recipes"]:
-                    # Parse ingredients
-                    ingredients = []
-                    if "ingredients" in recipe_data:
-                        for ing in recipe_data["ingredients"]:
-                            # Map unit string to Unit enum
-                            unit_str = ing.get("unit", "each").lower()
-                            unit = self._parse_unit(unit_str)
-                            
-                            ingredients.append(RecipeIngredientCreate(
-                                name=ing.get("name", ""),
-                                quantity=float(ing.get("quantity", 1)),
-                                unit=unit
-                            ))
-                    
-                    recipe = RecipeCreate(
-                        name=recipe_data.get("name", "Unnamed Recipe"),
-                        prep_instructions=recipe_data.get("prep_instructions", ""),
-                        cooking_instructions=recipe_data.get("cooking_instructions", ""),
-                        prep_time=recipe_data.get("prep_time"),
-                        cook_time=recipe_data.get("cook_time"),
-                        servings=recipe_data.get("servings"),
-                        image_url=recipe_data.get("image_url"),
-                        ingredients=ingredients
-                    )
-                    recipes.append(recipe)
-            
-            # Return a simple object with recipes (RecipeCreate objects)
-            # The service layer will convert these to Recipe objects with IDs
-            from types import SimpleNamespace
-            return SimpleNamespace(recipes=recipes)
+            recipes = [
+                self._parse_recipe(recipe_data)
+                for recipe_data in meal_plan_data.get("recipes", [])
+            ]
             
         except json.JSONDecodeError as e:
             raise ValueError(f"Failed to parse LLM response as JSON: {e}")
         except Exception as e:
             raise ValueError(f"Error generating meal plan: {str(e)}")
+
+        for recipe in recipes:
+            yield recipe
+
+    async def _stream_shard(
+        self,
+        request: MealPlanRequest,
+        num_recipes: int,
+        avoid_names: list[str],
+        shard: tuple[int, int]
+    ) -> AsyncIterator[RecipeCreate]:
+        """One streamed completion, yielding each recipe once its JSON object has arrived"""
+        parser = RecipeStreamParser()
+        try:
+            stream = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=self._build_meal_plan_messages(request, num_recipes, avoid_names, shard),
+                response_format={"type": "json_object"},
+                temperature=0.7,
+                max_tokens=4000,
+                stream=True
+            )
+            async for chunk in stream:
+                content = chunk.choices[0].delta.content if chunk.choices else None
+                for recipe_data in parser.feed(content or ""):
+                    yield self._parse_recipe(recipe_data)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Failed to parse LLM response as JSON: {e}")
+        except ValueError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Error generating meal plan: {str(e)}")
+
+    def _build_meal_plan_messages(
+        self,
+        request: MealPlanRequest,
+        num_recipes: int | None = None,
+        avoid_names: list[str] | None = None,
+        shard: tuple[int, int] | None = None
+    ) -> list[dict]:
+        """Chat messages for a meal plan completion"""
+        return [
+            {
+                "role": "system",
+                "content": "You are a helpful meal planning assistant. You generate detailed, realistic recipes in JSON format. Always return valid JSON that matches the exact schema requested."
+            },
+            {
+                "role": "user",
+                "content": self._build_meal_plan_prompt(request, num_recipes, avoid_names, shard)
+            }
+        ]
+
+    def _parse_recipe(self, recipe_data: dict) -> RecipeCreate:
+        """Convert one recipe object from the LLM's JSON into a RecipeCreate"""
+        # Parse ingredients
+        ingredients = []
+        for ing in recipe_data.get("ingredients", []):
+            # Map unit string to Unit enum
+            unit = parse_unit(ing.get("unit") or "each")
+            
+            ingredients.append(RecipeIngredientCreate(
+                name=ing.get("name", ""),
+                quantity=float(ing.get("quantity", 1)),
+                unit=unit
+            ))
+        
+        return RecipeCreate(
+            name=recipe_data.get("name", "Unnamed Recipe"),
+            prep_instructions=recipe_data.get("prep_instructions", ""),
+            cooking_instructions=recipe_data.get("cooking_instructions", ""),
+            prep_time=recipe_data.get("prep_time"),
+            cook_time=recipe_data.get("cook_time"),
+            servings=recipe_data.get("servings"),
+            image_url=recipe_data.get("image_url"),
+            ingredients=ingredients
+        )
     
-    def _build_meal_plan_prompt(self, request: MealPlanRequest) -> str:
-        """Build the prompt for meal plan generation"""
+    def _build_meal_plan_prompt(
+        self,
+        request: MealPlanRequest,
+        num_recipes: int | None = None,
+        avoid_names: list[str] | None = None,
+        shard: tuple[int, int] | None = None
+    ) -> str:
+        """
+        Build the prompt for meal plan generation. num_recipes, avoid_names and shard
+        describe one shard of a larger plan; time budgets still use request.num_meals.
+        """
         constraints = []
         
-        constraints.append(f"Generate exactly {request.num_meals} recipes for a weekly meal plan.")
+        constraints.append(f"Generate exactly {num_recipes or request.num_meals} recipes for a weekly meal plan.")
+
+        if shard and shard[1] > 1:
+            constraints.append(f"This is part {shard[0]} of {shard[1]} of the plan, generated separately from the other parts, so pick dishes that are not the most obvious choices to keep the plan varied.")
+
+        if avoid_names:
+            constraints.append(f"Do not include these recipes, which are already in the plan: {', '.join(avoid_names)}.")
         
         if request.total_time_minutes:
             avg_time = request.total_time_minutes // request.num_meals
@@ -148,53 +401,4 @@ Important:
 - Include all necessary ingredients with realistic quantities"""
         
         return prompt
-    
-    def _parse_unit(self, unit_str: str) -> Unit:
-        """Parse a unit string to Unit enum, with fallback to EACH"""
-        unit_mapping = {
-            "each": Unit.EACH,
-            "cup": Unit.CUP,
-            "cups": Unit.CUP,
-            "tablespoon": Unit.TABLESPOON,
-            "tablespoons": Unit.TABLESPOON,
-            "tbsp": Unit.TABLESPOON,
-            "teaspoon": Unit.TEASPOON,
-            "teaspoons": Unit.TEASPOON,
-            "tsp": Unit.TEASPOON,
-            "gram": Unit.GRAM,
-            "grams": Unit.GRAM,
-            "g": Unit.GRAM,
-            "kilogram": Unit.KILOGRAM,
-            "kilograms": Unit.KILOGRAM,
-            "kg": Unit.KILOGRAM,
-            "ounce": Unit.OUNCE,
-            "ounces": Unit.OUNCE,
-            "oz": Unit.OUNCE,
-            "pound": Unit.POUND,
-            "pounds": Unit.POUND,
-            "lb": Unit.POUND,
-            "lbs": Unit.POUND,
-            "milliliter": Unit.MILLILITER,
-            "milliliters": Unit.MILLILITER,
-            "ml": Unit.MILLILITER,
-            "liter": Unit.LITER,
-            "liters": Unit.LITER,
-            "l": Unit.LITER,
-            "gallon": Unit.GALLON,
-            "gallons": Unit.GALLON,
-            "pint": Unit.PINT,
-            "pints": Unit.PINT,
-            "quart": Unit.QUART,
-            "quarts": Unit.QUART,
-            "can": Unit.CAN,
-            "cans": Unit.CAN,
-            "bunch": Unit.BUNCH,
-            "bunches": Unit.BUNCH,
-            "package": Unit.PACKAGE,
-            "packages": Unit.PACKAGE,
-            "pkg": Unit.PACKAGE,
-        }
-        
-        normalized = unit_str.lower().strip()
-        return unit_mapping.get(normalized, Unit.EACH)
 
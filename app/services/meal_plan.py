@@ -1,76 +1,57 @@
+import hashlib
+import json
+import os
+from typing import AsyncIterator
 from uuid import UUID
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.cache import get_meal_plan_cache
+from app.core.database import SessionLocal
 from app.schemas.meal_plan import MealPlanRequest, MealPlanResponse
 from app.schemas.recipe import Recipe, RecipeCreate
 from app.core.dependencies import get_llm_service
-from app.repositories.recipes import create_recipe, search_recipes_by_ingredients
+from app.repositories.recipes import create_recipe, get_recipes, get_recipes_by_ids, search_recipes_by_ingredients
+from app.services.embedding_cache import normalize_text
 from app.services.grocery_list import build_grocery_list
+from app.services.recipe_embeddings import find_similar_recipe_ids, meal_plan_query_text
+import logging
 import random
 
-def create_meal_plan_with_grocery_list(
-    db: Session,
+logger = logging.getLogger(__name__)
+
+# requests whose total time falls in the same bucket share a meal plan cache entry
+MEAL_PLAN_CACHE_TIME_BUCKET_MINUTES = int(os.getenv("MEAL_PLAN_CACHE_TIME_BUCKET_MINUTES", "30"))
+
+async def create_meal_plan_with_grocery_list(
     request: MealPlanRequest,
     create_grocery_list: bool = True,
     prefer_existing_recipes: bool = True
 ) -> MealPlanResponse:
     """
-    Generate a meal plan by first trying to use existing recipes from the database,
+    Generate a meal plan by first trying to use existing recipes from the database
+    (ingredient matches, then semantically similar recipes from the vector index),
     then using LLM to generate any remaining recipes needed.
+
+    Database work runs in the threadpool on short-lived sessions, and the LLM call is
+    awaited in between, so a slow completion holds neither a worker thread nor a
+    database connection.
+
+    Recipes the LLM generated for an equivalent request are reused from the meal plan
+    cache when they are still in the database and fit the time limit.
     """
-    selected_recipe_ids = []
     selected_recipes = []
-    
-    # Calculate max time per recipe if total time is provided
-    max_time_per_recipe = None
-    if request.total_time_minutes:
-        max_time_per_recipe = request.total_time_minutes // request.num_meals
-    
+
     # Try to find existing recipes from database if preferred
     if prefer_existing_recipes:
-        if request.preferred_ingredients:
-            # Search by preferred ingredients
-            existing_recipes = search_recipes_by_ingredients(
-                db=db,
-                ingredient_names=request.preferred_ingredients,
-                max_time_minutes=max_time_per_recipe,
-                limit=request.num_meals * 2  # Get more than needed for variety
-            )
-        else:
-            # If no preferred ingredients, get all recipes (up to limit)
-            from app.repositories.recipes import get_recipes
-            existing_recipes = get_recipes(
-                db=db,
-                page_number=0,
-                page_size=request.num_meals * 2
-            )
-            # Filter by time if specified
-            if max_time_per_recipe is not None:
-                existing_recipes = [
-                    r for r in existing_recipes
-                    if (r.prep_time or 0) + r.cook_time <= max_time_per_recipe
-                ]
-        
-        # Randomly select up to the requested number of meals
-        if existing_recipes:
-            num_to_select = min(len(existing_recipes), request.num_meals)
-            if num_to_select > 0:
-                if num_to_select == len(existing_recipes):
-                    selected_existing = existing_recipes
-                else:
-                    selected_existing = random.sample(existing_recipes, num_to_select)
-                
-                for recipe_model in selected_existing:
-                    selected_recipe_ids.append(recipe_model.id)
-                    selected_recipes.append(Recipe.model_validate(recipe_model))
-    
+        selected_recipes = await run_in_threadpool(_with_session, select_existing_recipes, request)
+
     # Calculate how many more recipes we need
     num_remaining = request.num_meals - len(selected_recipes)
-    
-    # If we need more recipes, generate them using LLM
+
+    # If we need more recipes, reuse ones generated for an equivalent request or generate them using LLM
+    generated_recipes = []
+    cache_key = None
     if num_remaining > 0:
-        # Get the LLM service (singleton, managed internally by the service layer)
-        llm_service = get_llm_service()
-        
         # Create a modified request for the LLM with remaining count
         llm_request = MealPlanRequest(
             num_meals=num_remaining,
@@ -79,26 +60,260 @@ def create_meal_plan_with_grocery_list(
             dietary_restrictions=request.dietary_restrictions,
             cuisine_preferences=request.cuisine_preferences
         )
-        
-        # Generate meal plan using LLM (returns RecipeCreate objects)
-        llm_response = llm_service.generate_meal_plan(llm_request)
-        
-        # Create the generated recipes in the database
-        for recipe_create in llm_response.recipes:
-            created_recipe_model = create_recipe(db, recipe_create)
-            selected_recipe_ids.append(created_recipe_model.id)
-            # Convert SQLAlchemy model to Pydantic schema
-            selected_recipes.append(Recipe.model_validate(created_recipe_model))
-    
-    # Create grocery list if requested
-    grocery_list_id = None
-    if create_grocery_list and selected_recipe_ids:
-        grocery_list = build_grocery_list(db, selected_recipe_ids)
-        grocery_list_id = str(grocery_list.id)
-    
+        cache_key = meal_plan_cache_key(llm_request)
+        cached_recipes = await run_in_threadpool(
+            _with_session,
+            load_cached_recipes,
+            cache_key,
+            num_remaining,
+            _max_time_per_recipe(request),
+            {recipe.id for recipe in selected_recipes}
+        )
+
+        if cached_recipes:
+            selected_recipes += cached_recipes
+            cache_key = None
+        else:
+            # Get the LLM service (singleton, managed internally by the service layer)
+            llm_service = get_llm_service()
+
+            # Generate meal plan using LLM (returns RecipeCreate objects)
+            llm_response = await llm_service.generate_meal_plan(llm_request)
+            generated_recipes = llm_response.recipes
+
+    # Create the generated recipes and the grocery list in the database
+    created_recipes, grocery_list_id = await run_in_threadpool(
+        _with_session,
+        save_meal_plan,
+        generated_recipes,
+        [recipe.id for recipe in selected_recipes],
+        create_grocery_list
+    )
+    if cache_key and created_recipes:
+        get_meal_plan_cache().set_recipe_ids(cache_key, [recipe.id for recipe in created_recipes])
+
     # Return response with selected recipes (mix of existing and generated) and grocery list ID
     return MealPlanResponse(
-        recipes=selected_recipes,
+        recipes=selected_recipes + created_recipes,
         grocery_list_id=grocery_list_id
     )
 
+async def stream_meal_plan_with_grocery_list(
+    request: MealPlanRequest,
+    create_grocery_list: bool = True,
+    prefer_existing_recipes: bool = True
+) -> AsyncIterator[tuple[str, dict]]:
+    """
+    Streaming variant of create_meal_plan_with_grocery_list. Yields (event, data)
+    pairs as soon as each piece of the plan is ready:
+
+    - ("recipe", {"source": "database" | "cache" | "generated", "recipe": ...}) for
+      every existing recipe first, then for each LLM recipe once it has been persisted
+    - ("grocery_list", {"grocery_list_id": ...}) last, if requested
+    """
+    selected_recipes = []
+    if prefer_existing_recipes:
+        selected_recipes = await run_in_threadpool(_with_session, select_existing_recipes, request)
+    for recipe in selected_recipes:
+        yield "recipe", {"source": "database", "recipe": recipe.model_dump(mode="json")}
+
+    recipe_ids = [recipe.id for recipe in selected_recipes]
+    num_remaining = request.num_meals - len(selected_recipes)
+    if num_remaining > 0:
+        llm_request = request.model_copy(update={"num_meals": num_remaining})
+        cache_key = meal_plan_cache_key(llm_request)
+        cached_recipes = await run_in_threadpool(
+            _with_session,
+            load_cached_recipes,
+            cache_key,
+            num_remaining,
+            _max_time_per_recipe(request),
+            set(recipe_ids)
+        )
+        if cached_recipes:
+            for recipe in cached_recipes:
+                recipe_ids.append(recipe.id)
+                yield "recipe", {"source": "cache", "recipe": recipe.model_dump(mode="json")}
+        else:
+            generated_ids = []
+            async for recipe_create in get_llm_service().stream_meal_plan(llm_request):
+                created_recipe = await run_in_threadpool(_with_session, save_generated_recipe, recipe_create)
+                generated_ids.append(created_recipe.id)
+                yield "recipe", {"source": "generated", "recipe": created_recipe.model_dump(mode="json")}
+            recipe_ids += generated_ids
+            if generated_ids:
+                get_meal_plan_cache().set_recipe_ids(cache_key, generated_ids)
+
+    if create_grocery_list and recipe_ids:
+        grocery_list_id = await run_in_threadpool(_with_session, save_grocery_list, recipe_ids)
+        yield "grocery_list", {"grocery_list_id": grocery_list_id}
+
+def select_existing_recipes(db: Session, request: MealPlanRequest) -> list[Recipe]:
+    """Pick up to request.num_meals existing recipes that fit the request"""
+    selected_recipe_ids = []
+    selected_recipes = []
+
+    # Calculate max time per recipe if total time is provided
+    max_time_per_recipe = _max_time_per_recipe(request)
+
+    query_text = meal_plan_query_text(request)
+    if request.preferred_ingredients:
+        # Search by preferred ingredients
+        existing_recipes = search_recipes_by_ingredients(
+            db=db,
+            ingredient_names=request.preferred_ingredients,
+            max_time_minutes=max_time_per_recipe,
+            limit=request.num_meals * 2  # Get more than needed for variety
+        )
+    elif query_text:
+        # Cuisines/restrictions only: leave it to the semantic stage below
+        existing_recipes = []
+    else:
+        # If no preferences at all, get all recipes (up to limit)
+        existing_recipes = _first_recipes(db, request.num_meals * 2, max_time_per_recipe)
+
+    # Randomly select up to the requested number of meals
+    if existing_recipes:
+        num_to_select = min(len(existing_recipes), request.num_meals)
+        if num_to_select > 0:
+            if num_to_select == len(existing_recipes):
+                selected_existing = existing_recipes
+            else:
+                selected_existing = random.sample(existing_recipes, num_to_select)
+
+            for recipe_model in selected_existing:
+                selected_recipe_ids.append(recipe_model.id)
+                selected_recipes.append(Recipe.model_validate(recipe_model))
+
+    # Fill remaining slots with the nearest recipes in the vector index
+    num_missing = request.num_meals - len(selected_recipes)
+    if num_missing > 0 and query_text:
+        similar_recipes = _find_similar_recipes(db, query_text, num_missing, max_time_per_recipe, exclude_ids=set(selected_recipe_ids))
+        if similar_recipes is None and not request.preferred_ingredients:
+            # No vector index to go by: cuisines/restrictions only fall back to any recipes that fit
+            fallback_recipes = _first_recipes(db, request.num_meals * 2, max_time_per_recipe)
+            similar_recipes = random.sample(fallback_recipes, min(len(fallback_recipes), num_missing))
+        for recipe_model in similar_recipes or []:
+            selected_recipe_ids.append(recipe_model.id)
+            selected_recipes.append(Recipe.model_validate(recipe_model))
+
+    return selected_recipes
+
+def meal_plan_cache_key(request: MealPlanRequest) -> str:
+    """
+    Cache key for the canonical form of a request: lists deduplicated, normalized and
+    sorted, and the total time rounded down to MEAL_PLAN_CACHE_TIME_BUCKET_MINUTES.
+    """
+    def canonical_list(values: list[str] | None) -> list[str]:
+        return sorted({normalize_text(value) for value in values or [] if value.strip()})
+
+    total_time_bucket = None
+    if request.total_time_minutes:
+        total_time_bucket = request.total_time_minutes // MEAL_PLAN_CACHE_TIME_BUCKET_MINUTES
+    canonical = {
+        "num_meals": request.num_meals,
+        "total_time_bucket": total_time_bucket,
+        "preferred_ingredients": canonical_list(request.preferred_ingredients),
+        "dietary_restrictions": canonical_list(request.dietary_restrictions),
+        "cuisine_preferences": canonical_list(request.cuisine_preferences),
+    }
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True).encode()).hexdigest()
+
+def load_cached_recipes(
+    db: Session,
+    cache_key: str,
+    num_recipes: int,
+    max_time_minutes: int | None,
+    exclude_ids: set[UUID]
+) -> list[Recipe] | None:
+    """
+    num_recipes recipes from the meal plan cache entry for cache_key, or None on a miss.
+    Entries whose recipes were deleted, are already in the plan or don't fit this
+    request's (unbucketed) time limit count as misses, and don't use up the entry.
+    """
+    meal_plan_cache = get_meal_plan_cache()
+    recipe_ids = meal_plan_cache.get_recipe_ids(cache_key)
+    if not recipe_ids:
+        return None
+    recipe_ids = [recipe_id for recipe_id in recipe_ids if recipe_id not in exclude_ids]
+    recipe_models = get_recipes_by_ids(db, recipe_ids, max_time_minutes=max_time_minutes)
+    if len(recipe_models) < num_recipes:
+        return None
+    meal_plan_cache.record_use(cache_key)
+    return [Recipe.model_validate(recipe_model) for recipe_model in recipe_models[:num_recipes]]
+
+def save_meal_plan(
+    db: Session,
+    generated_recipes: list[RecipeCreate],
+    existing_recipe_ids: list[UUID],
+    create_grocery_list: bool = True
+) -> tuple[list[Recipe], str | None]:
+    """
+    Persist LLM-generated recipes and, if requested, the grocery list for the whole
+    plan. Returns the created recipes and the grocery list id (or None).
+    """
+    created_recipes = [save_generated_recipe(db, recipe_create) for recipe_create in generated_recipes]
+
+    # Create grocery list if requested
+    grocery_list_id = None
+    recipe_ids = existing_recipe_ids + [recipe.id for recipe in created_recipes]
+    if create_grocery_list and recipe_ids:
+        grocery_list_id = save_grocery_list(db, recipe_ids)
+
+    return created_recipes, grocery_list_id
+
+def save_generated_recipe(db: Session, recipe_create: RecipeCreate) -> Recipe:
+    created_recipe_model = create_recipe(db, recipe_create)
+    # Convert SQLAlchemy model to Pydantic schema
+    return Recipe.model_validate(created_recipe_model)
+
+def save_grocery_list(db: Session, recipe_ids: list[UUID]) -> str:
+    # meal plans reuse a small set of popular recipes, so aggregate from the in-memory index
+    grocery_list = build_grocery_list(db, recipe_ids, prefer_index=True)
+    return str(grocery_list.id)
+
+def _max_time_per_recipe(request: MealPlanRequest) -> int | None:
+    if request.total_time_minutes:
+        return request.total_time_minutes // request.num_meals
+    return None
+
+def _with_session(fn, *args):
+    """Run fn(db, *args) on its own session, closed (and its connection returned) afterwards"""
+    db = SessionLocal()
+    try:
+        return fn(db, *args)
+    finally:
+        db.close()
+
+def _find_similar_recipes(
+    db: Session,
+    query_text: str,
+    num_recipes: int,
+    max_time_minutes: int | None,
+    exclude_ids: set[UUID]
+) -> list:
+    """
+    Up to num_recipes recipes closest to query_text that fit the time limit and
+    aren't already selected. Returns None if the vector index is empty or
+    unavailable, so the caller can fall back to the database or the LLM.
+    """
+    # end the read transaction (eg. from the ingredient search) so its pooled
+    # connection isn't held across the embeddings call and the vector query
+    db.commit()
+    try:
+        # over-fetch since some neighbours get dropped by the time filter or exclusions
+        candidate_ids = find_similar_recipe_ids(query_text, n_results=(num_recipes + len(exclude_ids)) * 4)
+    except Exception:
+        logger.exception("Semantic recipe search failed, falling back to existing recipes or LLM generation")
+        return None
+    if candidate_ids is None:
+        return None
+    candidate_ids = [recipe_id for recipe_id in candidate_ids if recipe_id not in exclude_ids]
+    return get_recipes_by_ids(db, candidate_ids, max_time_minutes=max_time_minutes)[:num_recipes]
+
+def _first_recipes(db: Session, num_recipes: int, max_time_minutes: int | None) -> list:
+    """The first num_recipes recipes by name, less those over the time limit"""
+    recipes = get_recipes(db=db, page_size=num_recipes)
+    if max_time_minutes is not None:
+        recipes = [r for r in recipes if (r.prep_time or 0) + r.cook_time <= max_time_minutes]
+    return recipes
@@ -1,115 +1,82 @@
+import os
 import re
-from typing import List, Optional
-from recipe_scrapers import scrape_me
-from app.schemas.recipe import RecipeIngredientCreate
+from typing import Iterable, List, Optional
+import httpx
+from recipe_scrapers import HEADERS, AbstractScraper, scrape_html
+from app.core.timing import timed
+from app.schemas.recipe import RecipeCreate, RecipeIngredientCreate
 from app.schemas.enums import Unit
+from app.shared.units import UNIT_ALIASES, UNIT_PATTERN
+from app.services.scrape_cache import get_scrape_cache
+
+SCRAPE_TIMEOUT_SECONDS = float(os.getenv("SCRAPE_TIMEOUT_SECONDS", "10"))
+
+
+# vulgar fractions become " n/d" so "1½" reads as the mixed number "1 1/2";
+# the fraction slash and dashes get their ASCII forms
+UNICODE_QUANTITIES = str.maketrans({
+    '½': ' 1/2', '⅓': ' 1/3', '⅔': ' 2/3', '¼': ' 1/4', '¾': ' 3/4',
+    '⅕': ' 1/5', '⅖': ' 2/5', '⅗': ' 3/5', '⅘': ' 4/5', '⅙': ' 1/6',
+    '⅚': ' 5/6', '⅐': ' 1/7', '⅛': ' 1/8', '⅜': ' 3/8', '⅝': ' 5/8',
+    '⅞': ' 7/8', '⅑': ' 1/9', '⅒': ' 1/10',
+    '⁄': '/', '–': '-', '—': '-',
+})
+
+# mixed numbers "1 1/2", fractions "1/2", decimals "2.5" and ".5", whole numbers
+NUMBER_PATTERN = r'\d+\s+\d+/\d+|\d+/\d+|\d*\.\d+|\d+'
+
+# quantity (or a range like "2-3" / "2 to 3"), then an optional unit, then the name
+INGREDIENT_PATTERN = re.compile(
+    rf'^(?P<quantity>{NUMBER_PATTERN})'
+    rf'(?:\s*(?:-|to)\s*(?P<quantity_to>{NUMBER_PATTERN}))?'
+    rf'\s*(?:(?P<unit>{UNIT_PATTERN})\s*)?'
+    r'(?P<name>.*)$',
+    re.IGNORECASE,
+)
 
 
 def parse_ingredient_string(ingredient_str: str) -> Optional[RecipeIngredientCreate]:
     """
-    Parse an ingredient string like "2 cups flour" or "1/2 teaspoon salt"
-    into a RecipeIngredientCreate object.
+    Parse an ingredient string like "2 cups flour", "1/2 teaspoon salt",
+    "1½ tbsp butter" or "2-3 cloves garlic" into a RecipeIngredientCreate object.
     """
-    if not ingredient_str or not ingredient_str.strip():
+    if not ingredient_str:
         return None
-    
-    # Clean up the ingredient string
-    ingredient_str = ingredient_str.strip()
-    
-    # Common unit mappings
-    unit_mappings = {
-        # Volume units
-        'cup': Unit.CUP,
-        'cups': Unit.CUP,
-        'c': Unit.CUP,
-        'tablespoon': Unit.TABLESPOON,
-        'tablespoons': Unit.TABLESPOON,
-        'tbsp': Unit.TABLESPOON,
-        'tbs': Unit.TABLESPOON,
-        'teaspoon': Unit.TEASPOON,
-        'teaspoons': Unit.TEASPOON,
-        'tsp': Unit.TEASPOON,
-        't': Unit.TEASPOON,
-        'pint': Unit.PINT,
-        'pints': Unit.PINT,
-        'pt': Unit.PINT,
-        'quart': Unit.QUART,
-        'quarts': Unit.QUART,
-        'qt': Unit.QUART,
-        'gallon': Unit.GALLON,
-        'gallons': Unit.GALLON,
-        'gal': Unit.GALLON,
-        'liter': Unit.LITER,
-        'liters': Unit.LITER,
-        'l': Unit.LITER,
-        'milliliter': Unit.MILLILITER,
-        'milliliters': Unit.MILLILITER,
-        'ml': Unit.MILLILITER,
-        
-        # Weight units
-        'pound': Unit.POUND,
-        'pounds': Unit.POUND,
-        'lb': Unit.POUND,
-        'lbs': Unit.POUND,
-        'ounce': Unit.OUNCE,
-        'ounces': Unit.OUNCE,
-        'oz': Unit.OUNCE,
-        'gram': Unit.GRAM,
-        'grams': Unit.GRAM,
-        'g': Unit.GRAM,
-        'kilogram': Unit.KILOGRAM,
-        'kilograms': Unit.KILOGRAM,
-        'kg': Unit.KILOGRAM,
-        
-        # Other units
-        'can': Unit.CAN,
-        'cans': Unit.CAN,
-        'bunch': Unit.BUNCH,
-        'bunches': Unit.BUNCH,
-        'package': Unit.PACKAGE,
-        'packages': Unit.PACKAGE,
-        'pkg': Unit.PACKAGE,
-        'each': Unit.EACH,
-        'piece': Unit.EACH,
-        'pieces': Unit.EACH,
-    }
-    
-    # Pattern to match quantity and unit at the beginning
-    # Handles fractions like "1/2", "1 1/2", decimals like "2.5", and whole numbers
-    quantity_pattern = r'^(\d+(?:\s+\d+/\d+)?|\d+/\d+|\d+\.\d+)\s*([a-zA-Z]+)?\s*(.*)$'
-    
-    match = re.match(quantity_pattern, ingredient_str, re.IGNORECASE)
-    
-    if match:
-        quantity_str, unit_str, ingredient_name = match.groups()
-        
-        # Parse quantity (handle fractions and mixed numbers)
-        quantity = parse_quantity(quantity_str)
-        
-        # Parse unit
-        unit = Unit.EACH  # default
-        if unit_str:
-            unit_lower = unit_str.lower()
-            unit = unit_mappings.get(unit_lower, Unit.EACH)
-        
-        # Clean up ingredient name
-        ingredient_name = ingredient_name.strip()
-        if not ingredient_name:
-            # If no ingredient name found, use the whole string as name
-            ingredient_name = ingredient_str
-        
-        return RecipeIngredientCreate(
-            name=ingredient_name,
-            quantity=quantity,
-            unit=unit
-        )
-    else:
+    return _parse_ingredient_line(ingredient_str.strip())
+
+
+def parse_ingredients_batch(lines: Iterable[str]) -> List[RecipeIngredientCreate]:
+    """
+    Parse many ingredient strings in one call (eg. every line of a scraped recipe),
+    skipping blank ones. Every line goes through the same precompiled pattern and
+    unit lexicon, so there's no per-line setup.
+    """
+    parsed_ingredients = []
+    append = parsed_ingredients.append
+    for line in lines:
+        if line:
+            parsed = _parse_ingredient_line(line.strip())
+            if parsed:
+                append(parsed)
+    return parsed_ingredients
+
+
+def _parse_ingredient_line(line: str) -> Optional[RecipeIngredientCreate]:
+    if not line:
+        return None
+
+    text = line if line.isascii() else line.translate(UNICODE_QUANTITIES).lstrip()
+    match = INGREDIENT_PATTERN.match(text)
+    if not match:
         # No quantity/unit found, treat as a single ingredient
-        return RecipeIngredientCreate(
-            name=ingredient_str,
-            quantity=1.0,
-            unit=Unit.EACH
-        )
+        return RecipeIngredientCreate(name=line, quantity=1.0, unit=Unit.EACH)
+
+    # ranges are rounded up to their upper bound, so grocery lists don't come up short
+    quantity = parse_quantity(match['quantity_to'] or match['quantity'])
+    unit = UNIT_ALIASES[match['unit'].lower().rstrip('.')] if match['unit'] else Unit.EACH
+
+    # If no ingredient name found, use the whole string as name
+    return RecipeIngredientCreate(name=match['name'] or line, quantity=quantity, unit=unit)
 
 
 def parse_quantity(quantity_str: str) -> float:
@@ -118,9 +85,9 @@ def parse_quantity(quantity_str: str) -> float:
     
     # Handle mixed numbers like "1 1/2"
     if ' ' in quantity_str and '/' in quantity_str:
-        parts = quantity_str.split(' ')
+        parts = quantity_str.split()
         whole_part = float(parts[0])
-        fraction_part = parse_fraction(parts[1])
+        fraction_part = parse_fraction(parts[-1])
         return whole_part + fraction_part
     
     # Handle fractions like "1/2"
@@ -147,22 +114,52 @@ def parse_ingredients(ingredients_list: List[str]) -> List[RecipeIngredientCreat
     """
     Parse a list of ingredient strings into RecipeIngredientCreate objects.
     """
-    parsed_ingredients = []
-    
-    for ingredient_str in ingredients_list:
-        parsed = parse_ingredient_string(ingredient_str)
-        if parsed:
-            parsed_ingredients.append(parsed)
-    
-    return parsed_ingredients
+    return parse_ingredients_batch(ingredients_list)
 
 
 def scrape_recipe(url: str):
+    """
+    Scrape a recipe, served from the scrape cache while fresh. A stale entry is
+    revalidated with a conditional request, so an unchanged page costs a 304
+    rather than a download and a re-parse. If revalidation fails the stale
+    entry is served instead.
+    """
+    cache = get_scrape_cache()
+    cached = cache.get(url)
+    if cached and cached.is_fresh(cache.ttl_seconds):
+        return cached.recipe
+
     try:
-        scraped = scrape_me(url)
+        with timed("scrape"):
+            response = httpx.get(
+                url,
+                headers={**HEADERS, **(cached.revalidation_headers() if cached else {})},
+                timeout=SCRAPE_TIMEOUT_SECONDS,
+                follow_redirects=True,
+            )
+            if cached and response.status_code == httpx.codes.NOT_MODIFIED:
+                cache.mark_validated(url)
+                return cached.recipe
+            response.raise_for_status()
+            recipe = parse_recipe_html(response.text, url)
     except Exception as e:
+        if cached:
+            return cached.recipe
         return "Sorry, we couldn't scrape the recipe from the URL."
 
+    cache.set(url, recipe, response.headers.get("etag"), response.headers.get("last-modified"))
+    return recipe
+
+
+def parse_recipe_html(html: str, url: str) -> dict:
+    """
+    Parse an already downloaded recipe page. CPU-bound and picklable, so batch
+    scrapes run it in a process pool.
+    """
+    return scraped_recipe(scrape_html(html, org_url=url))
+
+
+def scraped_recipe(scraped: AbstractScraper) -> dict:
     # Parse ingredients into structured format
     parsed_ingredients = parse_ingredients(scraped.ingredients())
     
@@ -174,3 +171,15 @@ def scrape_recipe(url: str):
         "yields": scraped.yields(),
     }
 
+
+def scraped_recipe_to_create(scraped: dict) -> RecipeCreate:
+    """RecipeCreate for a scraped recipe; the total time stands in for cook time"""
+    servings = re.search(r'\d+', scraped.get("yields") or "")
+    return RecipeCreate(
+        name=scraped["name"],
+        ingredients=scraped["ingredients"],
+        cooking_instructions=scraped["cooking_instructions"],
+        cook_time=scraped.get("total_time") or 0,
+        servings=int(servings.group()) if servings else None,
+    )
+
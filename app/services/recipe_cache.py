@@ -0,0 +1,42 @@
+from uuid import UUID
+from sqlalchemy.orm import Session
+from app.core.cache import get_recipe_cache
+from app.repositories.recipes import get_recipe, get_recipes, encode_recipe_cursor, decode_recipe_cursor
+from app.schemas.recipe import Recipe, RecipePage
+
+def get_recipe_json(db: Session, recipe_id: UUID) -> bytes | None:
+    """
+    Read-through cache for the recipe detail response.
+    Returns the serialized Recipe JSON, or None if the recipe doesn't exist.
+    """
+    cache = get_recipe_cache()
+    cached = cache.get_recipe(recipe_id)
+    if cached is not None:
+        return cached
+
+    recipe = get_recipe(db, recipe_id)
+    if recipe is None:
+        return None
+    body = Recipe.model_validate(recipe).model_dump_json().encode()
+    cache.set_recipe(recipe_id, body)
+    return body
+
+def get_recipes_page_json(db: Session, limit: int, cursor: str | None) -> bytes:
+    """
+    Read-through cache for a page of the recipe list, keyed by (limit, cursor).
+    Raises ValueError for a malformed cursor.
+    """
+    after = decode_recipe_cursor(cursor) if cursor else None
+
+    cache = get_recipe_cache()
+    page_key = cache.page_key(limit, cursor)
+    cached = cache.get_page(page_key)
+    if cached is not None:
+        return cached
+
+    # Fetch one extra row to know whether there is a next page
+    recipes = get_recipes(db, page_size=limit + 1, after=after)
+    next_cursor = encode_recipe_cursor(recipes[limit - 1]) if len(recipes) > limit else None
+    body = RecipePage(items=recipes[:limit], next_cursor=next_cursor).model_dump_json().encode()
+    cache.set_page(page_key, body)
+    return body
@@ -0,0 +1,72 @@
+import hashlib
+import os
+from uuid import UUID
+from app.core.dependencies import get_llm_service, get_recipe_collection
+from app.models.recipe import Recipe
+from app.schemas.meal_plan import MealPlanRequest
+
+# Squared L2 distance (chroma's default) between unit-length OpenAI embeddings is
+# 2 - 2 * cosine similarity, so 0.9 keeps matches with cosine similarity >= 0.55
+SIMILARITY_MAX_DISTANCE = float(os.getenv("SIMILARITY_MAX_DISTANCE", "0.9"))
+
+def recipe_document(recipe: Recipe) -> str:
+    """
+    Canonical text representation of a recipe for embedding.
+    Only depends on recipe content (never object identity or row order), so the same
+    recipe always produces the same document and therefore the same content hash.
+    """
+    ingredients = sorted(
+        (ri.ingredient.name.strip().lower(), ri.quantity, ri.unit.value)
+        for ri in recipe.recipe_ingredients
+    )
+    lines = [recipe.name.strip(), "", "Ingredients:"]
+    lines.extend(f"- {quantity:g} {unit} {name}" for name, quantity, unit in ingredients)
+    if recipe.prep_instructions:
+        lines.extend(["", "Preparation:", recipe.prep_instructions.strip()])
+    lines.extend(["", "Instructions:", recipe.cooking_instructions.strip()])
+    return "\n".join(lines)
+
+def content_hash(document: str, embeddings_model: str) -> str:
+    """Hash of the document and the model that embeds it; a change in either needs a re-embed"""
+    return hashlib.sha256(f"{embeddings_model}\n{document}".encode()).hexdigest()
+
+def meal_plan_query_text(request: MealPlanRequest) -> str | None:
+    """
+    Text to embed for a semantic recipe search, built from the request's preferences.
+    Returns None when the request has nothing to search on.
+    """
+    parts = []
+    if request.cuisine_preferences:
+        parts.append(f"Cuisine: {', '.join(request.cuisine_preferences)}")
+    if request.dietary_restrictions:
+        parts.append(f"Diet: {', '.join(request.dietary_restrictions)}")
+    if request.preferred_ingredients:
+        parts.append(f"Ingredients: {', '.join(request.preferred_ingredients)}")
+    return "\n".join(parts) if parts else None
+
+def find_similar_recipe_ids(
+    query_text: str,
+    n_results: int,
+    max_distance: float = SIMILARITY_MAX_DISTANCE,
+) -> list[UUID] | None:
+    """
+    Nearest recipes to query_text in the recipe vector index, closest first.
+    Matches further than max_distance are dropped, since the index always returns
+    its n nearest neighbours however unrelated they are. Returns None if nothing
+    is indexed yet.
+    """
+    collection = get_recipe_collection()
+    indexed = collection.count()
+    if indexed == 0:
+        return None
+    embedding = get_llm_service().generate_embedding(query_text)
+    result = collection.query(
+        query_embeddings=[embedding],
+        n_results=min(n_results, indexed),
+        include=["distances"],
+    )
+    return [
+        UUID(recipe_id)
+        for recipe_id, distance in zip(result["ids"][0], result["distances"][0])
+        if distance <= max_distance
+    ]
@@ -0,0 +1,66 @@
+import logging
+from typing import Iterable
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.repositories.recipes import create_recipes
+from app.schemas.recipe import RecipeCreate, RecipeImportError, RecipeImportResult
+
+logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK_SIZE = 500  # recipes written per transaction
+
+def import_recipes(
+    db: Session,
+    lines: Iterable[str | bytes],
+    chunk_size: int = IMPORT_CHUNK_SIZE
+) -> RecipeImportResult:
+    """
+    Create recipes from JSON lines, one RecipeCreate object per line (blank lines
+    are skipped). Valid records are written chunk_size at a time; a line that fails
+    validation or can't be written is reported in the result by line number and
+    the rest of the import carries on.
+    """
+    result = RecipeImportResult()
+    chunk: list[tuple[int, RecipeCreate]] = []
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            chunk.append((line_number, RecipeCreate.model_validate_json(line)))
+        except ValidationError as e:
+            result.errors.append(RecipeImportError(line=line_number, error=_validation_message(e)))
+            continue
+        if len(chunk) >= chunk_size:
+            _load_chunk(db, chunk, result)
+            chunk = []
+
+    if chunk:
+        _load_chunk(db, chunk, result)
+    return result
+
+def _load_chunk(db: Session, chunk: list[tuple[int, RecipeCreate]], result: RecipeImportResult) -> None:
+    try:
+        recipe_ids = create_recipes(db, [recipe_create for _, recipe_create in chunk])
+    except SQLAlchemyError as e:
+        db.rollback()
+        if len(chunk) == 1:
+            line_number, _ = chunk[0]
+            result.errors.append(RecipeImportError(line=line_number, error=str(getattr(e, "orig", None) or e)))
+            return
+        # retry the records one by one so a single bad row only fails itself
+        logger.warning("Recipe import chunk of %d failed, retrying per record: %s", len(chunk), e)
+        for record in chunk:
+            _load_chunk(db, [record], result)
+        return
+
+    result.created += len(recipe_ids)
+    result.recipe_ids.extend(recipe_ids)
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}" if detail["loc"] else detail["msg"]
+        for detail in error.errors()
+    )
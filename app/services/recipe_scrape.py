@@ -0,0 +1,134 @@
+"""
+Batch recipe scraping.
+
+Pages are downloaded concurrently on the event loop with httpx, bounded overall
+and per host so one site isn't hammered by a bookmark folder full of its URLs.
+Parsing is CPU-bound, so it runs in a process pool instead of blocking the loop.
+Results are yielded in completion order. Like scrape_recipe, fresh pages are
+served from the scrape cache and stale ones revalidated with conditional requests.
+"""
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import AsyncIterator
+from urllib.parse import urlsplit
+
+import httpx
+from recipe_scrapers import HEADERS
+from starlette.concurrency import run_in_threadpool
+
+from app.core.database import SessionLocal
+from app.repositories.recipes import create_recipe
+from app.services.recipe import SCRAPE_TIMEOUT_SECONDS, parse_recipe_html, scraped_recipe_to_create
+from app.services.scrape_cache import get_scrape_cache
+
+logger = logging.getLogger(__name__)
+
+SCRAPE_MAX_CONCURRENCY = int(os.getenv("SCRAPE_MAX_CONCURRENCY", "16"))  # downloads in flight overall
+SCRAPE_MAX_PER_HOST = int(os.getenv("SCRAPE_MAX_PER_HOST", "2"))  # downloads in flight per host
+
+
+@lru_cache()
+def get_scrape_parse_pool() -> ProcessPoolExecutor:
+    """
+    Process-wide pool for parsing scraped pages, sized by SCRAPE_PARSE_WORKERS
+    (default: the number of CPUs).
+    """
+    workers = os.getenv("SCRAPE_PARSE_WORKERS")
+    return ProcessPoolExecutor(max_workers=int(workers) if workers else None)
+
+
+async def scrape_recipes(urls: list[str], persist: bool = False) -> AsyncIterator[dict]:
+    """
+    Scrape every url (duplicates once each), yielding as each one finishes:
+
+        {"url": ..., "recipe": {...} | None, "recipe_id": UUID | None, "error": str | None}
+
+    With persist, each scraped recipe is saved through create_recipe and its id returned.
+    A failed url only produces an error entry; the rest carry on.
+    """
+    overall_limit = asyncio.Semaphore(SCRAPE_MAX_CONCURRENCY)
+    host_limits = defaultdict(lambda: asyncio.Semaphore(SCRAPE_MAX_PER_HOST))
+
+    async with httpx.AsyncClient(
+        headers=HEADERS,
+        timeout=SCRAPE_TIMEOUT_SECONDS,
+        follow_redirects=True,
+        limits=httpx.Limits(max_connections=SCRAPE_MAX_CONCURRENCY),
+    ) as client:
+        tasks = [
+            asyncio.create_task(
+                _scrape_one(client, url, overall_limit, host_limits[urlsplit(url).hostname], persist)
+            )
+            for url in dict.fromkeys(urls)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # the consumer went away (eg. the client disconnected); don't keep fetching
+            for task in tasks:
+                task.cancel()
+            # let the cancellations land before the client closes underneath them
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _scrape_one(
+    client: httpx.AsyncClient,
+    url: str,
+    overall_limit: asyncio.Semaphore,
+    host_limit: asyncio.Semaphore,
+    persist: bool
+) -> dict:
+    result = {"url": url, "recipe": None, "recipe_id": None, "error": None}
+    try:
+        result["recipe"] = await _fetch_recipe(client, url, overall_limit, host_limit)
+        if persist:
+            result["recipe_id"] = await run_in_threadpool(_save_scraped_recipe, result["recipe"])
+    except Exception as e:
+        logger.info("Couldn't scrape %s: %s", url, e)
+        result["error"] = f"{e.__class__.__name__}: {e}"
+    return result
+
+
+async def _fetch_recipe(
+    client: httpx.AsyncClient,
+    url: str,
+    overall_limit: asyncio.Semaphore,
+    host_limit: asyncio.Semaphore
+) -> dict:
+    # the cache is a SQLite file, keep its disk I/O off the event loop
+    cache = get_scrape_cache()
+    cached = await run_in_threadpool(cache.get, url)
+    if cached and cached.is_fresh(cache.ttl_seconds):
+        return cached.recipe
+
+    try:
+        async with host_limit, overall_limit:
+            response = await client.get(url, headers=cached.revalidation_headers() if cached else None)
+        if cached and response.status_code == httpx.codes.NOT_MODIFIED:
+            await run_in_threadpool(cache.mark_validated, url)
+            return cached.recipe
+        response.raise_for_status()
+    except httpx.HTTPError as e:
+        if cached is None:
+            raise
+        # the origin is down or erroring; a stale recipe beats no recipe
+        logger.info("Revalidating %s failed, serving the stale cached recipe: %s", url, e)
+        return cached.recipe
+
+    loop = asyncio.get_running_loop()
+    recipe = await loop.run_in_executor(get_scrape_parse_pool(), parse_recipe_html, response.text, url)
+    await run_in_threadpool(cache.set, url, recipe, response.headers.get("etag"), response.headers.get("last-modified"))
+    return recipe
+
+
+def _save_scraped_recipe(scraped: dict):
+    db = SessionLocal()
+    try:
+        return create_recipe(db, scraped_recipe_to_create(scraped)).id
+    finally:
+        db.close()
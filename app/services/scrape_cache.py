@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from fastapi.encoders import jsonable_encoder
+
+from app.schemas.recipe import RecipeIngredientCreate
+
+# query parameters that only track where a click came from, never change the page
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "ref_src"}
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of a recipe URL so trivially different links share an entry:
+    lowercased scheme and host, no default port, fragment or tracking parameters,
+    and the remaining query parameters sorted.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name.lower() not in TRACKING_PARAMS and not name.lower().startswith("utm_")
+    )
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+@dataclass
+class CachedScrape:
+    recipe: dict
+    etag: str | None
+    last_modified: str | None
+    validated_at: float
+
+    def is_fresh(self, ttl_seconds: float) -> bool:
+        return time.time() - self.validated_at < ttl_seconds
+
+    def revalidation_headers(self) -> dict[str, str]:
+        """Conditional request headers, so an unchanged page comes back as a bodiless 304"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ScrapeCache:
+    """
+    Scraped recipes keyed by normalized URL, in a SQLite file that survives restarts.
+
+    Alongside the parsed recipe each entry keeps the page's ETag/Last-Modified.
+    Entries younger than ttl_seconds are served as-is; older ones should be
+    revalidated with a conditional request (see CachedScrape.revalidation_headers)
+    and either marked validated on a 304 or replaced. The stored recipes are capped
+    at max_bytes in total, evicting the least recently used.
+
+    Reads don't write: last-used times are buffered in memory and flushed with the
+    next write (or every TOUCH_FLUSH_SIZE reads), and the total size is kept as a
+    running count, so eviction never re-sums the table. Calls block on disk I/O;
+    async callers should run them in the threadpool.
+    """
+
+    TOUCH_FLUSH_SIZE = 256
+
+    def __init__(self, path: str, ttl_seconds: float = 86_400, max_bytes: int = 64 * 1024 * 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "stale": 0, "misses": 0, "revalidated": 0, "evictions": 0}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS scrapes (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                recipe TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                validated_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_scrapes_last_used ON scrapes (last_used)")
+        self._conn.commit()
+        self._pending_touches: dict[str, float] = {}
+        self._total_bytes = self._conn.execute("SELECT coalesce(sum(size), 0) FROM scrapes").fetchone()[0]
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(normalize_url(url).encode()).hexdigest()
+
+    def get(self, url: str) -> CachedScrape | None:
+        """The cached entry for url, fresh or not (check is_fresh), or None"""
+        key = self.key(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT recipe, etag, last_modified, validated_at FROM scrapes WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            self._pending_touches[key] = time.time()
+            if len(self._pending_touches) >= self.TOUCH_FLUSH_SIZE:
+                self._flush_touches()
+                self._conn.commit()
+            recipe, etag, last_modified, validated_at = row
+            cached = CachedScrape(self._load_recipe(recipe), etag, last_modified, validated_at)
+            self._stats["hits" if cached.is_fresh(self.ttl_seconds) else "stale"] += 1
+            return cached
+
+    def set(self, url: str, recipe: dict, etag: str | None = None, last_modified: str | None = None) -> None:
+        now = time.time()
+        key = self.key(url)
+        payload = json.dumps(jsonable_encoder(recipe))
+        with self._lock:
+            replaced = self._conn.execute("SELECT size FROM scrapes WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO scrapes (key, url, recipe, size, etag, last_modified, validated_at, last_used)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (key, normalize_url(url), payload, len(payload), etag, last_modified, now, now),
+            )
+            self._pending_touches.pop(key, None)
+            self._total_bytes += len(payload) - (replaced[0] if replaced else 0)
+            self._evict()
+            self._conn.commit()
+
+    def mark_validated(self, url: str) -> None:
+        """The origin answered 304 Not Modified: the entry is fresh for another ttl"""
+        with self._lock:
+            self._conn.execute("UPDATE scrapes SET validated_at = ? WHERE key = ?", (time.time(), self.key(url)))
+            self._flush_touches()
+            self._conn.commit()
+            self._stats["revalidated"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT count(*) FROM scrapes").fetchone()[0]
+            return {**self._stats, "entries": entries, "bytes": self._total_bytes}
+
+    def _flush_touches(self) -> None:
+        if self._pending_touches:
+            self._conn.executemany(
+                "UPDATE scrapes SET last_used = ? WHERE key = ?",
+                [(last_used, key) for key, last_used in self._pending_touches.items()],
+            )
+            self._pending_touches.clear()
+
+    def _evict(self) -> None:
+        """Flush buffered touches; if over max_bytes, drop least recently used entries. Caller commits."""
+        self._flush_touches()
+        if self._total_bytes <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in self._conn.execute("SELECT key, size FROM scrapes ORDER BY last_used"):
+            if self._total_bytes <= self.max_bytes:
+                break
+            evicted.append((key,))
+            self._total_bytes -= size
+        self._conn.executemany("DELETE FROM scrapes WHERE key = ?", evicted)
+        self._stats["evictions"] += len(evicted)
+
+    @staticmethod
+    def _load_recipe(payload: str) -> dict:
+        recipe = json.loads(payload)
+        recipe["ingredients"] = [RecipeIngredientCreate(**ingredient) for ingredient in recipe["ingredients"]]
+        return recipe
+
+
+@lru_cache()
+def get_scrape_cache() -> ScrapeCache:
+    """
+    Process-wide scrape cache, configured from the environment: SCRAPE_CACHE_PATH
+    (default ./scrape_cache.sqlite3), SCRAPE_CACHE_TTL_SECONDS (default 86400) and
+    SCRAPE_CACHE_MAX_BYTES (default 64 MiB).
+    """
+    return ScrapeCache(
+        path=os.getenv("SCRAPE_CACHE_PATH", "./scrape_cache.sqlite3"),
+        ttl_seconds=float(os.getenv("SCRAPE_CACHE_TTL_SECONDS", "86400")),
+        max_bytes=int(os.getenv("SCRAPE_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    )
@@ -0,0 +1,68 @@
+"""
+Unit lexicon shared by everything that turns free text into a Unit: the scraped
+ingredient parser and LLM recipe output.
+"""
+import re
+
+from app.schemas.enums import Unit
+
+# lowercase spelling -> Unit; every canonical Unit value is included
+UNIT_ALIASES: dict[str, Unit] = {
+    **{unit.value: unit for unit in Unit},
+
+    # Volume units
+    'cups': Unit.CUP,
+    'c': Unit.CUP,
+    'tablespoons': Unit.TABLESPOON,
+    'tbsp': Unit.TABLESPOON,
+    'tbsps': Unit.TABLESPOON,
+    'tbs': Unit.TABLESPOON,
+    'teaspoons': Unit.TEASPOON,
+    'tsp': Unit.TEASPOON,
+    'tsps': Unit.TEASPOON,
+    't': Unit.TEASPOON,
+    'pints': Unit.PINT,
+    'pt': Unit.PINT,
+    'quarts': Unit.QUART,
+    'qt': Unit.QUART,
+    'gallons': Unit.GALLON,
+    'gal': Unit.GALLON,
+    'liters': Unit.LITER,
+    'litre': Unit.LITER,
+    'litres': Unit.LITER,
+    'l': Unit.LITER,
+    'milliliters': Unit.MILLILITER,
+    'millilitre': Unit.MILLILITER,
+    'millilitres': Unit.MILLILITER,
+    'ml': Unit.MILLILITER,
+
+    # Weight units
+    'pounds': Unit.POUND,
+    'lb': Unit.POUND,
+    'lbs': Unit.POUND,
+    'ounces': Unit.OUNCE,
+    'oz': Unit.OUNCE,
+    'grams': Unit.GRAM,
+    'g': Unit.GRAM,
+    'kilograms': Unit.KILOGRAM,
+    'kg': Unit.KILOGRAM,
+
+    # Other units
+    'cans': Unit.CAN,
+    'bunches': Unit.BUNCH,
+    'packages': Unit.PACKAGE,
+    'pkg': Unit.PACKAGE,
+    'piece': Unit.EACH,
+    'pieces': Unit.EACH,
+}
+
+# regex alternation matching any alias as a whole word (optionally abbreviated with
+# a dot), longest first so "cups" wins over "cup" and "c"; compile with re.IGNORECASE
+UNIT_PATTERN = (
+    r"(?:" + "|".join(re.escape(alias) for alias in sorted(UNIT_ALIASES, key=len, reverse=True)) + r")\.?(?![a-z])"
+)
+
+
+def parse_unit(unit_str: str, default: Unit = Unit.EACH) -> Unit:
+    """Unit for a spelling like "Tbsp." or "cups", falling back to default"""
+    return UNIT_ALIASES.get(unit_str.strip().lower().rstrip('.'), default)
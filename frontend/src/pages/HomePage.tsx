@@ -10,6 +10,9 @@ const HomePage = () => {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [currentPage, setCurrentPage] = useState(1);
+  // cursors[i] is the cursor that loads page i + 1 (the first page has none)
+  const [pageCursors, setPageCursors] = useState<(string | null)[]>([null]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [selectedRecipes, setSelectedRecipes] = useState<SelectedRecipes>({});
   const [creatingGroceryList, setCreatingGroceryList] = useState(false);
   
@@ -22,9 +25,10 @@ const HomePage = () => {
   const fetchRecipes = async () => {
     try {
       setLoading(true);
-      const skip = (currentPage - 1) * recipesPerPage;
-      const data = await recipeAPI.getRecipes(skip, recipesPerPage);
-      setRecipes(data);
+      const cursor = pageCursors[currentPage - 1] ?? null;
+      const data = await recipeAPI.getRecipes(cursor, recipesPerPage);
+      setRecipes(data.items);
+      setNextCursor(data.next_cursor);
     } catch (err) {
       setError('Failed to fetch recipes');
       console.error('Error fetching recipes:', err);
@@ -33,6 +37,13 @@ const HomePage = () => {
     }
   };
 
+  const handlePageChange = (page: number) => {
+    if (page > currentPage && nextCursor) {
+      setPageCursors(prev => [...prev.slice(0, page - 1), nextCursor]);
+    }
+    setCurrentPage(page);
+  };
+
   const handleSelectRecipe = (recipeId: string, isSelected: boolean) => {
     setSelectedRecipes(prev => ({
       ...prev,
@@ -122,8 +133,8 @@ const HomePage = () => {
 
       <Pagination
         currentPage={currentPage}
-        onPageChange={setCurrentPage}
-        hasMore={recipes.length === recipesPerPage}
+        onPageChange={handlePageChange}
+        hasMore={nextCursor !== null}
       />
     </div>
   );
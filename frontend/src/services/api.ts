@@ -1,5 +1,5 @@
 import axios from 'axios';
-import type { Recipe, RecipeCreate, GroceryList, CreateGroceryListRequest } from '../types';
+import type { Recipe, RecipeCreate, RecipePage, GroceryList, CreateGroceryListRequest } from '../types';
 
 const API_BASE_URL = 'http://localhost:8000';
 
@@ -12,9 +12,11 @@ const apiClient = axios.create({
 
 // Recipe API endpoints
 export const recipeAPI = {
-  // Get all recipes with pagination
-  getRecipes: async (skip: number = 0, limit: number = 20): Promise<Recipe[]> => {
-    const response = await apiClient.get(`/recipes/?skip=${skip}&limit=${limit}`);
+  // Get a page of recipes; pass the previous page's next_cursor to continue
+  getRecipes: async (cursor: string | null = null, limit: number = 20): Promise<RecipePage> => {
+    const response = await apiClient.get('/recipes/', {
+      params: { limit, ...(cursor ? { cursor } : {}) },
+    });
     return response.data;
   },
 
@@ -26,6 +26,11 @@ export interface Recipe {
   recipe_ingredients: RecipeIngredient[];
 }
 
+export interface RecipePage {
+  items: Recipe[];
+  next_cursor: string | null;
+}
+
 export interface RecipeCreate {
   name: string;
   prep_instructions?: string;
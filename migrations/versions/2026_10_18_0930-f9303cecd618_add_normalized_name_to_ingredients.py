@@ -0,0 +1,77 @@
+"""add normalized_name to ingredients
+
+Revision ID: f9303cecd618
+Revises: 378c2d5f4d1c
+Create Date: 2026-10-18 09:30:12.418207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f9303cecd618'
+down_revision: Union[str, None] = '378c2d5f4d1c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def normalize_name(name: str) -> str:
+    # Same as app.models.ingredient.normalize_ingredient_name at this revision. Done
+    # in Python because btrim()/lower() don't strip or fold the same characters as
+    # str.strip()/str.lower(), and the rows must get the keys new inserts will compute.
+    return name.strip().lower()
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    op.add_column('ingredients', sa.Column('normalized_name', sa.String(), nullable=True))
+    connection = op.get_bind()
+    rows = connection.execute(sa.text("SELECT id, name FROM ingredients")).all()
+    if rows:
+        connection.execute(
+            sa.text("UPDATE ingredients SET normalized_name = :normalized_name WHERE id = :id"),
+            [{"id": row.id, "normalized_name": normalize_name(row.name)} for row in rows],
+        )
+
+    # Merge ingredients that only differ by case/whitespace into the oldest row
+    # before the unique index goes on
+    op.execute("""
+        CREATE TEMPORARY TABLE ingredient_merges ON COMMIT DROP AS
+        SELECT id AS duplicate_id, keeper_id
+        FROM (
+            SELECT id,
+                   first_value(id) OVER (PARTITION BY normalized_name ORDER BY created_at, id) AS keeper_id
+            FROM ingredients
+        ) ranked
+        WHERE id <> keeper_id
+    """)
+    op.execute("""
+        UPDATE recipe_ingredients ri SET ingredient_id = m.keeper_id
+        FROM ingredient_merges m WHERE ri.ingredient_id = m.duplicate_id
+    """)
+    op.execute("""
+        UPDATE grocery_list_items gli SET ingredient_id = m.keeper_id
+        FROM ingredient_merges m WHERE gli.ingredient_id = m.duplicate_id
+    """)
+    op.execute("DELETE FROM ingredients i USING ingredient_merges m WHERE i.id = m.duplicate_id")
+
+    op.alter_column('ingredients', 'normalized_name', nullable=False)
+    op.create_index(op.f('ix_ingredients_normalized_name'), 'ingredients', ['normalized_name'], unique=True)
+    op.create_index(
+        'ix_ingredients_normalized_name_trgm',
+        'ingredients',
+        ['normalized_name'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'normalized_name': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ingredients_normalized_name_trgm', table_name='ingredients', postgresql_using='gin')
+    op.drop_index(op.f('ix_ingredients_normalized_name'), table_name='ingredients')
+    op.drop_column('ingredients', 'normalized_name')
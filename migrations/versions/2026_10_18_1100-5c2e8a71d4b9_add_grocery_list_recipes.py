@@ -0,0 +1,64 @@
+"""add grocery_list_recipes and unique grocery list items per ingredient and unit
+
+Revision ID: 5c2e8a71d4b9
+Revises: 9f3b6e3f36d3
+Create Date: 2026-10-18 11:00:12.431857
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2e8a71d4b9'
+down_revision: Union[str, None] = '9f3b6e3f36d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('grocery_list_recipes',
+    sa.Column('grocery_list_id', sa.UUID(), nullable=False),
+    sa.Column('recipe_id', sa.UUID(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['grocery_list_id'], ['grocery_lists.id'], ),
+    sa.ForeignKeyConstraint(['recipe_id'], ['recipes.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('grocery_list_id', 'recipe_id', name='uq_grocery_list_recipes_list_recipe')
+    )
+
+    # fold any duplicate (list, ingredient, unit) items into one row before adding the constraint
+    op.execute(
+        """
+        UPDATE grocery_list_items AS keep
+        SET quantity = totals.quantity
+        FROM (
+            SELECT min(id::text)::uuid AS id, sum(quantity) AS quantity
+            FROM grocery_list_items
+            GROUP BY grocery_list_id, ingredient_id, unit
+            HAVING count(*) > 1
+        ) AS totals
+        WHERE keep.id = totals.id
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM grocery_list_items AS dup
+        USING grocery_list_items AS keep
+        WHERE dup.grocery_list_id = keep.grocery_list_id
+          AND dup.ingredient_id = keep.ingredient_id
+          AND dup.unit = keep.unit
+          AND dup.id::text > keep.id::text
+        """
+    )
+    op.create_unique_constraint('uq_grocery_list_items_list_ingredient_unit', 'grocery_list_items', ['grocery_list_id', 'ingredient_id', 'unit'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_grocery_list_items_list_ingredient_unit', 'grocery_list_items', type_='unique')
+    op.drop_table('grocery_list_recipes')
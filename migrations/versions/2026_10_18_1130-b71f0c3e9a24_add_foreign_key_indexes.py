@@ -0,0 +1,43 @@
+"""add covering indexes on foreign keys of recipe_ingredients, grocery_list_items and grocery_list_recipes
+
+Revision ID: b71f0c3e9a24
+Revises: 5c2e8a71d4b9
+Create Date: 2026-10-18 11:30:41.208735
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b71f0c3e9a24'
+down_revision: Union[str, None] = '5c2e8a71d4b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns, included columns)
+INDEXES = [
+    ('ix_recipe_ingredients_recipe_id', 'recipe_ingredients', ['recipe_id'], ['ingredient_id', 'quantity', 'unit']),
+    ('ix_recipe_ingredients_ingredient_id', 'recipe_ingredients', ['ingredient_id'], ['recipe_id']),
+    ('ix_grocery_list_items_ingredient_id', 'grocery_list_items', ['ingredient_id'], []),
+    ('ix_grocery_list_recipes_recipe_id', 'grocery_list_recipes', ['recipe_id'], []),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY so writes to these tables aren't blocked while the indexes build;
+    # it can't run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns, include in INDEXES:
+            op.create_index(
+                name, table, columns, unique=False,
+                postgresql_include=include, postgresql_concurrently=True, if_not_exists=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
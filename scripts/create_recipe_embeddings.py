@@ -1,41 +1,157 @@
-import chromadb
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import add_project_root_to_path
+
+add_project_root_to_path()
+
 from dotenv import load_dotenv
+from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
 
 from app.core.database import SessionLocal
-from app.core.dependencies import get_llm_service
-from app.shared.constants import RECIPE_COLLECTION
+from app.core.dependencies import get_llm_service, get_recipe_collection
 from app.repositories.recipes import get_recipes
+from app.services.recipe_embeddings import recipe_document, content_hash
 
 load_dotenv()
 
-def create_recipe_embeddings():
+EMBED_BATCH_SIZE = 100        # texts per embeddings.create call (the API accepts lists)
+MAX_CONCURRENT_REQUESTS = 4   # embeddings calls in flight at once
+UPSERT_BATCH_SIZE = 1000      # embeddings written to chroma per upsert
+SCAN_PAGE_SIZE = 5000         # ids read per page when looking for deleted recipes
+MAX_RETRIES = 5
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError)
+
+def iter_recipe_pages(db, page_size: int):
+    """Stream every recipe in (name, id) order, one keyset page at a time"""
+    after = None
+    while True:
+        recipes = get_recipes(db=db, page_size=page_size, after=after)
+        if not recipes:
+            return
+        yield recipes
+        after = (recipes[-1].name, recipes[-1].id)
+
+def embed_with_retry(llm_service, texts: list[str]) -> list[list[float]]:
+    """Embed a batch, backing off exponentially (with jitter) on transient API errors"""
+    for attempt in range(MAX_RETRIES):
+        try:
+            # recipe documents are embedded once per change, keep them out of the query cache
+            return llm_service.generate_embeddings(texts, use_cache=False)
+        except RETRYABLE_ERRORS as e:
+            if attempt == MAX_RETRIES - 1:
+                raise
+            delay = 2 ** attempt + random.random()
+            print(f"⚠️  Embedding batch failed ({e.__class__.__name__}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+def chunked(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def is_up_to_date(metadata: dict | None, recipe_hash: str, updated_at: str) -> bool:
+    return bool(metadata) and metadata.get("content_hash") == recipe_hash and metadata.get("updated_at") == updated_at
+
+def delete_stale_embeddings(collection, live_ids: set[str]) -> int:
+    """Remove embeddings for recipes that no longer exist in the db"""
+    stale_ids = []
+    offset = 0
+    while True:
+        ids = collection.get(include=[], limit=SCAN_PAGE_SIZE, offset=offset)["ids"]
+        if not ids:
+            break
+        stale_ids.extend(id for id in ids if id not in live_ids)
+        offset += len(ids)
+    for batch in chunked(stale_ids, UPSERT_BATCH_SIZE):
+        collection.delete(ids=batch)
+    return len(stale_ids)
+
+def create_recipe_embeddings(
+    batch_size: int = EMBED_BATCH_SIZE,
+    concurrency: int = MAX_CONCURRENT_REQUESTS,
+    reembed: bool = False,
+):
+    """
+    Incrementally sync the recipe vector index with the db.
+    Only recipes whose content hash or updated_at differ from the stored metadata
+    (or that aren't indexed yet) are embedded; deleted recipes are removed.
+    """
     # connect to OpenAI to generate embeddings for recipes
     llm_service = get_llm_service()
 
     # connect to local vector db
-    vector_db = chromadb.PersistentClient(path="./chromadb")
-    collection = vector_db.get_or_create_collection(RECIPE_COLLECTION)
+    collection = get_recipe_collection()
 
     db = SessionLocal()
+    pending_upsert = {"ids": [], "embeddings": [], "documents": [], "metadatas": []}
+    live_ids = set()
+    embedded_count = 0
+    unchanged_count = 0
+
+    def flush_upserts():
+        if pending_upsert["ids"]:
+            collection.upsert(**pending_upsert)
+            print(f"Upserted {len(pending_upsert['ids'])} recipe embeddings")
+            for values in pending_upsert.values():
+                values.clear()
 
     try:
-        # do an initial query of all recipes in db
-        recipes = get_recipes(db=db, page_number=0, page_size=1000)
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            # one page keeps every worker busy with a full batch
+            for recipes in iter_recipe_pages(db, page_size=batch_size * concurrency):
+                changed = {}
+                stored = collection.get(ids=[str(recipe.id) for recipe in recipes], include=["metadatas"])
+                stored_metadata = dict(zip(stored["ids"], stored["metadatas"]))
 
-        for recipe in recipes:
-            text_representation = f"{recipe.name}\n{recipe.cooking_instructions}\n{recipe.recipe_ingredients}"
+                for recipe in recipes:
+                    recipe_id = str(recipe.id)
+                    live_ids.add(recipe_id)
+                    document = recipe_document(recipe)
+                    metadata = {
+                        "content_hash": content_hash(document, llm_service.embeddings_model),
+                        "updated_at": recipe.updated_at.isoformat(),
+                    }
+                    if not reembed and is_up_to_date(stored_metadata.get(recipe_id), metadata["content_hash"], metadata["updated_at"]):
+                        unchanged_count += 1
+                        continue
+                    changed[recipe_id] = (document, metadata)
+                if not changed:
+                    continue
 
-            embedding = llm_service.generate_embedding(text=text_representation)
+                id_batches = list(chunked(list(changed), batch_size))
+                embedding_batches = executor.map(
+                    lambda ids: embed_with_retry(llm_service, [changed[id][0] for id in ids]),
+                    id_batches,
+                )
+                for ids, embeddings in zip(id_batches, embedding_batches):
+                    pending_upsert["ids"].extend(ids)
+                    pending_upsert["embeddings"].extend(embeddings)
+                    pending_upsert["documents"].extend(changed[id][0] for id in ids)
+                    pending_upsert["metadatas"].extend(changed[id][1] for id in ids)
+                    embedded_count += len(ids)
 
-            collection.add(ids=[str(recipe.id)], embeddings=[embedding], documents=[text_representation])
+                if len(pending_upsert["ids"]) >= UPSERT_BATCH_SIZE:
+                    flush_upserts()
 
-            print(f"Successfully added recipe {recipe.id}:{recipe.name}")
+        flush_upserts()
+        deleted_count = delete_stale_embeddings(collection, live_ids)
+        print(f"✅ Embedded {embedded_count} recipes, {unchanged_count} unchanged, removed {deleted_count} deleted")
 
     except Exception as e:
+        # anything already upserted stays in the index, so a re-run resumes from here
+        flush_upserts()
         print(f"❌ Error embedding recipes: {e}")
         db.rollback()
     finally:
         db.close()
 
 if __name__ == "__main__":
-    create_recipe_embeddings() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Sync recipe embeddings in the vector db with the recipes table")
+    parser.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE, help="texts per embeddings request")
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENT_REQUESTS, help="embeddings requests in flight")
+    parser.add_argument("--reembed", action="store_true", help="re-embed every recipe, even unchanged ones")
+    args = parser.parse_args()
+
+    create_recipe_embeddings(batch_size=args.batch_size, concurrency=args.concurrency, reembed=args.reembed)
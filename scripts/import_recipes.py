@@ -0,0 +1,38 @@
+import argparse
+import sys
+
+from utils import add_project_root_to_path
+
+add_project_root_to_path()
+
+from dotenv import load_dotenv
+
+from app.core.database import SessionLocal
+from app.services.recipe_import import IMPORT_CHUNK_SIZE, import_recipes
+
+load_dotenv()
+
+def import_recipes_file(path: str, chunk_size: int = IMPORT_CHUNK_SIZE):
+    """Import a JSON lines file of RecipeCreate objects ('-' reads stdin)"""
+    db = SessionLocal()
+    source = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        result = import_recipes(db, source, chunk_size=chunk_size)
+        for error in result.errors:
+            print(f"⚠️  Line {error.line}: {error.error}")
+        print(f"✅ Imported {result.created} recipes, {len(result.errors)} failed")
+    except Exception as e:
+        print(f"❌ Error importing recipes: {e}")
+        db.rollback()
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import recipes from a JSON lines file of RecipeCreate objects")
+    parser.add_argument("path", help="JSON lines file to import, or - for stdin")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE, help="recipes written per transaction")
+    args = parser.parse_args()
+
+    import_recipes_file(args.path, chunk_size=args.chunk_size)
@@ -0,0 +1,92 @@
+from types import SimpleNamespace
+import json
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+import app.models  # noqa: F401 - registers every model on Base.metadata
+from app.core.cache import LocalCache, MealPlanCache
+from app.core import database
+from app.core.database import Base
+from app.main import app
+from app.schemas.enums import Unit
+from app.schemas.recipe import RecipeCreate, RecipeIngredientCreate
+from app.services import meal_plan as meal_plan_service
+
+def generated_recipe(name: str) -> RecipeCreate:
+    return RecipeCreate(
+        name=name,
+        cooking_instructions="Cook.",
+        cook_time=20,
+        ingredients=[RecipeIngredientCreate(name="Tomato", quantity=2, unit=Unit.EACH)],
+    )
+
+class StubLLM:
+    """Records how many database sessions were open whenever the LLM was awaited"""
+
+    def __init__(self, open_sessions: list):
+        self.open_sessions = open_sessions
+        self.sessions_open_during_llm = []
+
+    async def generate_meal_plan(self, request):
+        self.sessions_open_during_llm.append(len(self.open_sessions))
+        return SimpleNamespace(recipes=[generated_recipe(f"Dish {i}") for i in range(request.num_meals)])
+
+    async def stream_meal_plan(self, request):
+        for i in range(request.num_meals):
+            self.sessions_open_during_llm.append(len(self.open_sessions))
+            yield generated_recipe(f"Dish {i}")
+
+@pytest.fixture
+def llm(monkeypatch):
+    # the service runs its sessions in the threadpool
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    open_sessions = []
+
+    class TrackedSession(Session):
+        def __init__(self):
+            super().__init__(bind=engine)
+            open_sessions.append(self)
+
+        def close(self):
+            if self in open_sessions:
+                open_sessions.remove(self)
+            super().close()
+
+    stub = StubLLM(open_sessions)
+    # get_db too, so a request-scoped session added to the routes would be counted
+    monkeypatch.setattr(database, "SessionLocal", TrackedSession)
+    monkeypatch.setattr(meal_plan_service, "SessionLocal", TrackedSession)
+    monkeypatch.setattr(meal_plan_service, "get_llm_service", lambda: stub)
+    monkeypatch.setattr(meal_plan_service, "get_meal_plan_cache", lambda: MealPlanCache(LocalCache()))
+    monkeypatch.setattr(meal_plan_service, "find_similar_recipe_ids", lambda query_text, n_results: [])
+    yield stub
+    assert open_sessions == []
+    engine.dispose()
+
+def test_generate_meal_plan_route(llm):
+    response = TestClient(app).post("/meal-plan/generate", json={"num_meals": 2, "cuisine_preferences": ["Italian"]})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [recipe["name"] for recipe in body["recipes"]] == ["Dish 0", "Dish 1"]
+    assert all(recipe["id"] for recipe in body["recipes"])
+    assert body["grocery_list_id"]
+    # no request-scoped session was held across the LLM call
+    assert llm.sessions_open_during_llm == [0]
+
+def test_stream_meal_plan_route(llm):
+    with TestClient(app).stream("POST", "/meal-plan/generate/stream", json={"num_meals": 2}) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [
+            (event.split("\n")[0].removeprefix("event: "), json.loads(event.split("\n")[1].removeprefix("data: ")))
+            for event in response.read().decode().strip().split("\n\n")
+        ]
+
+    assert [event for event, _ in events] == ["recipe", "recipe", "grocery_list", "done"]
+    assert [(data["source"], data["recipe"]["name"]) for _, data in events[:2]] == [("generated", "Dish 0"), ("generated", "Dish 1")]
+    assert events[2][1]["grocery_list_id"]
+    assert llm.sessions_open_during_llm == [0, 0]
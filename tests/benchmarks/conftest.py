@@ -0,0 +1,159 @@
+"""
+Shared fixtures for the opt-in benchmark suite:
+
+    pytest -m benchmark -s tests/benchmarks
+
+A synthetic catalogue (BENCHMARK_RECIPES recipes over BENCHMARK_INGREDIENTS
+ingredients) is seeded once per session into a throwaway SQLite file, or into
+BENCHMARK_DATABASE_URL (a scratch Postgres database; its tables are dropped
+afterwards). Every timing recorded through the `benchmark` fixture is written to
+BENCHMARK_OUTPUT (default benchmark-results.json) with the commit it ran against,
+so results can be compared across commits.
+"""
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import time
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.database import Base
+from app.models.ingredient import Ingredient
+from app.models.recipe import Recipe
+from app.models.recipe_ingredient import RecipeIngredient
+from app.schemas.enums import Unit
+
+NUM_RECIPES = int(os.getenv("BENCHMARK_RECIPES", "10000"))
+NUM_INGREDIENTS = int(os.getenv("BENCHMARK_INGREDIENTS", "5000"))
+INGREDIENTS_PER_RECIPE = (6, 14)
+SEED_BATCH_SIZE = 5_000
+
+WORDS = [
+    "garlic", "onion", "tomato", "basil", "chicken", "rice", "lemon", "ginger", "butter", "flour",
+    "pepper", "spinach", "cumin", "beans", "cheese", "pasta", "salmon", "thyme", "carrot", "honey",
+]
+
+
+class Catalogue:
+    def __init__(self, engine, recipe_ids: list[uuid.UUID], recipe_names: list[str], ingredient_names: list[str]):
+        self.engine = engine
+        self.session_factory = sessionmaker(bind=engine, autoflush=False)
+        self.recipe_ids = recipe_ids
+        self.recipe_names = recipe_names        # in (name, id) keyset order
+        self.ingredient_names = ingredient_names
+
+    def session(self) -> Session:
+        return self.session_factory()
+
+
+class BenchmarkRecorder:
+    def __init__(self):
+        self.results = []
+
+    def __call__(self, name: str, fn, iterations: int = 100, items_per_call: int = 1, **params) -> dict:
+        """Run fn iterations times (after one warm-up call) and record per-call timings"""
+        fn()
+        durations = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            fn()
+            durations.append(time.perf_counter() - start)
+        durations.sort()
+        result = {
+            "name": name,
+            "params": params,
+            "iterations": iterations,
+            "mean_ms": statistics.fmean(durations) * 1000,
+            "min_ms": durations[0] * 1000,
+            "p50_ms": durations[len(durations) // 2] * 1000,
+            "p95_ms": durations[min(len(durations) - 1, int(len(durations) * 0.95))] * 1000,
+            "items_per_second": items_per_call * len(durations) / sum(durations),
+        }
+        self.results.append(result)
+        print(f"\n{name} {params or ''}: mean {result['mean_ms']:.3f}ms, p95 {result['p95_ms']:.3f}ms, {result['items_per_second']:.0f} items/s")
+        return result
+
+
+def _seed(engine) -> Catalogue:
+    rng = random.Random(0)
+    ingredient_names = [f"{rng.choice(WORDS)} {i}" for i in range(NUM_INGREDIENTS)]
+    ingredient_ids = [uuid.uuid4() for _ in ingredient_names]
+    recipes = sorted(
+        ((f"{rng.choice(WORDS).title()} {rng.choice(WORDS)} {i}", uuid.uuid4()) for i in range(NUM_RECIPES)),
+    )
+    units = list(Unit)
+    with Session(engine) as db:
+        db.execute(insert(Ingredient), [
+            {"id": ingredient_id, "name": name, "normalized_name": name}
+            for ingredient_id, name in zip(ingredient_ids, ingredient_names)
+        ])
+        db.execute(insert(Recipe), [
+            {"id": recipe_id, "name": name, "cooking_instructions": "Cook.", "cook_time": rng.randint(10, 90)}
+            for name, recipe_id in recipes
+        ])
+        rows = [
+            {"recipe_id": recipe_id, "ingredient_id": ingredient_id, "quantity": round(rng.uniform(0.25, 4), 2), "unit": rng.choice(units)}
+            for _, recipe_id in recipes
+            for ingredient_id in rng.sample(ingredient_ids, rng.randint(*INGREDIENTS_PER_RECIPE))
+        ]
+        for start in range(0, len(rows), SEED_BATCH_SIZE):
+            db.execute(insert(RecipeIngredient), rows[start:start + SEED_BATCH_SIZE])
+        db.commit()
+    return Catalogue(
+        engine,
+        recipe_ids=[recipe_id for _, recipe_id in recipes],
+        recipe_names=[name for name, _ in recipes],
+        ingredient_names=ingredient_names,
+    )
+
+
+@pytest.fixture(scope="session")
+def catalogue(tmp_path_factory):
+    database_url = os.getenv("BENCHMARK_DATABASE_URL")
+    engine = create_engine(database_url or f"sqlite:///{tmp_path_factory.mktemp('benchmarks') / 'catalogue.db'}")
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    Base.metadata.create_all(engine)
+    start = time.perf_counter()
+    seeded = _seed(engine)
+    print(f"\nSeeded {NUM_RECIPES} recipes / {NUM_INGREDIENTS} ingredients into {engine.dialect.name} in {time.perf_counter() - start:.1f}s")
+    yield seeded
+    if database_url:
+        Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def benchmark(catalogue):
+    recorder = BenchmarkRecorder()
+    yield recorder
+    if recorder.results:
+        _write_results(recorder.results, catalogue.engine.dialect.name)
+
+
+def _write_results(results: list[dict], dialect: str) -> None:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=os.path.dirname(__file__), capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    output = os.getenv("BENCHMARK_OUTPUT", "benchmark-results.json")
+    with open(output, "w") as f:
+        json.dump({
+            "commit": commit,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "database": dialect,
+            "catalogue": {"recipes": NUM_RECIPES, "ingredients": NUM_INGREDIENTS},
+            "results": results,
+        }, f, indent=2)
+    print(f"\nWrote {len(results)} benchmark results to {output}")
@@ -0,0 +1,47 @@
+"""SQL GROUP BY vs in-memory index for grocery list aggregation"""
+import random
+
+import pytest
+from sqlalchemy import event
+
+from app.core.ingredient_index import RecipeIngredientIndex
+from app.repositories import recipes as recipes_repo
+
+pytestmark = pytest.mark.benchmark
+
+@pytest.mark.parametrize("plan_size", [7, 21])
+def test_index_aggregation_vs_sql(catalogue, benchmark, monkeypatch, plan_size):
+    index = RecipeIngredientIndex()
+    monkeypatch.setattr(recipes_repo, "get_recipe_ingredient_index", lambda: index)
+    # a plan repeats some recipes
+    plan = random.Random(plan_size).choices(catalogue.recipe_ids[:plan_size], k=plan_size)
+
+    with catalogue.session() as db:
+        by_sql = recipes_repo.get_ingredients_list_for_recipes(db, plan)
+        by_index = recipes_repo.get_ingredients_list_for_recipes(db, plan, prefer_index=True)
+        key = lambda item: (item["ingredient_id"], item["unit"])
+        assert sorted(map(key, by_sql)) == sorted(map(key, by_index))
+        sql_totals = {key(item): item["total_quantity"] for item in by_sql}
+        assert all(item["total_quantity"] == pytest.approx(sql_totals[key(item)]) for item in by_index)
+
+        statements = []
+        count_statement = lambda *args: statements.append(1)
+        event.listen(catalogue.engine, "before_cursor_execute", count_statement)
+        try:
+            benchmark(
+                "get_ingredients_list_for_recipes", lambda: recipes_repo.get_ingredients_list_for_recipes(db, plan),
+                iterations=200, plan_size=plan_size, mode="sql"
+            )
+            sql_statements = len(statements)
+            benchmark(
+                "get_ingredients_list_for_recipes", lambda: recipes_repo.get_ingredients_list_for_recipes(db, plan, prefer_index=True),
+                iterations=200, plan_size=plan_size, mode="index"
+            )
+            index_statements = len(statements) - sql_statements
+        finally:
+            event.remove(catalogue.engine, "before_cursor_execute", count_statement)
+
+    # the timings are recorded for comparison across commits; what must hold on any
+    # machine is that the warm index serves every call without touching the database
+    assert sql_statements > 0
+    assert index_statements == 0
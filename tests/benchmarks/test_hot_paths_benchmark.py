@@ -0,0 +1,128 @@
+"""Repository and service hot paths against the seeded catalogue"""
+import asyncio
+import random
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.repositories.grocery_list import create_grocery_list
+from app.repositories.recipes import create_recipe, get_ingredients_list_for_recipes, get_recipes, search_recipes_by_ingredients
+from app.schemas.enums import Unit
+from app.schemas.grocery_list import GroceryListCreate
+from app.schemas.meal_plan import MealPlanRequest
+from app.schemas.recipe import RecipeCreate, RecipeIngredientCreate
+from app.services import meal_plan as meal_plan_service
+from app.services.grocery_list import build_grocery_list
+from app.services.recipe import parse_ingredients
+
+pytestmark = pytest.mark.benchmark
+
+PAGE_SIZE = 20
+
+INGREDIENT_LINES = [
+    "2 cups all-purpose flour",
+    "1 1/2 teaspoons kosher salt",
+    "3 tbsp olive oil",
+    "1/2 cup grated parmesan",
+    "2 cloves garlic, minced",
+    "1 lb ground beef",
+    "4 oz cream cheese",
+    "1 can diced tomatoes",
+    "salt and pepper to taste",
+    "250 g spaghetti",
+]
+
+
+def _recipe_create(catalogue, rng: random.Random) -> RecipeCreate:
+    # half the ingredients already exist, half are new
+    names = rng.sample(catalogue.ingredient_names, 5) + [f"new ingredient {uuid.uuid4().hex[:8]}" for _ in range(5)]
+    return RecipeCreate(
+        name=f"Benchmark recipe {uuid.uuid4().hex[:8]}",
+        cooking_instructions="Cook.",
+        cook_time=30,
+        ingredients=[RecipeIngredientCreate(name=name, quantity=1, unit=Unit.CUP) for name in names],
+    )
+
+
+class StubLLMService:
+    """Stands in for LLMService so meal plans can be timed without network calls"""
+
+    async def generate_meal_plan(self, request: MealPlanRequest):
+        return SimpleNamespace(recipes=[
+            RecipeCreate(
+                name=f"Generated recipe {uuid.uuid4().hex[:8]}",
+                cooking_instructions="Cook.",
+                cook_time=20,
+                ingredients=[RecipeIngredientCreate(name=f"garlic {i}", quantity=1, unit=Unit.TEASPOON) for i in range(8)],
+            )
+            for _ in range(request.num_meals)
+        ])
+
+
+def test_create_recipe(catalogue, benchmark):
+    rng = random.Random(0)
+    with catalogue.session() as db:
+        benchmark("create_recipe", lambda: create_recipe(db, _recipe_create(catalogue, rng)), iterations=200, ingredients=10)
+
+
+@pytest.mark.parametrize("depth", [1, 10, 100])
+def test_get_recipes_pagination_depth(catalogue, benchmark, depth):
+    # the cursor is the last recipe of page `depth`; a full page has to follow it
+    if (depth + 1) * PAGE_SIZE > len(catalogue.recipe_ids):
+        pytest.skip(f"catalogue of {len(catalogue.recipe_ids)} recipes has no page {depth + 1}")
+    position = depth * PAGE_SIZE - 1
+    after = (catalogue.recipe_names[position], catalogue.recipe_ids[position])
+    with catalogue.session() as db:
+        page = get_recipes(db, page_size=PAGE_SIZE, after=after)
+        assert len(page) == PAGE_SIZE and page[0].name > after[0]
+        benchmark("get_recipes", lambda: get_recipes(db, page_size=PAGE_SIZE, after=after), iterations=200, page=depth + 1, page_size=PAGE_SIZE)
+
+
+@pytest.mark.parametrize("num_ingredients", [1, 3])
+def test_search_recipes_by_ingredients(catalogue, benchmark, num_ingredients):
+    ingredient_names = ["garlic", "tomato", "basil"][:num_ingredients]
+    with catalogue.session() as db:
+        assert search_recipes_by_ingredients(db, ingredient_names=ingredient_names, limit=20)
+        benchmark(
+            "search_recipes_by_ingredients",
+            lambda: search_recipes_by_ingredients(db, ingredient_names=ingredient_names, max_time_minutes=60, limit=20),
+            iterations=50, ingredients=num_ingredients
+        )
+
+
+def test_get_ingredients_list_for_recipes(catalogue, benchmark):
+    plan = random.Random(1).choices(catalogue.recipe_ids, k=28)  # four weeks of dinners
+    with catalogue.session() as db:
+        benchmark("get_ingredients_list_for_recipes", lambda: get_ingredients_list_for_recipes(db, plan), iterations=100, plan_size=len(plan), mode="sql")
+
+
+def test_create_grocery_list(catalogue, benchmark):
+    plan = random.Random(2).choices(catalogue.recipe_ids, k=7)
+    with catalogue.session() as db:
+        items = get_ingredients_list_for_recipes(db, plan)
+        benchmark("create_grocery_list", lambda: create_grocery_list(db, GroceryListCreate(items=items)), iterations=100, items=len(items))
+        benchmark("build_grocery_list", lambda: build_grocery_list(db, plan), iterations=100, plan_size=len(plan), mode="sql")
+        benchmark("build_grocery_list", lambda: build_grocery_list(db, plan, prefer_index=True), iterations=100, plan_size=len(plan), mode="index")
+
+
+def test_parse_ingredients_throughput(benchmark):
+    lines = INGREDIENT_LINES * 100
+    assert len(parse_ingredients(lines)) == len(lines)
+    benchmark("parse_ingredients", lambda: parse_ingredients(lines), iterations=50, items_per_call=len(lines), lines=len(lines))
+
+
+def test_meal_plan_with_stub_llm(catalogue, benchmark, monkeypatch):
+    monkeypatch.setattr(meal_plan_service, "SessionLocal", catalogue.session_factory)
+    monkeypatch.setattr(meal_plan_service, "get_llm_service", lambda: StubLLMService())
+    monkeypatch.setattr(meal_plan_service, "find_similar_recipe_ids", lambda *args, **kwargs: [])
+    monkeypatch.setattr(meal_plan_service, "load_cached_recipes", lambda *args: None)
+    request = MealPlanRequest(num_meals=7, preferred_ingredients=["garlic", "lemon"], total_time_minutes=420)
+    # half the plan from the catalogue, the rest "generated" and saved
+    half_generated = MealPlanRequest(num_meals=7, cuisine_preferences=["thai"])
+
+    response = asyncio.run(meal_plan_service.create_meal_plan_with_grocery_list(request))
+    assert len(response.recipes) == 7 and response.grocery_list_id
+
+    benchmark("create_meal_plan_with_grocery_list", lambda: asyncio.run(meal_plan_service.create_meal_plan_with_grocery_list(request)), iterations=30, source="catalogue")
+    benchmark("create_meal_plan_with_grocery_list", lambda: asyncio.run(meal_plan_service.create_meal_plan_with_grocery_list(half_generated)), iterations=30, source="stub_llm")
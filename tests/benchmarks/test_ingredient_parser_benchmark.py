@@ -0,0 +1,148 @@
+"""Batch ingredient parser against the parser it replaced"""
+import re
+from typing import Optional
+
+import pytest
+
+from app.schemas.enums import Unit
+from app.schemas.recipe import RecipeIngredientCreate
+from app.services.recipe import parse_ingredients_batch, parse_quantity
+
+pytestmark = pytest.mark.benchmark
+
+INGREDIENT_LINES = [
+    "2 cups all-purpose flour",
+    "1 1/2 teaspoons kosher salt",
+    "3 tbsp olive oil",
+    "1/2 cup grated parmesan",
+    "2-3 cloves garlic, minced",
+    "1 lb ground beef",
+    "4 oz cream cheese",
+    "1 can diced tomatoes",
+    "salt and pepper to taste",
+    "250 g spaghetti",
+    "½ cup sugar",
+    "1½ tbsp butter",
+]
+
+
+# The per-call implementation parse_ingredients_batch replaced, kept as the baseline.
+# It rebuilds the unit table and recompiles the pattern for every line.
+def legacy_parse_ingredient_string(ingredient_str: str) -> Optional[RecipeIngredientCreate]:
+    """
+    Parse an ingredient string like "2 cups flour" or "1/2 teaspoon salt"
+    into a RecipeIngredientCreate object.
+    """
+    if not ingredient_str or not ingredient_str.strip():
+        return None
+    
+    # Clean up the ingredient string
+    ingredient_str = ingredient_str.strip()
+    
+    # Common unit mappings
+    unit_mappings = {
+        # Volume units
+        'cup': Unit.CUP,
+        'cups': Unit.CUP,
+        'c': Unit.CUP,
+        'tablespoon': Unit.TABLESPOON,
+        'tablespoons': Unit.TABLESPOON,
+        'tbsp': Unit.TABLESPOON,
+        'tbs': Unit.TABLESPOON,
+        'teaspoon': Unit.TEASPOON,
+        'teaspoons': Unit.TEASPOON,
+        'tsp': Unit.TEASPOON,
+        't': Unit.TEASPOON,
+        'pint': Unit.PINT,
+        'pints': Unit.PINT,
+        'pt': Unit.PINT,
+        'quart': Unit.QUART,
+        'quarts': Unit.QUART,
+        'qt': Unit.QUART,
+        'gallon': Unit.GALLON,
+        'gallons': Unit.GALLON,
+        'gal': Unit.GALLON,
+        'liter': Unit.LITER,
+        'liters': Unit.LITER,
+        'l': Unit.LITER,
+        'milliliter': Unit.MILLILITER,
+        'milliliters': Unit.MILLILITER,
+        'ml': Unit.MILLILITER,
+        
+        # Weight units
+        'pound': Unit.POUND,
+        'pounds': Unit.POUND,
+        'lb': Unit.POUND,
+        'lbs': Unit.POUND,
+        'ounce': Unit.OUNCE,
+        'ounces': Unit.OUNCE,
+        'oz': Unit.OUNCE,
+        'gram': Unit.GRAM,
+        'grams': Unit.GRAM,
+        'g': Unit.GRAM,
+        'kilogram': Unit.KILOGRAM,
+        'kilograms': Unit.KILOGRAM,
+        'kg': Unit.KILOGRAM,
+        
+        # Other units
+        'can': Unit.CAN,
+        'cans': Unit.CAN,
+        'bunch': Unit.BUNCH,
+        'bunches': Unit.BUNCH,
+        'package': Unit.PACKAGE,
+        'packages': Unit.PACKAGE,
+        'pkg': Unit.PACKAGE,
+        'each': Unit.EACH,
+        'piece': Unit.EACH,
+        'pieces': Unit.EACH,
+    }
+    
+    # Pattern to match quantity and unit at the beginning
+    # Handles fractions like "1/2", "1 1/2", decimals like "2.5", and whole numbers
+    quantity_pattern = r'^(\d+(?:\s+\d+/\d+)?|\d+/\d+|\d+\.\d+)\s*([a-zA-Z]+)?\s*(.*)$'
+    
+    match = re.match(quantity_pattern, ingredient_str, re.IGNORECASE)
+    
+    if match:
+        quantity_str, unit_str, ingredient_name = match.groups()
+        
+        # Parse quantity (handle fractions and mixed numbers)
+        quantity = parse_quantity(quantity_str)
+        
+        # Parse unit
+        unit = Unit.EACH  # default
+        if unit_str:
+            unit_lower = unit_str.lower()
+            unit = unit_mappings.get(unit_lower, Unit.EACH)
+        
+        # Clean up ingredient name
+        ingredient_name = ingredient_name.strip()
+        if not ingredient_name:
+            # If no ingredient name found, use the whole string as name
+            ingredient_name = ingredient_str
+        
+        return RecipeIngredientCreate(
+            name=ingredient_name,
+            quantity=quantity,
+            unit=unit
+        )
+    else:
+        # No quantity/unit found, treat as a single ingredient
+        return RecipeIngredientCreate(
+            name=ingredient_str,
+            quantity=1.0,
+            unit=Unit.EACH
+        )
+
+
+def legacy_parse_ingredients(lines: list[str]) -> list[RecipeIngredientCreate]:
+    return [parsed for parsed in map(legacy_parse_ingredient_string, lines) if parsed]
+
+
+def test_parse_ingredients_batch_against_legacy(benchmark):
+    lines = INGREDIENT_LINES * 1000
+    assert len(parse_ingredients_batch(lines)) == len(legacy_parse_ingredients(lines)) == len(lines)
+
+    legacy = benchmark("parse_ingredients", lambda: legacy_parse_ingredients(lines), iterations=20, items_per_call=len(lines), implementation="legacy")
+    batch = benchmark("parse_ingredients", lambda: parse_ingredients_batch(lines), iterations=20, items_per_call=len(lines), implementation="batch")
+    print(f"\nparse_ingredients_batch speedup: {legacy['mean_ms'] / batch['mean_ms']:.1f}x")
@@ -0,0 +1,72 @@
+from unittest.mock import patch
+import uuid
+from app.core.cache import LocalCache, MealPlanCache, RecipeCache
+
+def test_local_cache_evicts_least_recently_used():
+    cache = LocalCache(max_entries=2)
+
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    cache.get("a")  # "b" is now least recently used
+    cache.set("c", b"3")
+
+    assert cache.get("a") == b"1"
+    assert cache.get("b") is None
+    assert cache.get("c") == b"3"
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.size) == (3, 1, 1, 2)
+
+def test_local_cache_expires_entries():
+    cache = LocalCache(default_ttl_seconds=10)
+
+    with patch("app.core.cache.time.monotonic", return_value=100.0):
+        cache.set("a", b"1")
+    with patch("app.core.cache.time.monotonic", return_value=109.0):
+        assert cache.get("a") == b"1"
+    with patch("app.core.cache.time.monotonic", return_value=110.0):
+        assert cache.get("a") is None
+
+def test_recipe_cache_invalidation_drops_detail_and_pages():
+    cache = RecipeCache(LocalCache())
+    recipe_id = uuid.uuid4()
+
+    cache.set_recipe(recipe_id, b"recipe")
+    page_key = cache.page_key(limit=20, cursor=None)
+    cache.set_page(page_key, b"page")
+    assert cache.get_page(cache.page_key(limit=20, cursor=None)) == b"page"
+
+    cache.invalidate_recipe(recipe_id)
+
+    assert cache.get_recipe(recipe_id) is None
+    assert cache.get_page(cache.page_key(limit=20, cursor=None)) is None
+    stats = cache.stats()
+    assert (stats["page_hits"], stats["page_misses"], stats["recipe_misses"]) == (1, 1, 1)
+
+def test_meal_plan_cache_retires_entries_after_max_reuses():
+    cache = MealPlanCache(LocalCache(), max_reuses=2)
+    recipe_ids = [uuid.uuid4(), uuid.uuid4()]
+
+    cache.set_recipe_ids("italian", recipe_ids)
+
+    for _ in range(2):
+        assert cache.get_recipe_ids("italian") == recipe_ids
+        cache.record_use("italian")
+    assert cache.get_recipe_ids("italian") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["retired"]) == (2, 1, 1)
+
+def test_meal_plan_cache_only_counts_recorded_uses():
+    cache = MealPlanCache(LocalCache(), max_reuses=2)
+    recipe_ids = [uuid.uuid4()]
+
+    cache.set_recipe_ids("italian", recipe_ids)
+
+    # lookups the caller rejects don't wear the entry down
+    for _ in range(3):
+        assert cache.get_recipe_ids("italian") == recipe_ids
+    cache.record_use("italian")
+    assert cache.get_recipe_ids("italian") == recipe_ids
+    cache.record_use("italian")
+    cache.record_use("italian")  # already retired, nothing to count
+    assert cache.get_recipe_ids("italian") is None
+    assert cache.stats()["retired"] == 1
@@ -0,0 +1,18 @@
+import sqlite3
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from app.core import database
+from app.core.database import InstrumentedQueuePool, POOL_CHECKOUT_WAIT
+
+def test_instrumented_pool_records_checkout_waits_and_timeouts():
+    pool = InstrumentedQueuePool(lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=0, timeout=0.01)
+    checkouts = POOL_CHECKOUT_WAIT.labels().snapshot()["count"]
+    timeouts = database._pool_timeouts
+
+    connection = pool.connect()
+    with pytest.raises(PoolTimeoutError):
+        pool.connect()
+    connection.close()
+
+    assert POOL_CHECKOUT_WAIT.labels().snapshot()["count"] == checkouts + 2
+    assert database._pool_timeouts == timeouts + 1
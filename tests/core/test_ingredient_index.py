@@ -0,0 +1,67 @@
+import uuid
+from app.core.ingredient_index import RecipeIngredientIndex
+
+def test_ingredient_index_aggregates_and_reloads_invalidated_recipes():
+    index = RecipeIngredientIndex()
+    pasta_id, salad_id = uuid.uuid4(), uuid.uuid4()
+    tomato_id, salt_id = uuid.uuid4(), uuid.uuid4()
+    rows = {
+        pasta_id: [(pasta_id, tomato_id, "tomato", "each", 2.0), (pasta_id, salt_id, "salt", "teaspoon", 1.0)],
+        salad_id: [(salad_id, tomato_id, "tomato", "each", 1.5)],
+    }
+    loads = []
+    def load_rows(recipe_ids):
+        loads.append(sorted(recipe_ids))
+        return [row for recipe_id in recipe_ids for row in rows[recipe_id]]
+
+    totals = index.aggregate({pasta_id: 2, salad_id: 1}, load_rows)
+    assert sorted((item["ingredient_name"], item["unit"], item["total_quantity"]) for item in totals) == [
+        ("salt", "teaspoon", 2.0), ("tomato", "each", 5.5)
+    ]
+
+    # loaded recipes are served from memory until invalidated
+    index.aggregate({pasta_id: 1}, load_rows)
+    rows[pasta_id] = [(pasta_id, salt_id, "salt", "teaspoon", 3.0)]
+    index.invalidate_recipe(pasta_id)
+    totals = index.aggregate({pasta_id: 1, salad_id: 1}, load_rows)
+
+    assert sorted((item["ingredient_name"], item["total_quantity"]) for item in totals) == [("salt", 3.0), ("tomato", 1.5)]
+    assert loads == [sorted([pasta_id, salad_id]), [pasta_id]]
+
+def test_ingredient_index_resets_once_it_has_too_many_keys():
+    index = RecipeIngredientIndex(max_keys=2)
+    recipes = {uuid.uuid4(): (uuid.uuid4(), f"ingredient {i}") for i in range(5)}
+    def load_rows(recipe_ids):
+        return [(recipe_id, *recipes[recipe_id], "each", 1.0) for recipe_id in recipe_ids]
+
+    for recipe_id, (_, name) in recipes.items():
+        totals = index.aggregate({recipe_id: 2}, load_rows)
+        assert [(item["ingredient_name"], item["total_quantity"]) for item in totals] == [(name, 2.0)]
+        # codes and names are bounded along with the recipes
+        assert index.stats()["keys"] <= 3
+
+    assert index.stats()["resets"] == 1
+
+def test_ingredient_index_retries_when_reset_during_a_load():
+    index = RecipeIngredientIndex()
+    pasta_id, salad_id = uuid.uuid4(), uuid.uuid4()
+    tomato_id, basil_id = uuid.uuid4(), uuid.uuid4()
+    rows = {
+        pasta_id: [(pasta_id, basil_id, "basil", "cup", 1.0), (pasta_id, tomato_id, "tomato", "each", 2.0)],
+        salad_id: [(salad_id, tomato_id, "tomato", "each", 1.0)],
+    }
+    resets = []
+    def load_rows(recipe_ids):
+        if not resets:
+            # another call resets the index while this one is loading
+            with index._lock:
+                index._reset()
+            resets.append(recipe_ids)
+        return [row for recipe_id in recipe_ids for row in rows[recipe_id]]
+
+    index.aggregate({salad_id: 1}, lambda recipe_ids: [row for recipe_id in recipe_ids for row in rows[recipe_id]])
+    # salad is cached with codes from the tables the reset replaces
+    totals = index.aggregate({pasta_id: 1, salad_id: 1}, load_rows)
+
+    assert sorted((item["ingredient_name"], item["total_quantity"]) for item in totals) == [("basil", 1.0), ("tomato", 3.0)]
+    assert index.stats()["resets"] == 1
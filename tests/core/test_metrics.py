@@ -0,0 +1,28 @@
+from app.core.metrics import Histogram, Registry
+
+def test_histogram_counts_are_cumulative():
+    histogram = Histogram(buckets=(0.1, 1.0))
+
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == {"0.1": 2, "1.0": 3, "+Inf": 4}
+    assert snapshot["count"] == 4
+    assert snapshot["sum"] == 3.65
+
+def test_registry_renders_prometheus_text():
+    registry = Registry()
+    family = registry.histogram("request_seconds", "Wall time", ("route",), buckets=(0.5,))
+
+    family.observe(0.25, '/recipes/"x"')
+    family.observe(2.0, '/recipes/"x"')
+
+    assert registry.render_prometheus().splitlines() == [
+        "# HELP request_seconds Wall time",
+        "# TYPE request_seconds histogram",
+        'request_seconds_bucket{route="/recipes/\\"x\\"",le="0.5"} 1',
+        'request_seconds_bucket{route="/recipes/\\"x\\"",le="+Inf"} 2',
+        'request_seconds_sum{route="/recipes/\\"x\\""} 2.25',
+        'request_seconds_count{route="/recipes/\\"x\\""} 2',
+    ]
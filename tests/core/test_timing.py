@@ -0,0 +1,18 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from app.core.timing import end_request, start_request
+
+def test_statement_timing_survives_failed_statements():
+    engine = create_engine("sqlite://")
+    timings, token = start_request()
+    try:
+        with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM missing_table"))
+            conn.execute(text("SELECT 1"))
+    finally:
+        end_request(token)
+
+    assert timings.db_statements == 2
+    assert timings.seconds["db"] > 0
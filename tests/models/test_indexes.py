@@ -0,0 +1,24 @@
+import app.models  # noqa: F401 - registers every model on Base.metadata
+from app.core.database import Base
+
+def _indexed_prefixes(table) -> list[list[str]]:
+    """Column lists that can serve lookups by their leading columns"""
+    prefixes = [[column.name for column in table.primary_key.columns]]
+    prefixes += [[column.name for column in index.columns] for index in table.indexes]
+    prefixes += [
+        [column.name for column in constraint.columns]
+        for constraint in table.constraints
+        if constraint.__class__.__name__ == "UniqueConstraint"
+    ]
+    return prefixes
+
+def test_every_foreign_key_is_indexed():
+    unindexed = []
+    for table in Base.metadata.sorted_tables:
+        prefixes = _indexed_prefixes(table)
+        for foreign_key in table.foreign_key_constraints:
+            columns = [column.name for column in foreign_key.columns]
+            if not any(prefix[:len(columns)] == columns for prefix in prefixes):
+                unindexed.append(f"{table.name}({', '.join(columns)})")
+
+    assert not unindexed, f"Foreign keys without a leading index: {unindexed}"
@@ -0,0 +1,30 @@
+from importlib.util import module_from_spec, spec_from_file_location
+from pathlib import Path
+import pytest
+from app.models.ingredient import normalize_ingredient_name
+
+MIGRATIONS = Path(__file__).resolve().parents[2] / "migrations" / "versions"
+
+def _load_migration(revision: str):
+    path = next(MIGRATIONS.glob(f"*{revision}*.py"))
+    spec = spec_from_file_location(path.stem, path)
+    module = module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+@pytest.mark.parametrize("name, normalized", [
+    (" Olive Oil ", "olive oil"),
+    ("\tGarlic\n", "garlic"),
+    ("\u00a0Basil\u2009", "basil"),
+    ("Crème Fraîche", "crème fraîche"),
+    ("  ", ""),
+])
+def test_normalize_ingredient_name(name, normalized):
+    assert normalize_ingredient_name(name) == normalized
+
+@pytest.mark.parametrize("name", [" Olive Oil ", "\tGarlic\n", "\u00a0Basil\u2009", "CRÈME FRAÎCHE", "İzmir Köfte"])
+def test_normalized_name_backfill_matches_the_model(name):
+    # rows backfilled by the migration must collide with the keys new inserts compute
+    migration = _load_migration("f9303cecd618")
+
+    assert migration.normalize_name(name) == normalize_ingredient_name(name)
@@ -0,0 +1,17 @@
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401 - registers every model on Base.metadata
+from app.core.database import Base
+
+@pytest.fixture
+def db():
+    """Session on a fresh in-memory SQLite database, enforcing foreign keys like Postgres"""
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    event.listen(engine, "connect", lambda connection, _: connection.execute("PRAGMA foreign_keys=ON"))
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
@@ -0,0 +1,110 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+import uuid
+import pytest
+from app.models.grocery_list import GroceryList
+from app.repositories.grocery_list import create_grocery_list, create_grocery_list_for_recipes, get_grocery_list, update_grocery_list_recipes
+from app.repositories.recipes import create_recipe
+from app.schemas.enums import Unit
+from app.schemas.grocery_list import GroceryListCreate, IngredientListItem
+from app.schemas.recipe import RecipeCreate, RecipeIngredientCreate
+from app.services.grocery_list import build_grocery_list
+
+def test_create_grocery_list_bulk_inserts_and_builds_response_in_memory():
+    mock_session = MagicMock()
+    grocery_list_id = uuid.uuid4()
+    mock_session.add.side_effect = lambda grocery_list: setattr(grocery_list, "id", grocery_list_id)
+
+    onion_id = uuid.uuid4()
+    butter_id = uuid.uuid4()
+    items = [
+        IngredientListItem(ingredient_id=onion_id, ingredient_name="onion", total_quantity=2, unit=Unit.EACH),
+        IngredientListItem(ingredient_id=butter_id, ingredient_name="Butter", total_quantity=3, unit=Unit.TABLESPOON),
+    ]
+    mock_session.execute.return_value.all.return_value = [
+        SimpleNamespace(id=uuid.uuid4(), grocery_list_id=grocery_list_id, ingredient_id=item.ingredient_id, quantity=item.total_quantity, unit=item.unit.value)
+        for item in items
+    ]
+
+    grocery_list = create_grocery_list(mock_session, GroceryListCreate(items=items))
+
+    # every item goes out in one INSERT ... RETURNING, names are known so nothing is re-read
+    assert mock_session.execute.call_count == 1
+    rows = mock_session.execute.call_args.args[1]
+    assert [(row["ingredient_id"], row["unit"]) for row in rows] == [(onion_id, "each"), (butter_id, "tablespoon")]
+    mock_session.query.assert_not_called()
+
+    assert grocery_list.id == grocery_list_id
+    assert [(item.ingredient.name, item.quantity) for item in grocery_list.items] == [("Butter", 3), ("onion", 2)]
+
+
+def add_recipe(db, name: str, ingredients: list[tuple[str, float, Unit]]):
+    return create_recipe(db, RecipeCreate(
+        name=name,
+        cooking_instructions="Cook.",
+        cook_time=10,
+        ingredients=[RecipeIngredientCreate(name=n, quantity=q, unit=u) for n, q, u in ingredients],
+    )).id
+
+def item_quantities(grocery_list) -> dict[tuple[str, str], float]:
+    return {(item.ingredient.name, Unit(item.unit).value): item.quantity for item in grocery_list.items}
+
+@pytest.mark.parametrize("prefer_index", [False, True])
+def test_build_grocery_list_skips_unknown_recipes(db, prefer_index):
+    pasta = add_recipe(db, "Pasta", [("Onion", 1, Unit.EACH)])
+
+    # an unknown id contributes nothing and isn't recorded in the list's composition
+    grocery_list = build_grocery_list(db, [pasta, uuid.uuid4()], prefer_index=prefer_index)
+
+    assert item_quantities(grocery_list) == {("Onion", "each"): 1}
+    assert {(r.recipe_id, r.quantity) for r in get_grocery_list(db, grocery_list.id).recipes} == {(pasta, 1)}
+
+def test_update_grocery_list_recipes_applies_deltas(db):
+    pasta = add_recipe(db, "Pasta", [("Onion", 1, Unit.EACH), ("Butter", 0.1, Unit.TABLESPOON)])
+    soup = add_recipe(db, "Soup", [("Onion", 2, Unit.EACH), ("Stock", 1, Unit.CUP)])
+    grocery_list_id = build_grocery_list(db, [pasta]).id
+
+    updated = update_grocery_list_recipes(db, grocery_list_id, [pasta, pasta, soup], [])
+    assert item_quantities(updated) == {("Butter", "tablespoon"): pytest.approx(0.3), ("Onion", "each"): 5, ("Stock", "cup"): 1}
+
+    # butter left at float dust (0.3 - 3 * 0.1) is dropped along with the recipe
+    updated = update_grocery_list_recipes(db, grocery_list_id, [], [pasta, pasta, pasta])
+    assert item_quantities(updated) == {("Onion", "each"): 2, ("Stock", "cup"): 1}
+    assert {(r.recipe_id, r.quantity) for r in updated.recipes} == {(soup, 1)}
+
+    with pytest.raises(ValueError, match="often enough"):
+        update_grocery_list_recipes(db, grocery_list_id, [], [pasta])
+    with pytest.raises(ValueError, match="not found"):
+        update_grocery_list_recipes(db, grocery_list_id, [uuid.uuid4()], [])
+    # failed updates change nothing
+    assert item_quantities(get_grocery_list(db, grocery_list_id)) == {("Onion", "each"): 2, ("Stock", "cup"): 1}
+
+    assert update_grocery_list_recipes(db, uuid.uuid4(), [soup], []) is None
+
+def test_update_grocery_list_recipes_locks_the_list_before_reading_counts():
+    mock_session = MagicMock()
+    mock_session.get.return_value = None
+    grocery_list_id = uuid.uuid4()
+
+    assert update_grocery_list_recipes(mock_session, grocery_list_id, [uuid.uuid4()], []) is None
+    # FOR UPDATE on the list row serializes concurrent updates of the same list
+    mock_session.get.assert_called_once_with(GroceryList, grocery_list_id, with_for_update=True)
+    mock_session.execute.assert_not_called()
+
+def test_create_grocery_list_for_recipes_aggregates_in_sql(db):
+    pasta = add_recipe(db, "Pasta", [("Onion", 1, Unit.EACH), ("Butter", 2, Unit.TABLESPOON)])
+    soup = add_recipe(db, "Soup", [("onion", 2, Unit.EACH), ("Onion", 0.5, Unit.POUND), ("Stock", 1, Unit.CUP)])
+
+    # a repeated id multiplies that recipe's quantities; units stay separate and come back as values
+    grocery_list = create_grocery_list_for_recipes(db, [pasta, soup, pasta])
+
+    assert item_quantities(grocery_list) == {
+        ("Butter", "tablespoon"): 4,
+        ("Onion", "each"): 4,
+        ("Onion", "pound"): 0.5,
+        ("Stock", "cup"): 1,
+    }
+    # the ids generated by the INSERT ... SELECT are real rows
+    stored = get_grocery_list(db, grocery_list.id)
+    assert {item.id for item in stored.items} == {item.id for item in grocery_list.items}
+    assert sorted(item.unit for item in stored.items) == ["cup", "each", "pound", "tablespoon"]
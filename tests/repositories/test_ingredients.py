@@ -0,0 +1,42 @@
+from sqlalchemy import func, select
+from app.models.ingredient import Ingredient
+from app.repositories import ingredients
+from app.repositories.ingredients import get_or_create_by_names
+
+def test_get_or_create_by_names_collapses_case_and_whitespace(db):
+    resolved = get_or_create_by_names(db, ["Olive Oil", " olive oil ", "OLIVE OIL", "Salt"])
+
+    assert set(resolved) == {"olive oil", "salt"}
+    rows = db.execute(select(Ingredient.normalized_name, Ingredient.name).order_by(Ingredient.normalized_name)).all()
+    # the first spelling seen becomes the display name
+    assert rows == [("olive oil", "Olive Oil"), ("salt", "Salt")]
+
+def test_get_or_create_by_names_reuses_existing_rows(db):
+    existing = get_or_create_by_names(db, ["Garlic"])
+    db.commit()
+
+    resolved = get_or_create_by_names(db, ["garlic ", "Onion"])
+
+    assert resolved["garlic"] == existing["garlic"]
+    assert db.scalar(select(func.count()).select_from(Ingredient)) == 2
+
+def test_get_or_create_by_names_picks_up_rows_inserted_concurrently(db, monkeypatch):
+    lookup = ingredients._get_ids_by_normalized_names
+    concurrent = {}
+
+    def lookup_then_race(db, normalized_names):
+        found = lookup(db, normalized_names)
+        if not concurrent:
+            # another writer inserts "basil" after our lookup missed it
+            db.add(Ingredient(name="Basil"))
+            db.flush()
+            concurrent["basil"] = db.scalar(select(Ingredient.id).where(Ingredient.normalized_name == "basil"))
+        return found
+
+    monkeypatch.setattr(ingredients, "_get_ids_by_normalized_names", lookup_then_race)
+
+    resolved = get_or_create_by_names(db, ["basil", "Thyme"])
+
+    assert resolved["basil"] == concurrent["basil"]
+    assert "thyme" in resolved
+    assert db.scalar(select(func.count()).select_from(Ingredient)) == 2
@@ -1,15 +1,29 @@
-from unittest.mock import MagicMock
-from app.repositories.recipes import create_recipe
-from app.schemas.recipe import RecipeCreate
-from app.schemas.ingredient import Ingredient, IngredientCreate
+from unittest.mock import MagicMock, patch
+import json
+import pytest
+from app.core.cache import LocalCache, RecipeCache
+from app.models.recipe import Recipe
+from app.repositories import recipes as recipes_repository
+from app.repositories.recipes import create_recipe, create_recipes, encode_recipe_cursor, decode_recipe_cursor, get_recipes, search_recipes_by_ingredients
+from app.schemas.recipe import RecipeCreate, RecipeIngredientCreate
+from app.schemas.enums import Unit
+from app.services import recipe_cache
 import uuid
 
+def add_recipe(db, name: str, ingredient_names: list[str]):
+    return create_recipe(db, RecipeCreate(
+        name=name,
+        cooking_instructions="Cook.",
+        cook_time=10,
+        ingredients=[RecipeIngredientCreate(name=n, quantity=1, unit=Unit.EACH) for n in ingredient_names],
+    )).id
+
 def test_create_recipe():
     # Mock the database session
     mock_session = MagicMock()
 
-    existing_ingredient = Ingredient(id=str(uuid.uuid4()), name="cheddar cheese")
-    new_ingredient = IngredientCreate(name="celery")
+    cheddar_id = uuid.uuid4()
+    celery_id = uuid.uuid4()
 
     # Define test data
     recipe_data = {
@@ -17,19 +31,97 @@ def test_create_recipe():
         "cooking_instructions": "Cook thoroughly.",
         "cook_time": 30,
         "ingredients": [
-            existing_ingredient,
-            new_ingredient
+            RecipeIngredientCreate(name="Cheddar Cheese", quantity=1, unit=Unit.CUP),
+            RecipeIngredientCreate(name="celery", quantity=2, unit=Unit.EACH),
         ]
     }
 
-    # Call the create function
-    created_recipe = create_recipe(mock_session, RecipeCreate(**recipe_data))
+    # Ingredient resolution is a single bulk call keyed by normalized name
+    with patch(
+        "app.repositories.recipes.get_or_create_by_names",
+        return_value={"cheddar cheese": cheddar_id, "celery": celery_id},
+    ) as mock_resolve:
+        created_recipe = create_recipe(mock_session, RecipeCreate(**recipe_data))
 
     # Assertions
     assert created_recipe.name == recipe_data["name"]
     assert created_recipe.cooking_instructions == recipe_data["cooking_instructions"]
     assert created_recipe.cook_time == recipe_data["cook_time"]
 
-    assert len(created_recipe.ingredients) == len(recipe_data["ingredients"])
-    # only new ingredient and new recipe were added to db
-    assert mock_session.add.call_count == 2
\ No newline at end of file
+    assert mock_resolve.call_count == 1
+    # only the recipe goes through the unit of work, recipe_ingredients are one bulk insert
+    assert mock_session.add.call_count == 1
+    assert mock_session.execute.call_count == 1
+    rows = mock_session.execute.call_args.args[1]
+    assert [row["ingredient_id"] for row in rows] == [cheddar_id, celery_id]
+
+def test_recipe_cursor_round_trip():
+    recipe = Recipe(id=uuid.uuid4(), name="Pad Thai, \"extra spicy\"")
+
+    cursor = encode_recipe_cursor(recipe)
+
+    assert decode_recipe_cursor(cursor) == (recipe.name, recipe.id)
+
+def test_decode_recipe_cursor_rejects_garbage():
+    with pytest.raises(ValueError):
+        decode_recipe_cursor("not-a-cursor")
+
+def test_search_recipes_by_ingredients_ranks_by_distinct_matched_terms(db):
+    pesto = add_recipe(db, "Pesto", ["Garlic", "Basil", "Pine nuts"])
+    # three rows match "garlic", it still only scores one point
+    soup = add_recipe(db, "A Garlic Soup", ["Garlic", "Garlic powder", "Garlic salt"])
+    salad = add_recipe(db, "Zucchini Salad", ["Zucchini", "Basil"])
+    add_recipe(db, "Toast", ["Bread"])
+
+    recipes = search_recipes_by_ingredients(db, ["garlic", "BASIL"])
+
+    assert [recipe.id for recipe in recipes] == [pesto, soup, salad]
+
+def test_search_recipes_by_ingredients_limits_recipes_not_rows(db):
+    soup = add_recipe(db, "A Garlic Soup", ["Garlic", "Garlic powder", "Garlic salt"])
+    bread = add_recipe(db, "Garlic Bread", ["Garlic", "Bread"])
+    add_recipe(db, "Garlic Noodles", ["Garlic", "Noodles"])
+
+    recipes = search_recipes_by_ingredients(db, ["garlic"], limit=2)
+
+    assert [recipe.id for recipe in recipes] == [soup, bread]
+    # the limit doesn't cut off the returned recipes' ingredients either
+    assert len(recipes[0].recipe_ingredients) == 3
+
+def test_get_recipes_cursor_walks_every_recipe_once(db):
+    # duplicate names only stay in order thanks to the (name, id) tie-break
+    names = ["Soup", "Pasta", "Soup", "Curry", "Soup", "Pasta", "Tacos"]
+    recipe_ids = {add_recipe(db, name, ["Salt"]) for name in names}
+
+    seen = []
+    after = None
+    while page := get_recipes(db, page_size=2, after=after):
+        seen.extend(page)
+        after = decode_recipe_cursor(encode_recipe_cursor(page[-1]))
+
+    assert len(seen) == len(recipe_ids)
+    assert {recipe.id for recipe in seen} == recipe_ids
+    assert [(recipe.name, recipe.id) for recipe in seen] == sorted((recipe.name, recipe.id) for recipe in seen)
+
+def test_creating_recipes_refreshes_cached_pages(db, monkeypatch):
+    cache = RecipeCache(LocalCache())
+    monkeypatch.setattr(recipes_repository, "get_recipe_cache", lambda: cache)
+    monkeypatch.setattr(recipe_cache, "get_recipe_cache", lambda: cache)
+
+    def page_names():
+        return [item["name"] for item in json.loads(recipe_cache.get_recipes_page_json(db, limit=10, cursor=None))["items"]]
+
+    soup = add_recipe(db, "Soup", ["Salt"])
+    assert json.loads(recipe_cache.get_recipe_json(db, soup))["name"] == "Soup"
+    assert page_names() == ["Soup"]
+
+    add_recipe(db, "Pasta", ["Salt"])
+    assert page_names() == ["Pasta", "Soup"]
+
+    create_recipes(db, [
+        RecipeCreate(name="Curry", cooking_instructions="Cook.", cook_time=10, ingredients=[]),
+    ])
+    assert page_names() == ["Curry", "Pasta", "Soup"]
+    # the detail entry of an untouched recipe survives, and is still served
+    assert json.loads(recipe_cache.get_recipe_json(db, soup))["name"] == "Soup"
+    assert cache.stats()["recipe_hits"] == 1
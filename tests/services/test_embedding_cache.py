@@ -0,0 +1,38 @@
+from app.services.embedding_cache import EmbeddingCache
+
+def test_embedding_cache_hits_memory_then_disk(tmp_path):
+    path = str(tmp_path / "embeddings.sqlite3")
+    cache = EmbeddingCache(path=path)
+
+    cache.set("model", "Italian,  Vegetarian", [0.5, 0.25])
+
+    # normalized text matches, a different model doesn't
+    assert cache.get("model", "italian, vegetarian") == [0.5, 0.25]
+    assert cache.get("other-model", "italian, vegetarian") is None
+
+    # a fresh instance only has the disk tier
+    reopened = EmbeddingCache(path=path)
+    assert reopened.get_many("model", ["Italian, Vegetarian", "Mexican"]) == [[0.5, 0.25], None]
+    stats = reopened.stats()
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (0, 1, 1)
+
+def test_embedding_cache_evicts_least_recently_used(tmp_path):
+    cache = EmbeddingCache(path=str(tmp_path / "embeddings.sqlite3"), max_memory_entries=1, max_disk_entries=2)
+
+    cache.set("model", "a", [1.0])
+    cache.set("model", "b", [2.0])
+    cache.get("model", "a")  # "b" is now least recently used on disk
+    cache.set("model", "c", [3.0])
+
+    assert cache.get_many("model", ["a", "b", "c"]) == [[1.0], None, [3.0]]
+    assert cache.stats()["evictions"] == 1
+
+def test_embedding_cache_keeps_packed_vectors_in_memory(tmp_path):
+    cache = EmbeddingCache(path=str(tmp_path / "embeddings.sqlite3"))
+
+    cache.set("model", "a", [1.0, 2.0])
+    hit = cache.get("model", "a")
+    hit.append(3.0)  # callers get their own list
+
+    assert cache.get("model", "a") == [1.0, 2.0]
+    assert all(vector.typecode == "f" for vector in cache._memory.values())
@@ -0,0 +1,74 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from app.schemas.meal_plan import MealPlanRequest
+from app.services.llm import LLMService, RecipeStreamParser
+
+def _completion(names: list[str]):
+    recipes = [
+        {"name": name, "cooking_instructions": "Cook.", "cook_time": 10, "ingredients": [{"name": "salt", "quantity": 1, "unit": "tsp"}]}
+        for name in names
+    ]
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps({"recipes": recipes})))])
+
+def test_generate_meal_plan_fans_out_retries_and_dedupes(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("EMBEDDING_CACHE_PATH", str(tmp_path / "embeddings.sqlite3"))
+    service = LLMService()
+    prompts = []
+
+    async def create(messages, **kwargs):
+        prompt = messages[-1]["content"]
+        prompts.append(prompt)
+        if "part 2 of 3" in prompt and sum("part 2 of 3" in p for p in prompts) == 1:
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="{truncated"))])
+        num_recipes = int(prompt.split("Generate exactly ")[1].split()[0])
+        if "already in the plan" in prompt:
+            return _completion([f"Top Up {len(prompts)}-{i}" for i in range(num_recipes)])
+        # every shard repeats "Soup", so two of them are dropped and topped up
+        return _completion(["Soup"] + [f"Dish {len(prompts)}-{i}" for i in range(num_recipes - 1)])
+
+    service.async_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    response = asyncio.run(service.generate_meal_plan(MealPlanRequest(num_meals=7)))
+
+    assert service._shard_sizes(7) == [3, 2, 2]
+    names = [recipe.name for recipe in response.recipes]
+    assert len(names) == 7 and len(set(names)) == 7
+    assert names.count("Soup") == 1
+    # three shards, one retry of the failed shard, then a single top-up round
+    assert len(prompts) == 5
+
+def test_recipe_stream_parser_emits_each_recipe_once_complete():
+    document = json.dumps({"recipes": [
+        {"name": "Curly {braces}", "cooking_instructions": "Say \\\"}\\\" twice", "ingredients": [{"name": "salt"}]},
+        {"name": "Second", "ingredients": []},
+    ]})
+    parser = RecipeStreamParser()
+
+    emitted = [(index, recipe["name"]) for index in range(0, len(document), 5) for recipe in parser.feed(document[index:index + 5])]
+
+    assert [name for _, name in emitted] == ["Curly {braces}", "Second"]
+    # the first recipe is out before the second one has fully arrived
+    assert emitted[0][0] < document.index('"Second"')
+
+def test_generate_embeddings_can_bypass_the_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("EMBEDDING_CACHE_PATH", str(tmp_path / "embeddings.sqlite3"))
+    service = LLMService()
+    calls = []
+
+    def create(model, input):
+        calls.append(input)
+        return SimpleNamespace(data=[SimpleNamespace(index=i, embedding=[float(i)]) for i in range(len(input))])
+
+    service.client = SimpleNamespace(embeddings=SimpleNamespace(create=create))
+
+    service.generate_embeddings(["recipe document"], use_cache=False)
+    service.generate_embeddings(["recipe document"], use_cache=False)
+    service.generate_embeddings(["query"])
+    service.generate_embeddings(["query"])
+
+    assert calls == [["recipe document"], ["recipe document"], ["query"]]
+    assert service.embedding_cache.stats()["disk_size"] == 1
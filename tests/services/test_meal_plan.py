@@ -0,0 +1,76 @@
+import uuid
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+import app.models  # noqa: F401 - registers every model on Base.metadata
+from app.core.database import Base
+from app.repositories.recipes import create_recipe
+from app.schemas.meal_plan import MealPlanRequest
+from app.schemas.recipe import RecipeCreate
+from app.services import meal_plan as meal_plan_service
+from app.services.meal_plan import meal_plan_cache_key
+
+def test_meal_plan_cache_key_canonicalizes_request():
+    key = meal_plan_cache_key(MealPlanRequest(
+        num_meals=4,
+        total_time_minutes=125,
+        dietary_restrictions=["Vegetarian"],
+        cuisine_preferences=["Italian", " mexican "]
+    ))
+
+    assert key == meal_plan_cache_key(MealPlanRequest(
+        num_meals=4,
+        total_time_minutes=140,
+        dietary_restrictions=["vegetarian", "VEGETARIAN"],
+        cuisine_preferences=["Mexican", "italian"]
+    ))
+    assert key != meal_plan_cache_key(MealPlanRequest(
+        num_meals=4,
+        total_time_minutes=155,
+        dietary_restrictions=["vegetarian"],
+        cuisine_preferences=["italian", "mexican"]
+    ))
+
+def test_select_existing_recipes_releases_connection_before_semantic_search(monkeypatch):
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    held_during_search = []
+
+    with Session(engine) as db:
+        def find_similar_recipe_ids(query_text, n_results):
+            held_during_search.append(db.in_transaction())
+            return [uuid.uuid4()]
+
+        monkeypatch.setattr(meal_plan_service, "find_similar_recipe_ids", find_similar_recipe_ids)
+        recipes = meal_plan_service.select_existing_recipes(
+            db, MealPlanRequest(num_meals=2, preferred_ingredients=["basil"], cuisine_preferences=["Italian"])
+        )
+
+    # the ingredient search ran first, but its transaction was over before the network calls
+    assert held_during_search == [False]
+    assert recipes == []
+
+def unavailable_index(query_text, n_results):
+    raise ConnectionError("vector store unreachable")
+
+@pytest.mark.parametrize("find_similar_recipe_ids, falls_back", [
+    (lambda query_text, n_results: None, True),  # nothing indexed yet
+    (unavailable_index, True),
+    (lambda query_text, n_results: [], False),  # indexed, just nothing close enough
+])
+def test_select_existing_recipes_falls_back_to_db_without_a_vector_index(monkeypatch, find_similar_recipe_ids, falls_back):
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(meal_plan_service, "find_similar_recipe_ids", find_similar_recipe_ids)
+
+    with Session(engine) as db:
+        quick = create_recipe(db, RecipeCreate(name="Quick", cooking_instructions="Cook.", cook_time=10, ingredients=[]))
+        create_recipe(db, RecipeCreate(name="Slow", cooking_instructions="Cook.", cook_time=120, ingredients=[]))
+
+        recipes = meal_plan_service.select_existing_recipes(
+            db, MealPlanRequest(num_meals=2, total_time_minutes=60, cuisine_preferences=["Italian"])
+        )
+
+    assert [recipe.id for recipe in recipes] == ([quick.id] if falls_back else [])
+
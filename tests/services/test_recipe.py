@@ -0,0 +1,30 @@
+import pytest
+from app.schemas.enums import Unit
+from app.services.recipe import parse_ingredient_string, parse_ingredients_batch
+
+@pytest.mark.parametrize("line, expected", [
+    ("2 cups flour", ("flour", 2.0, Unit.CUP)),
+    ("1/2 teaspoon salt", ("salt", 0.5, Unit.TEASPOON)),
+    ("2.5 cups milk", ("milk", 2.5, Unit.CUP)),
+    ("1 1/2 Tbsp. butter", ("butter", 1.5, Unit.TABLESPOON)),
+    ("½ cup sugar", ("sugar", 0.5, Unit.CUP)),
+    ("1½ cups stock", ("stock", 1.5, Unit.CUP)),
+    ("1 ¼ lb chicken", ("chicken", 1.25, Unit.POUND)),
+    # ranges take their upper bound
+    ("2-3 cups rice", ("rice", 3.0, Unit.CUP)),
+    ("1–2 cans beans", ("beans", 2.0, Unit.CAN)),
+    ("2 to 3 tsp cumin", ("cumin", 3.0, Unit.TEASPOON)),
+    # words that aren't units stay in the name
+    ("2 large eggs", ("large eggs", 2.0, Unit.EACH)),
+    ("1 cantaloupe", ("cantaloupe", 1.0, Unit.EACH)),
+    ("salt to taste", ("salt to taste", 1.0, Unit.EACH)),
+])
+def test_parse_ingredient_string(line, expected):
+    parsed = parse_ingredient_string(line)
+
+    assert (parsed.name, parsed.quantity, parsed.unit) == expected
+
+def test_parse_ingredients_batch_skips_blank_lines():
+    parsed = parse_ingredients_batch(["1 cup rice", "", "   ", "2 eggs"])
+
+    assert [(p.name, p.quantity, p.unit) for p in parsed] == [("rice", 1.0, Unit.CUP), ("eggs", 2.0, Unit.EACH)]
@@ -0,0 +1,62 @@
+from app.models.ingredient import Ingredient
+from app.models.recipe import Recipe
+from app.models.recipe_ingredient import RecipeIngredient
+from app.schemas.enums import Unit
+from app.services import recipe_embeddings
+from app.services.recipe_embeddings import recipe_document, content_hash, find_similar_recipe_ids
+import uuid
+
+def build_recipe(ingredient_rows):
+    return Recipe(
+        name="Greek Salad",
+        cooking_instructions="Toss everything together.",
+        cook_time=0,
+        recipe_ingredients=[
+            RecipeIngredient(ingredient=Ingredient(name=name), quantity=quantity, unit=unit)
+            for name, quantity, unit in ingredient_rows
+        ],
+    )
+
+def test_recipe_document_ignores_ingredient_order():
+    rows = [("Feta Cheese", 200, Unit.GRAM), ("cucumber", 2, Unit.EACH)]
+
+    document = recipe_document(build_recipe(rows))
+
+    assert document == recipe_document(build_recipe(list(reversed(rows))))
+    assert "- 2 each cucumber\n- 200 gram feta cheese" in document
+
+def test_content_hash_changes_with_model():
+    assert content_hash("doc", "model-a") != content_hash("doc", "model-b")
+
+class FakeCollection:
+    def __init__(self, ids, distances):
+        self.ids = ids
+        self.distances = distances
+        self.count_calls = 0
+        self.n_results = None
+
+    def count(self):
+        self.count_calls += 1
+        return len(self.ids)
+
+    def query(self, query_embeddings, n_results, include):
+        self.n_results = n_results
+        return {"ids": [self.ids[:n_results]], "distances": [self.distances[:n_results]]}
+
+class FakeLLM:
+    def generate_embedding(self, text):
+        return [0.0]
+
+def test_find_similar_recipe_ids_reads_the_collection_size_once(monkeypatch):
+    close, far = uuid.uuid4(), uuid.uuid4()
+    collection = FakeCollection([str(close), str(far)], [0.2, 1.5])
+    monkeypatch.setattr(recipe_embeddings, "get_recipe_collection", lambda: collection)
+    monkeypatch.setattr(recipe_embeddings, "get_llm_service", FakeLLM)
+
+    assert find_similar_recipe_ids("italian", n_results=10) == [close]
+    assert (collection.count_calls, collection.n_results) == (1, 2)
+
+    # an empty index is reported as such, not as "no close matches"
+    monkeypatch.setattr(recipe_embeddings, "get_recipe_collection", lambda: FakeCollection([], []))
+    assert find_similar_recipe_ids("italian", n_results=10) is None
+
@@ -0,0 +1,31 @@
+import json
+import uuid
+from unittest.mock import MagicMock, patch
+from sqlalchemy.exc import IntegrityError
+from app.services.recipe_import import import_recipes
+
+def recipe_line(name: str) -> str:
+    return json.dumps({
+        "name": name,
+        "cooking_instructions": "Cook it.",
+        "cook_time": 10,
+        "ingredients": [{"name": "salt", "quantity": 1, "unit": "teaspoon"}],
+    })
+
+def test_import_recipes_reports_bad_records_and_keeps_going():
+    lines = [recipe_line("Soup"), "{not json", "", recipe_line("Bad"), recipe_line("Stew")]
+
+    def create_recipes(db, recipe_creates):
+        if any(recipe_create.name == "Bad" for recipe_create in recipe_creates):
+            raise IntegrityError("INSERT", {}, Exception("violates a constraint"))
+        return [uuid.uuid4() for _ in recipe_creates]
+
+    with patch("app.services.recipe_import.create_recipes", side_effect=create_recipes) as mock_create:
+        result = import_recipes(MagicMock(), lines, chunk_size=2)
+
+    assert result.created == 2
+    assert len(result.recipe_ids) == 2
+    assert [error.line for error in result.errors] == [2, 4]
+    assert "violates a constraint" in result.errors[1].error
+    # [Soup, Bad] fails as a chunk and is retried per record, then [Stew]
+    assert [len(call.args[1]) for call in mock_create.call_args_list] == [2, 1, 1, 1]
@@ -0,0 +1,95 @@
+import asyncio
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import httpx
+from app.services import recipe_scrape
+from app.services.scrape_cache import ScrapeCache
+
+def test_scrape_recipes_limits_per_host_and_reports_failures(monkeypatch, tmp_path):
+    in_flight = Counter()
+    peak = Counter()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        in_flight[host] += 1
+        peak[host] = max(peak[host], in_flight[host])
+        await asyncio.sleep(0.01)
+        in_flight[host] -= 1
+        if request.url.path == "/missing":
+            return httpx.Response(404)
+        return httpx.Response(200, text=f"<title>{request.url.path}</title>")
+
+    monkeypatch.setattr(recipe_scrape.httpx, "AsyncClient", partial(httpx.AsyncClient, transport=httpx.MockTransport(handler)))
+    cache = ScrapeCache(path=str(tmp_path / "scrapes.sqlite3"))
+    monkeypatch.setattr(recipe_scrape, "get_scrape_cache", lambda: cache)
+    monkeypatch.setattr(recipe_scrape, "get_scrape_parse_pool", lambda: ThreadPoolExecutor(max_workers=2))
+    monkeypatch.setattr(recipe_scrape, "parse_recipe_html", lambda html, url: {"name": html, "ingredients": []})
+    monkeypatch.setattr(recipe_scrape, "SCRAPE_MAX_PER_HOST", 2)
+
+    urls = [f"https://a.example/{i}" for i in range(6)] + ["https://b.example/1", "https://b.example/missing"]
+
+    async def collect():
+        return [result async for result in recipe_scrape.scrape_recipes(urls + urls[:2])]
+
+    results = asyncio.run(collect())
+
+    assert sorted(result["url"] for result in results) == sorted(urls)
+    assert peak["a.example"] == 2
+    by_url = {result["url"]: result for result in results}
+    assert by_url["https://a.example/3"]["recipe"] == {"name": "<title>/3</title>", "ingredients": []}
+    assert "404" in by_url["https://b.example/missing"]["error"]
+    assert by_url["https://b.example/missing"]["recipe"] is None
+
+def test_scrape_recipes_serves_stale_entries_when_revalidation_fails(monkeypatch, tmp_path):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/down":
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(503)
+
+    monkeypatch.setattr(recipe_scrape.httpx, "AsyncClient", partial(httpx.AsyncClient, transport=httpx.MockTransport(handler)))
+    cache = ScrapeCache(path=str(tmp_path / "scrapes.sqlite3"), ttl_seconds=0)
+    cache.set("https://a.example/down", {"name": "down", "ingredients": []})
+    cache.set("https://a.example/erroring", {"name": "erroring", "ingredients": []})
+    monkeypatch.setattr(recipe_scrape, "get_scrape_cache", lambda: cache)
+
+    urls = ["https://a.example/down", "https://a.example/erroring", "https://a.example/uncached"]
+
+    async def collect():
+        return [result async for result in recipe_scrape.scrape_recipes(urls)]
+
+    by_url = {result["url"]: result for result in asyncio.run(collect())}
+
+    assert by_url["https://a.example/down"]["recipe"] == {"name": "down", "ingredients": []}
+    assert by_url["https://a.example/erroring"]["recipe"] == {"name": "erroring", "ingredients": []}
+    assert "503" in by_url["https://a.example/uncached"]["error"]
+
+def test_scrape_recipes_cancels_and_awaits_pending_fetches_on_close(monkeypatch, tmp_path):
+    started = []
+    cancelled = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/slow":
+            started.append(request.url.path)
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(request.url.path)
+                raise
+        return httpx.Response(200, text="<title>fast</title>")
+
+    monkeypatch.setattr(recipe_scrape.httpx, "AsyncClient", partial(httpx.AsyncClient, transport=httpx.MockTransport(handler)))
+    cache = ScrapeCache(path=str(tmp_path / "scrapes.sqlite3"))
+    monkeypatch.setattr(recipe_scrape, "get_scrape_cache", lambda: cache)
+    monkeypatch.setattr(recipe_scrape, "get_scrape_parse_pool", lambda: ThreadPoolExecutor(max_workers=1))
+    monkeypatch.setattr(recipe_scrape, "parse_recipe_html", lambda html, url: {"name": html, "ingredients": []})
+
+    async def first_then_close():
+        results = recipe_scrape.scrape_recipes(["https://a.example/slow", "https://b.example/fast"])
+        first = await anext(results)
+        await results.aclose()
+        # the pending fetch was cancelled and waited for before the generator closed
+        assert started == cancelled == ["/slow"]
+        return first
+
+    assert asyncio.run(first_then_close())["url"] == "https://b.example/fast"
@@ -0,0 +1,86 @@
+import pytest
+import httpx
+from app.schemas.enums import Unit
+from app.schemas.recipe import RecipeIngredientCreate
+from app.services import recipe
+from app.services.scrape_cache import ScrapeCache, normalize_url
+
+def scraped(name: str) -> dict:
+    return {
+        "name": name,
+        "ingredients": [RecipeIngredientCreate(name="flour", quantity=2, unit=Unit.CUP)],
+        "cooking_instructions": "Bake.",
+        "total_time": 30,
+        "yields": "4 servings",
+    }
+
+def test_normalize_url_drops_noise():
+    assert (
+        normalize_url("HTTPS://Example.com:443/pie?b=2&utm_source=x&a=1#comments")
+        == normalize_url("https://example.com/pie?a=1&b=2")
+        == "https://example.com/pie?a=1&b=2"
+    )
+
+def test_scrape_cache_evicts_least_recently_used_by_size(tmp_path):
+    cache = ScrapeCache(path=str(tmp_path / "scrapes.sqlite3"))
+    cache.set("https://example.com/a", scraped("a"))
+    cache.max_bytes = cache.stats()["bytes"] * 2
+
+    cache.set("https://example.com/b", scraped("b"))
+    cache.get("https://example.com/a")  # "b" is now least recently used
+    cache.set("https://example.com/c", scraped("c"))
+
+    assert cache.get("https://example.com/b") is None
+    assert cache.get("https://example.com/a").recipe == scraped("a")
+    assert cache.stats()["evictions"] == 1
+
+def test_scrape_recipe_revalidates_stale_entries(monkeypatch, tmp_path):
+    cache = ScrapeCache(path=str(tmp_path / "scrapes.sqlite3"), ttl_seconds=0)
+    cache.set("https://example.com/pie", scraped("Pie"), etag='"v1"')
+    requests = []
+
+    def get(url, headers, **kwargs):
+        requests.append(headers)
+        return httpx.Response(304, request=httpx.Request("GET", url))
+
+    monkeypatch.setattr(recipe, "get_scrape_cache", lambda: cache)
+    monkeypatch.setattr(recipe.httpx, "get", get)
+
+    assert recipe.scrape_recipe("https://example.com/pie#top") == scraped("Pie")
+    assert requests[0]["If-None-Match"] == '"v1"'
+    assert cache.stats()["revalidated"] == 1
+
+@pytest.mark.parametrize("failure", [
+    httpx.ConnectError("connection refused"),
+    httpx.Response(500),
+])
+def test_scrape_recipe_serves_stale_entry_when_revalidation_fails(monkeypatch, tmp_path, failure):
+    cache = ScrapeCache(path=str(tmp_path / "scrapes.sqlite3"), ttl_seconds=0)
+    cache.set("https://example.com/pie", scraped("Pie"), etag='"v1"')
+
+    def get(url, headers, **kwargs):
+        if isinstance(failure, Exception):
+            raise failure
+        return httpx.Response(failure.status_code, request=httpx.Request("GET", url))
+
+    monkeypatch.setattr(recipe, "get_scrape_cache", lambda: cache)
+    monkeypatch.setattr(recipe.httpx, "get", get)
+
+    assert recipe.scrape_recipe("https://example.com/pie") == scraped("Pie")
+    assert recipe.scrape_recipe("https://example.com/cake") == "Sorry, we couldn't scrape the recipe from the URL."
+
+def test_scrape_cache_flushes_touches_before_evicting(tmp_path):
+    path = str(tmp_path / "scrapes.sqlite3")
+    cache = ScrapeCache(path=path)
+    cache.set("https://example.com/a", scraped("a"))
+    cache.set("https://example.com/b", scraped("b"))
+    size = cache.stats()["bytes"]
+
+    cache.get("https://example.com/a")  # buffered, not yet written
+    cache.max_bytes = size
+    cache.set("https://example.com/c", scraped("c"))
+
+    assert cache.get("https://example.com/b") is None
+    assert cache.stats()["bytes"] == size
+    # the running total is rebuilt from the table on reopen
+    assert ScrapeCache(path=path).stats()["bytes"] == size
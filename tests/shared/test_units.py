@@ -0,0 +1,8 @@
+from app.schemas.enums import Unit
+from app.shared.units import parse_unit
+
+def test_parse_unit_covers_abbreviations_and_falls_back():
+    assert parse_unit("Tbsp.") == Unit.TABLESPOON
+    assert parse_unit(" Litres ") == Unit.LITER
+    assert parse_unit("pinch") == Unit.EACH
+    assert all(parse_unit(unit.value) == unit for unit in Unit)